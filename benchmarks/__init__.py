@@ -0,0 +1,26 @@
+"""
+Benchmarks for the scripts of this repository. Run from the repository root, e.g.:
+    python -m benchmarks.lifecycle --out baseline.jsonl      # the whole suite, see harness.main
+    python -m benchmarks.lifecycle --compare baseline.jsonl  # ...and later, against that baseline
+    python -m benchmarks.mixins                               # focused comparisons
+"""
+import io
+import os
+import runpy
+
+import tracing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(filename, run_name='benchmarked'):
+    """
+    Execute one of the (hyphenated, hence not importable) scripts and return its namespace.
+    Tracing is switched off and whatever the script's own demo echoes is discarded.
+    """
+    tracing.configure(os.path.splitext(filename)[0], level=tracing.OFF)
+    tracing.configure(sink=io.StringIO())
+    try:
+        return runpy.run_path(os.path.join(ROOT, filename), run_name=run_name)
+    finally:
+        tracing.configure(sink=tracing.stdout)
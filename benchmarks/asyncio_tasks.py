@@ -0,0 +1,66 @@
+"""
+The optional-arguments decorator around an async constructor, awaited by many concurrent tasks:
+throughput at 1..N tasks in flight, undecorated vs decorated, tracing off and on (through a ThreadedSink).
+
+    python -m benchmarks.asyncio_tasks [max_tasks] [calls]
+
+Every construction awaits once (asyncio.sleep(0)), so tasks really interleave.
+Flat rates while the number of tasks grows is what scaling looks like on one event loop.
+"""
+import asyncio
+import io
+import sys
+import time
+
+import tracing
+from benchmarks import load_script
+
+
+class Record(object):
+    async def __new__(cls, value):
+        self = object.__new__(cls)
+        await asyncio.sleep(0)  # e.g. fetching what the instance is made of
+        self.value = value
+        return self
+
+
+async def run_tasks(factory, tasks, calls):
+    async def task(n):
+        for i in range(n):
+            await factory(i)
+
+    per_task = calls // tasks
+    started = time.perf_counter()
+    await asyncio.gather(*(task(per_task) for _ in range(tasks)))
+    return per_task * tasks / (time.perf_counter() - started)
+
+
+def main(max_tasks=10000, calls=50000):
+    max_tasks, calls = int(max_tasks), int(calls)
+    script = load_script('decorators_optional-arguments.py')
+    factories = {'plain': Record, 'decorated': script['decorator'](Record),
+                 'renamed': script['decorator'](change_name='Renamed')(Record)}
+    counts = [1]
+    while counts[-1] * 10 <= max_tasks:
+        counts.append(counts[-1] * 10)
+
+    print('%-10s %-8s %s' % ('factory', 'tracing', ''.join('%12s' % ('%d tasks' % n) for n in counts)))
+    sink = tracing.ThreadedSink(io.StringIO())
+    tracing.configure(sink=sink)
+    try:
+        for name, factory in factories.items():
+            for level in (tracing.OFF, tracing.INFO):
+                if level and name == 'plain':
+                    continue
+                tracing.configure('decorators_optional-arguments', level=level)
+                rates = [asyncio.run(run_tasks(factory, n, calls)) for n in counts]
+                print('%-10s %-8s %s' % (name, 'on' if level else 'off', ''.join('%12.0f' % r for r in rates)))
+                tracing.flush()
+                sink.join()
+    finally:
+        tracing.configure('decorators_optional-arguments', level=tracing.OFF)
+        tracing.configure(sink=tracing.stdout)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
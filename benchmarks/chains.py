@@ -0,0 +1,67 @@
+"""
+Cooperative super().__init__() chains vs chain=True (the chain resolved once per class, see chains.py),
+on a diamond and on a wide hierarchy (a base and many mixins), each field set by its own class.
+
+    python -m benchmarks.chains [calls] [mixins]
+"""
+import sys
+import timeit
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import Meta
+
+
+def make_init(field, cooperative):
+    """
+    The __init__ a class of each style would define for its own field.
+    """
+    if cooperative:
+        source = ('def __init__(self, %s=0, **kwargs):\n'
+                  '    self.%s = %s\n'
+                  '    super(klass, self).__init__(**kwargs)\n') % (field, field, field)
+    else:
+        source = 'def __init__(self, %s=0):\n    self.%s = %s\n' % (field, field, field)
+    namespace = {}
+    exec(source, namespace)
+    return namespace['__init__'], namespace
+
+
+def make_class(name, bases, field, metaclass, flat):
+    init, namespace = make_init(field, not flat)
+    configs = {'chain': True} if flat and bases == (object,) else {}
+    cls = namespace['klass'] = metaclass(name, bases, {'__init__': init}, **configs)
+    return cls
+
+
+def hierarchies(metaclass, flat, mixins):
+    """
+    diamond: Root <- Left, Right <- Bottom; wide: Root <- Mixin0..MixinN <- Leaf.
+    """
+    root = make_class('Root', (object,), 'root', metaclass, flat)
+    left = make_class('Left', (root,), 'left', metaclass, flat)
+    right = make_class('Right', (root,), 'right', metaclass, flat)
+    bottom = make_class('Bottom', (left, right), 'bottom', metaclass, flat)
+    wide = tuple(make_class('Mixin%d' % i, (root,), 'm%d' % i, metaclass, flat) for i in range(mixins))
+    leaf = make_class('Leaf', wide, 'leaf', metaclass, flat)
+    return {'diamond': bottom, 'wide': leaf}
+
+
+def main(calls=100000, mixins=8):
+    calls, mixins = int(calls), int(mixins)
+    variants = [('type, super()', type, False), ('Meta, super()', Meta, False), ('Meta, chain=True', Meta, True)]
+    print('%-18s %16s %16s' % ('construction', 'diamond [usec]', 'wide(%d) [usec]' % mixins))
+    for label, metaclass, flat in variants:
+        classes = hierarchies(metaclass, flat, mixins)
+        row = []
+        for shape in ('diamond', 'wide'):
+            cls = classes[shape]
+            obj = cls(root=1)
+            assert obj.root == 1 and len(vars(obj)) == len(cls.__mro__) - 1
+            row.append(min(timeit.repeat(lambda: cls(root=1), number=calls, repeat=5)) / calls * 1e6)
+        print('%-18s %16.3f %16.3f' % (label, row[0], row[1]))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,74 @@
+"""
+Meta instructions: 'nullify' (dict-backed instances) vs 'columns' (struct-of-arrays, see columns.py).
+Memory per record - everything allocated to hold the records, the columns included - and a sum over
+one field through attribute access vs over its column. 'renewed': as many instances again, created after
+the first ones are gone, into the rows they gave back.
+
+    python -m benchmarks.columns [records]
+"""
+import sys
+import timeit
+import tracemalloc
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+import columns
+from metaclasses import Meta
+
+FIELDS = ['price', 'qty', 'flags']
+COLUMNS = {'price': 'd', 'qty': 'q', 'flags': 'B'}
+
+
+def make_class(instruction):
+    def __init__(self, price, qty, flags):
+        self.price, self.qty, self.flags = price, qty, flags
+
+    return Meta('Trade', (object,), {'_attrs': list(FIELDS), '__init__': __init__},
+                config=dict(attr_list='_attrs', instruction=('nullify', instruction) if instruction else 'nullify',
+                            columns=COLUMNS))
+
+
+def traced(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        return kept, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main(records=200000):
+    rows = [(float(i), i, i % 2) for i in range(records)]
+    print('numpy: %s' % ('yes' if columns.numpy is not None else 'no, array.array only'))
+    print('%-26s %16s %14s' % ('storage', 'bytes/record', 'sum(qty) ms'))
+
+    plain = make_class(None)
+    instances, size = traced(lambda: [plain(*row) for row in rows])
+    ms = min(timeit.repeat(lambda: sum(obj.qty for obj in instances), number=3, repeat=3)) / 3 * 1e3
+    print('%-26s %16.1f %14.3f' % ('nullify, instances', size / records, ms))
+
+    columnar = make_class('columns')
+    instances, size = traced(lambda: [columnar(*row) for row in rows])
+    ms = min(timeit.repeat(lambda: sum(obj.qty for obj in instances), number=3, repeat=3)) / 3 * 1e3
+    print('%-26s %16.1f %14.3f' % ('columns, instances', size / records, ms))
+    columns_size = sum(sys.getsizeof(columnar.__store__.column(name)) for name in FIELDS)
+    print('%-26s %16.1f' % ('  ...of which columns', columns_size / records))
+
+    del instances
+    instances, size = traced(lambda: [columnar(*row) for row in rows])
+    assert len(columnar.__store__) == records
+    print('%-26s %16.1f' % ('columns, instances renewed', size / records))
+
+    del instances
+    columnar.__store__.clear()
+    _, size = traced(lambda: columnar.__store__.append_rows(rows))
+    store = columnar.__store__
+    assert store.sum('qty') == sum(row[1] for row in rows)
+    ms = min(timeit.repeat(lambda: store.sum('qty'), number=3, repeat=3)) / 3 * 1e3
+    print('%-26s %16.1f %14.3f' % ('columns, rows only', size / records, ms))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
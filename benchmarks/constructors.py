@@ -0,0 +1,38 @@
+"""
+Meta.__call__: the generic *args/**kwargs path vs a specialize=True generated constructor.
+
+    python -m benchmarks.constructors [calls]
+"""
+import sys
+import timeit
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import Meta
+
+
+def make_class(specialize):
+    class Point(metaclass=Meta, specialize=specialize):
+        def __new__(cls, arg, alternative_instance=None):
+            if alternative_instance is not None:
+                return alternative_instance
+            return super().__new__(cls)
+
+        def __init__(self, arg, alternative_instance=None):
+            self.arg = arg
+    return Point
+
+
+def main(calls=200000):
+    print('%-12s %16s %16s' % ('specialize', 'usec/instance', 'usec/alternative'))
+    for specialize in (False, True):
+        cls = make_class(specialize)
+        assert cls(1).arg == 1 and cls(1, alternative_instance='alt') == 'alt'
+        plain = min(timeit.repeat(lambda: cls(1), number=calls, repeat=5)) / calls * 1e6
+        alternative = min(timeit.repeat(lambda: cls(1, 'alt'), number=calls, repeat=5)) / calls * 1e6
+        print('%-12s %16.3f %16.3f' % (specialize, plain, alternative))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""
+Cost of watching the M:cC:nic lifecycle: nothing, the event recorder (events.py), and the text trace
+written to a discarding sink.
+
+    python -m benchmarks.events [calls]
+"""
+import io
+import sys
+import timeit
+
+import events
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import xClass
+
+
+def main(calls=100000):
+    calls = int(calls)
+    print('%-24s %14s' % ('instantiation', 'usec/instance'))
+    setups = [('untraced', lambda: None),
+              ('events.recorder', lambda: events.recorder.enable(capacity=1 << 16)),
+              ('text trace (discarded)', lambda: (events.recorder.disable(),
+                                                  tracing.configure('metaclasses', level=tracing.INFO),
+                                                  tracing.configure(sink=io.StringIO())))]
+    for label, setup in setups:
+        setup()
+        number = calls if label != 'text trace (discarded)' else calls // 20
+        usec = min(timeit.repeat(lambda: xClass('posarg'), number=number, repeat=5)) / number * 1e6
+        print('%-24s %14.3f' % (label, usec))
+    tracing.configure('metaclasses', level=tracing.OFF)
+    tracing.configure(sink=tracing.stdout)
+    print(events.recorder.stats())
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,79 @@
+"""
+Thousands of classes out of a schema table in JSON lines: a loop of class statements (types.new_class,
+through __prepare__) vs Meta.build_family.
+Twice: specs with inline config and mixin (as parsed, every spec its own dicts, which build_family
+first has to find equal), then specs naming them (configs=, mixins=). Both are timed whole, JSON parsing
+included: build_family validates every spec before building, it doesn't build any faster.
+
+    python -m benchmarks.families [classes] [kinds]
+"""
+import io
+import json
+import sys
+import time
+import types
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+import families
+from metaclasses import Meta
+
+MIXIN = {'value%d' % i: 'value %d' % i for i in range(50)}
+
+
+CONFIG = {'attr_list': '_attrs', 'instruction': ['nullify', 'intern']}
+SHARED = {'configs': {'record': CONFIG}, 'mixins': {'values': MIXIN}}
+
+
+def schema(classes, kinds, inline=True):
+    """
+    JSON lines: 'kinds' root classes, every other class derived from one of them.
+    """
+    stream = io.StringIO()
+    for i in range(classes):
+        spec = {'name': 'Kind%d' % i if i < kinds else 'Record%d' % i,
+                'attrs': {'_attrs': ['a', 'b', 'c'], 'label': 'record %d' % i},
+                'config': CONFIG if inline else 'record',
+                'mixin': MIXIN if inline else 'values'}
+        if i >= kinds:
+            spec['bases'] = ['Kind%d' % (i % kinds)]
+        stream.write(json.dumps(spec) + '\n')
+    return stream.getvalue()
+
+
+def statements(specs):
+    built = {}
+    for spec in specs:
+        bases = tuple(built[base] for base in spec.get('bases', ())) or (object,)
+        config, mixin = spec['config'], spec['mixin']
+        if isinstance(config, str):  # named: the module's shared dicts
+            config, mixin = SHARED['configs'][config], SHARED['mixins'][mixin]
+        kwds = dict(metaclass=Meta, config=config, mixin=mixin)
+        built[spec['name']] = types.new_class(spec['name'], bases, kwds, lambda ns: ns.update(spec['attrs']))
+    return built
+
+
+def run(text, shared):
+    started = time.perf_counter()
+    compiled = families.instructions.stats['plans_compiled']
+    built = statements(families.read_json_lines(io.StringIO(text)))
+    rate = len(built) / (time.perf_counter() - started)
+    print('%-32s %14.0f %8d' % ('class statements', rate, families.instructions.stats['plans_compiled'] - compiled))
+    started = time.perf_counter()
+    family = Meta.build_family(families.read_json_lines(io.StringIO(text)), **shared)
+    total = len(family) / (time.perf_counter() - started)
+    assert family['Record%d' % (len(family) - 1)].value3 == 'value 3'
+    print('%-32s %14.0f %8d' % ('Meta.build_family', total, family.stats()['plans']))
+
+
+
+def main(classes=10000, kinds=20):
+    for inline, shared in ((True, {}), (False, SHARED)):
+        print('%s config and mixin' % ('inline' if inline else 'named'))
+        print('%-32s %14s %8s' % ('builder', 'classes/s', 'plans'))
+        run(schema(int(classes), int(kinds), inline), shared)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,94 @@
+"""
+Timing, JSON lines output and baseline comparison for the benchmark suites.
+
+Every case is run 'warmup' times untimed, then 'repeat' rounds of 'number' calls.
+Per round, both wall-clock (perf_counter) and CPU time of the process (process_time) are taken;
+the best round is reported (the least disturbed one), next to the median of all rounds.
+"""
+import json
+import statistics
+import sys
+import time
+
+
+def measure(name, func, number=10000, repeat=7, warmup=1000):
+    for _ in range(warmup):
+        func()
+    wall, cpu = [], []
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        for _ in range(number):
+            func()
+        cpu.append((time.process_time() - cpu_start) / number * 1e6)
+        wall.append((time.perf_counter() - wall_start) / number * 1e6)
+    return {'name': name, 'number': number, 'repeat': repeat,
+            'wall_us': min(wall), 'wall_median_us': statistics.median(wall),
+            'cpu_us': min(cpu), 'cpu_median_us': statistics.median(cpu)}
+
+
+def run(cases, number=10000, repeat=7, out=None):
+    """
+    cases: iterable of (name, func). Prints a table, writes JSON lines to 'out' (a path) if given.
+    """
+    results = []
+    print('%-48s %10s %10s %10s' % ('case', 'wall us', 'median', 'cpu us'))
+    for name, func in cases:
+        result = measure(name, func, number=number, repeat=repeat, warmup=max(number // 10, 1))
+        results.append(result)
+        print('%-48s %10.3f %10.3f %10.3f' % (name, result['wall_us'], result['wall_median_us'], result['cpu_us']))
+    if out:
+        with open(out, 'w') as stream:
+            stream.writelines(json.dumps(result, sort_keys=True) + '\n' for result in results)
+    return results
+
+
+def load(path):
+    with open(path) as stream:
+        return [json.loads(line) for line in stream if line.strip()]
+
+
+def compare(results, baseline, threshold=0.10, metric='wall_us'):
+    """
+    Flag cases slower than baseline by more than 'threshold' (a fraction). Returns the regressed names.
+    """
+    previous = {result['name']: result for result in baseline}
+    regressions = []
+    print('\n%-48s %10s %10s %8s' % ('case', 'baseline', 'current', 'change'))
+    for result in results:
+        before = previous.get(result['name'])
+        if before is None:
+            print('%-48s %10s %10.3f %8s' % (result['name'], '-', result[metric], 'new'))
+            continue
+        change = result[metric] / before[metric] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(result['name'])
+        print('%-48s %10.3f %10.3f %+7.1f%%%s' % (result['name'], before[metric], result[metric], change * 100, flag))
+    return regressions
+
+
+def main(cases, argv=None):
+    """
+    Command line shared by the suites:
+        --out results.jsonl  --compare baseline.jsonl  --threshold 0.1  --number N  --repeat N  --cpu
+    Exits with status 1 when --compare finds a regression.
+    """
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', help='write results as JSON lines')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON lines of a previous --out run')
+    parser.add_argument('--threshold', type=float, default=0.10, help='tolerated slowdown (fraction)')
+    parser.add_argument('--number', type=int, default=10000, help='calls per round')
+    parser.add_argument('--repeat', type=int, default=7, help='timed rounds')
+    parser.add_argument('--cpu', action='store_true', help='compare CPU time instead of wall-clock')
+    parser.add_argument('--filter', default='', help='only cases whose name contains this')
+    args = parser.parse_args(argv)
+
+    selected = [(name, func) for name, func in cases if args.filter in name]
+    results = run(selected, number=args.number, repeat=args.repeat, out=args.out)
+    if args.compare:
+        regressions = compare(results, load(args.compare), args.threshold, 'cpu_us' if args.cpu else 'wall_us')
+        if regressions:
+            sys.exit('\n%d regression(s): %s' % (len(regressions), ', '.join(regressions)))
+    return results
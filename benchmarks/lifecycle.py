@@ -0,0 +1,106 @@
+"""
+The two lifecycles documented in the README, and every decorator variant:
+    - class creation, M:pni      (Meta.__prepare__, __new__, __init__)
+    - instance creation, M:cC:nic (Meta.__call__, xClass.__new__, __init__)
+    - decorators_optional-arguments: no-arg, empty-call, configured, change_name, alternative
+    - decorator_with-arguments: empty-call, configured (print__class_name), mixin, mixin_mode='class',
+      cache=True (an interned instance, i.e. a hit) and a cached function called with unhashable arguments
+
+    python -m benchmarks.lifecycle --out baseline.jsonl
+    python -m benchmarks.lifecycle --compare baseline.jsonl [--threshold 0.1]
+
+Tracing is switched off: the suite measures the machinery, not the printing.
+"""
+import collections
+import types
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from benchmarks import harness, load_script
+from metaclasses import Meta, xClass
+
+MIXIN = dict(returning='*** Returning', plaindict='plain dict')
+CONFIG = dict(attr_list='_attrs', instruction='nullify')
+ROWS = [('posarg',)] * 90 + [('posarg', {'key': 'value'})] * 10
+
+
+def class_creation(**kwds):
+    """
+    A class statement: types.new_class goes through __prepare__ like the interpreter does.
+    """
+    def body(ns):
+        ns['_attrs'] = ['A', 'B']
+        ns['__init__'] = lambda self, arg: None
+    return lambda: types.new_class('Created', (object,), dict(kwds, metaclass=Meta), body)
+
+
+def pooled_cases():
+    """
+    Create-and-discard churn, plain vs through a pool=<size> free-list.
+    """
+    def body(ns):
+        ns['_attrs'] = ['A', 'B']
+        ns['__init__'] = lambda self, arg: setattr(self, 'A', arg)
+    plain = types.new_class('Churn', (object,), dict(metaclass=Meta, config=CONFIG), body)
+    pooled = types.new_class('Churn', (object,), dict(metaclass=Meta, config=CONFIG, pool=64), body)
+    return [('M:cC:nic churn', lambda: plain('posarg')),
+            ('M:cC:nic churn pool=64', lambda: pooled.release(pooled('posarg')))]
+
+
+def optional_cases():
+    script = load_script('decorators_optional-arguments.py')
+    decorator, cls = script['decorator'], script['xClass']
+    variants = {
+        'no-arg': decorator(cls),
+        'empty-call': decorator()(cls),
+        'configured': decorator('dec_posarg')(cls),
+        'change_name': decorator('dec_posarg', dec_config={'change_name': 'Renamed'})(cls),
+        'alternative': decorator('dec_posarg', dec_config={'alternative': 'AlternativeClass'})(cls),
+    }
+    return [('optional:%s' % name, lambda wrapped=wrapped: wrapped('pos_arg', 'kw_arg'))
+            for name, wrapped in variants.items()]
+
+
+def with_arguments_cases():
+    script = load_script('decorator_with-arguments.py')
+    decorator = script['decorator']
+    meth = {'meth': lambda self: self.__class__.__name__}
+
+    def fresh():
+        class Plain(object):
+            def __init__(self, arg, alternative_instance=None):
+                self.arg = arg
+        return Plain
+
+    variants = {
+        'empty-call': decorator()(fresh()),
+        'configured': decorator('print__class_name')(fresh()),
+        'mixin': decorator(mixin=meth)(fresh()),
+        'mixin_mode=class': decorator(mixin=meth, mixin_mode='class')(fresh()),
+        'cache=True': decorator(cache=True)(fresh()),
+    }
+    cases = [('with-arguments:%s' % name, lambda wrapped=wrapped: wrapped('posarg'))
+             for name, wrapped in variants.items()]
+    plain_func = script['plain_func']
+    cached_func = decorator(cache=True)(lambda a, b: '%s %s' % (a, b))
+    return cases + [('with-arguments:function', lambda: plain_func('a', 'b')),
+                    ('with-arguments:cached function, unhashable', lambda: cached_func(['a'], {'b': 1}))]
+
+
+def cases():
+    alternative = {'key': 'value', 'self': None}
+    return [
+        ('M:pni', class_creation()),
+        ('M:pni mixin', class_creation(mixin=MIXIN)),
+        ('M:pni config', class_creation(config=CONFIG)),
+        ('M:pni mixin+config', class_creation(config=CONFIG, mixin=MIXIN)),
+        ('M:cC:nic', lambda: xClass('posarg')),
+        ('M:cC:n alternative_instance', lambda: xClass('posarg', alternative_instance=alternative)),
+        ('M:cC:nic x100 loop', lambda: [xClass(*row) for row in ROWS]),
+        ('M:cC:nic x100 create_many', lambda: collections.deque(xClass.create_many(ROWS), 0)),
+    ] + pooled_cases() + optional_cases() + with_arguments_cases()
+
+
+if __name__ == '__main__':
+    harness.main(cases())
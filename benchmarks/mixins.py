@@ -0,0 +1,51 @@
+"""
+decorator_with-arguments: per-instance bound-method mixins (default) vs class-level mixins (mixin_mode='class').
+
+    python -m benchmarks.mixins [instances]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from benchmarks import load_script
+
+MIXIN = {'meth_%d' % i: (lambda self: self.arg) for i in range(8)}
+
+
+def make_classes():
+    script = load_script('decorator_with-arguments.py')
+    decorator = script['decorator']
+
+    def cls():
+        class Plain(object):
+            def __init__(self, arg):
+                self.arg = arg
+        return Plain
+
+    return {
+        'instance': decorator(mixin=MIXIN)(cls()),
+        'class': decorator(mixin=MIXIN, mixin_mode='class')(cls())}
+
+
+def allocated(factory, instances):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        keep = [factory(i) for i in range(instances)]
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert keep[-1].meth_0() == instances - 1
+    return size / instances
+
+
+def main(instances=10000):
+    print('%-10s %14s %14s' % ('mixin_mode', 'bytes/instance', 'usec/instance'))
+    for mode, factory in make_classes().items():
+        per_instance = allocated(factory, instances)
+        usec = min(timeit.repeat(lambda: factory(0), number=instances, repeat=5)) / instances * 1e6
+        print('%-10s %14.1f %14.3f' % (mode, per_instance, usec))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
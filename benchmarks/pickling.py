@@ -0,0 +1,92 @@
+"""
+Round trips of decorators_optional-arguments instances through a ProcessPoolExecutor: instances pickled
+as they are (see dynamic.py) vs the manual fallback of shipping (variant, __dict__) pairs and rebuilding.
+
+    python -m benchmarks.pickling [instances] [workers] [start method: spawn|fork|forkserver]
+
+Workers start with a fresh copy of the script (the executor's initializer) and build the generated
+classes they receive on first sight, once per process.
+"""
+import concurrent.futures
+import multiprocessing
+import pickle
+import sys
+import time
+
+from benchmarks import load_script
+
+SCRIPT = 'decorators_optional-arguments.py'
+
+
+def _initializer():
+    load_script(SCRIPT)
+
+
+def _touch(obj):
+    # what a worker would do with an instance: use it and send it back
+    getattr(obj, 'arg', None)
+    return obj
+
+
+def _touch_manual(pair):
+    return pair
+
+
+def instances(script, count):
+    decorator, xClass = script['decorator'], script['xClass']
+    factories = (decorator(xClass), decorator(change_name='Renamed')(xClass),
+                 decorator(alternative='Alternative')(xClass))
+    return [factories[i % len(factories)]('arg-%d' % i, i) for i in range(count)]
+
+
+def manual(script, objs):
+    """
+    The fallback: each instance as (generated class name, its attributes), rebuilt by hand on return.
+    """
+    by_name = {type(obj).__name__: type(obj) for obj in objs}
+
+    def dump(obj):
+        return type(obj).__name__, dict(getattr(obj, '__dict__', {}))
+
+    def load(pair):
+        obj = object.__new__(by_name[pair[0]])
+        obj.__dict__.update(pair[1])
+        return obj
+    return dump, load
+
+
+def round_trip(executor, func, items, chunksize):
+    started = time.perf_counter()
+    result = list(executor.map(func, items, chunksize=chunksize))
+    return result, time.perf_counter() - started
+
+
+def main(count=30000, workers=4, method='spawn'):
+    count, workers = int(count), int(workers)
+    script = load_script(SCRIPT)
+    objs = instances(script, count)
+    dump, load = manual(script, objs)
+    chunksize = max(1, count // (workers * 8))
+    print('%d instances, %d %s workers, chunks of %d' % (count, workers, method, chunksize))
+    print('%-8s %14s %14s' % ('mode', 'bytes/instance', 'instances/s'))
+
+    context = multiprocessing.get_context(method)
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context, initializer=_initializer) as executor:
+        round_trip(executor, _touch, objs[:workers * 3], 3)  # warm up: processes started, classes built
+
+        back, seconds = round_trip(executor, _touch, objs, chunksize)
+        assert [type(obj) for obj in back] == [type(obj) for obj in objs]
+        size = len(pickle.dumps(objs[:chunksize], pickle.HIGHEST_PROTOCOL)) / chunksize
+        print('%-8s %14.1f %14.0f' % ('pickled', size, count / seconds))
+
+        started = time.perf_counter()
+        pairs, _ = round_trip(executor, _touch_manual, [dump(obj) for obj in objs], chunksize)
+        back = [load(pair) for pair in pairs]
+        seconds = time.perf_counter() - started
+        assert [type(obj) for obj in back] == [type(obj) for obj in objs]
+        size = len(pickle.dumps([dump(obj) for obj in objs[:chunksize]], pickle.HIGHEST_PROTOCOL)) / chunksize
+        print('%-8s %14.1f %14.0f' % ('manual', size, count / seconds))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,46 @@
+"""
+Meta instructions: 'nullify' (dict-backed instances) vs 'slots' (__slots__ from the attr list).
+
+    python -m benchmarks.slots [instances]
+"""
+import sys
+import tracemalloc
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import Meta
+
+FIELDS = ['a', 'b', 'c', 'd']
+
+
+def make_class(instruction):
+    def __init__(self, *values):
+        for name, value in zip(FIELDS, values):
+            setattr(self, name, value)
+
+    return Meta('Record', (object,), {'_attrs': list(FIELDS), '__init__': __init__},
+                config=dict(attr_list='_attrs', instruction=instruction))
+
+
+def getsizeof(instance):
+    return sys.getsizeof(instance) + sys.getsizeof(getattr(instance, '__dict__', ''))
+
+
+def main(instances=100000):
+    print('%-8s %18s %20s' % ('instr.', 'getsizeof (+dict)', 'tracemalloc/instance'))
+    for instruction in ('nullify', 'slots'):
+        cls = make_class(instruction)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            keep = [cls(i, i, i) for i in range(instances)]
+            traced = (tracemalloc.get_traced_memory()[0] - before) / instances
+        finally:
+            tracemalloc.stop()
+        assert keep[-1].d == 0  # unset field falls back to its class-level default
+        print('%-8s %18d %20.1f' % (instruction, getsizeof(keep[-1]), traced))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""
+Import time of a module defining many Meta classes: eager (default) vs lazy=True, tracing off and on.
+A fraction of the classes is then used, as a process would, which finalizes those lazy ones.
+
+    python -m benchmarks.startup [classes] [used]
+"""
+import io
+import sys
+import time
+import types
+
+import tracing
+
+CLASS = '''
+class Record%(i)d(metaclass=Meta, lazy=%(lazy)s, config=CONFIG, mixin=MIXIN):
+    _attrs = ['a', 'b', 'c']
+    kind = 'record-%(i)d'
+
+    def __init__(self, a):
+        self.a = a
+'''
+
+PROLOGUE = '''
+from metaclasses import Meta
+CONFIG = dict(attr_list='_attrs', instruction=('nullify', 'intern'))
+MIXIN = {'describe': lambda self: self.kind, 'version': 1, 'owner': 'benchmarks'}
+'''
+
+
+def module_source(classes, lazy):
+    return PROLOGUE + ''.join(CLASS % {'i': i, 'lazy': lazy} for i in range(classes))
+
+
+def import_module(code):
+    module = types.ModuleType('generated')
+    started = time.perf_counter()
+    exec(code, module.__dict__)
+    return module, time.perf_counter() - started
+
+
+def use(module, used):
+    started = time.perf_counter()
+    for i in range(used):
+        assert getattr(module, 'Record%d' % i)(i).describe() == 'record-%d' % i
+    return time.perf_counter() - started
+
+
+def main(classes=500, used=50, repeat=5):
+    sink = io.StringIO()
+    tracing.configure(sink=sink)
+    print('%-8s %-6s %16s %16s' % ('tracing', 'mode', 'import ms', 'use %d ms' % used))
+    try:
+        for level in (tracing.OFF, tracing.DEBUG):
+            tracing.configure('metaclasses', level=level)
+            for lazy in (False, True):
+                code = compile(module_source(classes, lazy), 'generated', 'exec')
+                best_import = best_use = float('inf')
+                for _ in range(repeat):
+                    module, seconds = import_module(code)
+                    best_import = min(best_import, seconds)
+                    best_use = min(best_use, use(module, used))
+                    sink.seek(0)
+                    sink.truncate()
+                print('%-8s %-6s %16.3f %16.3f' % ('on' if level else 'off', 'lazy' if lazy else 'eager',
+                                                   best_import * 1e3, best_use * 1e3))
+    finally:
+        tracing.flush()
+        tracing.configure(sink=tracing.stdout)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,93 @@
+"""
+Instantiation from many threads at once: a stress check that the decorators stay race-free,
+followed by throughput at 1..N threads.
+
+    python -m benchmarks.threads [max_threads] [calls_per_thread]
+
+Scaling is only linear on a free-threaded CPython build; with the GIL,
+throughput stays roughly flat and the efficiency column shows it.
+"""
+import os
+import sys
+import threading
+import time
+
+from benchmarks import load_script
+
+
+def scenarios():
+    optional = load_script('decorators_optional-arguments.py')
+    with_args = load_script('decorator_with-arguments.py')
+    decorator, xClass = optional['decorator'], optional['xClass']
+    return optional, {
+        'optional:plain': decorator(xClass),
+        'optional:change_name': decorator(change_name='Renamed')(xClass),
+        'optional:alternative': decorator(alternative='Alternative')(xClass),
+        'with-arguments:mixin': with_args['xClass'],
+    }
+
+
+def run_threads(threads, calls, target):
+    """
+    Start all threads together, return wall seconds until the last one finishes.
+    """
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            target(calls)
+        except Exception as exc:  # collected, re-raised by the caller
+            errors.append(exc)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return elapsed
+
+
+def stress(optional, cases, threads, calls):
+    optional['variants'].clear()
+    optional['alternative_types'].clear()
+    for name, wrapped in cases.items():
+        seen = set()
+
+        def target(n, wrapped=wrapped, seen=seen):
+            seen.update(type(wrapped('pos_arg')) for _ in range(n))
+
+        run_threads(threads, calls, target)
+        # every call of one decoration, from any thread, is served by one and the same class
+        assert len(seen) == 1, '%s: %d classes for one variant' % (name, len(seen))
+    for registry in ('variants', 'alternative_types'):
+        stats = optional[registry].stats()
+        assert stats['misses'] == stats['pinned'], '%s built a variant twice: %s' % (registry, stats)
+
+
+def main(max_threads=os.cpu_count() or 4, calls=20000):
+    optional, cases = scenarios()
+    stress(optional, cases, max_threads, calls // 10)
+    print('stress: %d threads, no races detected' % max_threads)
+
+    print('%-24s %7s %14s %10s' % ('scenario', 'threads', 'calls/s', 'efficiency'))
+    for name, wrapped in cases.items():
+        def target(n, wrapped=wrapped):
+            for _ in range(n):
+                wrapped('pos_arg')
+
+        single = None
+        for threads in range(1, max_threads + 1):
+            throughput = threads * calls / run_threads(threads, calls, target)
+            single = single or throughput
+            print('%-24s %7d %14.0f %9.0f%%' % (name, threads, throughput, 100 * throughput / (threads * single)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,40 @@
+"""
+Cost of live-instance tracking on instantiation: untracked vs track=True vs sampled track=<N>,
+generic and specialized constructors. Then what live_stats() itself costs.
+
+    python -m benchmarks.tracking [instances]
+"""
+import sys
+import timeit
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import Meta
+
+
+def make_class(**configs):
+    def __init__(self, a, b=None):
+        self.a, self.b = a, b
+    return Meta('Record', (object,), {'__init__': __init__}, **configs)
+
+
+def main(instances=100000):
+    instances = int(instances)
+    print('%-26s %14s' % ('configuration', 'usec/instance'))
+    for specialize in (False, True):
+        for track in (None, True, 16):
+            cls = make_class(track=track, specialize=specialize)
+            keep = []
+            usec = min(timeit.repeat(lambda: keep.append(cls(1)), number=instances, repeat=5)) / instances * 1e6
+            label = 'track=%s%s' % (track, ', specialize' if specialize else '')
+            print('%-26s %14.3f' % (label, usec))
+            if track:
+                seconds = min(timeit.repeat(cls.live_stats, number=3, repeat=3)) / 3
+                stats = cls.live_stats()
+                print('%26s live=%d, %.1f deep bytes/instance, live_stats() %.1f ms'
+                      % ('', stats['live'], stats['mean_deep_bytes'], seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,61 @@
+"""
+Meta instruction 'hashcons' on highly repetitive data: 'freeze' alone vs 'hashcons', dict-backed and slots.
+Memory held by the instances, construction time, and the cost of == and of hash() between equal values.
+
+    python -m benchmarks.values [instances] [distinct values]
+"""
+import sys
+import timeit
+import tracemalloc
+
+import tracing
+tracing.configure('metaclasses', level=tracing.OFF)
+
+from metaclasses import Meta
+
+FIELDS = ['a', 'b', 'c']
+
+
+def make_class(*instruction):
+    def __init__(self, a, b, c):
+        self.a, self.b, self.c = a, b, c
+
+    def __eq__(self, other):
+        # what a value class without hash-consing compares with
+        if type(other) is not type(self):
+            return NotImplemented
+        return (self.a, self.b, self.c) == (other.a, other.b, other.c)
+
+    def __hash__(self):
+        return hash((self.a, self.b, self.c))
+
+    attrs = {'_attrs': list(FIELDS), '__init__': __init__}
+    if 'hashcons' not in instruction:
+        attrs.update(__eq__=__eq__, __hash__=__hash__)
+    return Meta('Value', (object,), attrs, config=dict(attr_list='_attrs', instruction=instruction))
+
+
+def main(instances=100000, distinct=100):
+    rows = [(i % distinct, 'label-%d' % (i % distinct), float(i % distinct)) for i in range(instances)]
+    print('%-18s %14s %14s %10s %10s %8s' % ('instructions', 'bytes/instance', 'usec/instance',
+                                              '== [ns]', 'hash [ns]', 'alive'))
+    for instruction in (('freeze',), ('hashcons',), ('slots', 'freeze'), ('slots', 'hashcons')):
+        cls = make_class(*instruction)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            keep = [cls(*row) for row in rows]
+            traced = (tracemalloc.get_traced_memory()[0] - before) / instances
+        finally:
+            tracemalloc.stop()
+        alive = len({id(obj) for obj in keep})
+        del keep
+        usec = min(timeit.repeat(lambda: [cls(*row) for row in rows], number=1, repeat=3)) / instances * 1e6
+        x, y = cls(*rows[0]), cls(*rows[0])
+        eq_ns = min(timeit.repeat(lambda: x == y, number=100000, repeat=3)) / 100000 * 1e9
+        hash_ns = min(timeit.repeat(lambda: hash(x), number=100000, repeat=3)) / 100000 * 1e9
+        print('%-18s %14.1f %14.3f %10.1f %10.1f %8d' % ('+'.join(instruction), traced, usec, eq_ns, hash_ns, alive))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,198 @@
+"""
+Flattened __init__ chains for Meta-managed hierarchies (class keyword chain=True):
+
+    class Base(metaclass=Meta, chain=True):
+        def __init__(self, name):
+            self.name = name
+
+    class Left(Base):
+        def __init__(self, left=0):
+            self.left = left
+
+    class Right(Base):
+        def __init__(self, right=0):
+            self.right = right
+
+    class Diamond(Left, Right):
+        pass
+
+    Diamond(name='d', right=2)
+
+With cooperative super(), every instantiation walks the MRO again: each __init__ looks its successor up
+through super() and passes on what it doesn't use. With chain=True the sequence is resolved once per class,
+when it is created: __new__ is looked up once, and the __init__ each class of the MRO defines itself
+is called in turn, bases first (object excluded) - what the cooperative calls would have run,
+without the walk. Therefore, in such a hierarchy:
+    - an __init__ must not call another __init__ (the chain calls the bases'): its code must not name
+      __init__ at all - no super().__init__(), Base.__init__(self) or getattr(base, '__init__') - which is
+      checked. A call hidden in a helper it calls is not detected
+    - instances are constructed with keyword arguments only; each __init__ (and __new__) receives the
+      ones it names, all of them if it takes **kwargs; a keyword nobody takes is a TypeError
+
+Subclasses get their own chain, computed when they are created. A chain is recomputed when a class
+of its MRO is modified: through Meta.__setattr__/__delattr__ for classes created by Meta, after
+snapshots.invalidate(klass) for any other class (see snapshots.py).
+"""
+import inspect
+
+import snapshots
+
+
+_factories = {}  # shape of the chain -> factory of its constructor
+
+_TEMPLATE = """\
+def factory(cls, isinstance, object_new, new, {steps}{defaults}):
+    def construct(kwargs):
+{new}
+{inits}
+        return obj
+    return construct
+"""
+
+
+def spec_of(func):
+    """
+    How func (a method: its first parameter excluded) is called out of the keyword arguments:
+    None when it takes **kwargs (it gets them all), otherwise a (name, keyword only, default) per parameter.
+    """
+    params = list(inspect.signature(func).parameters.values())[1:]
+    if any(p.kind is p.VAR_KEYWORD for p in params):
+        return None
+    if any(p.kind not in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) for p in params):
+        raise TypeError('%s: with chain=True only keyword arguments can be passed' % func.__qualname__)
+    return tuple((p.name, p.kind is p.KEYWORD_ONLY, p.default) for p in params)
+
+
+def names_init(func):
+    """
+    Whether the code of func (nested functions and comprehensions included) names __init__:
+    as an attribute (super().__init__, Base.__init__) or as a string (getattr(base, '__init__')).
+    """
+    codes = [getattr(inspect.unwrap(func), '__code__', None)]
+    while codes:
+        code = codes.pop()
+        if code is None:
+            continue
+        if '__init__' in code.co_names or '__init__' in code.co_consts:
+            return True
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+    return False
+
+
+def versions(cls):
+    return tuple(snapshots.version(klass) for klass in cls.__mro__)
+
+
+def _arguments(spec, defaults):
+    if spec is None:
+        return ', **kwargs'
+    arguments = ''
+    for name, keyword_only, default in spec:
+        if default is inspect.Parameter.empty:
+            value = 'kwargs[%r]' % name
+        else:
+            value = 'kwargs.get(%r, d%d)' % (name, len(defaults))
+            defaults.append(default)
+        arguments += ', %s=%s' % (name, value) if keyword_only else ', ' + value
+    return arguments
+
+
+def _factory(new_spec, init_specs):
+    """
+    The constructor of a chain written out: obj = object_new(cls) (or new(cls, ...)), then a call
+    per __init__ with exactly its arguments. Compiled once per shape, defaults are arguments of the factory.
+    """
+    shape = tuple(spec and tuple((name, keyword_only, default is inspect.Parameter.empty)
+                                 for name, keyword_only, default in spec)
+                  for spec in (new_spec,) + init_specs)
+    factory = _factories.get(shape)
+    if factory is None:
+        defaults = []
+        if new_spec == ():
+            new = '        obj = object_new(cls)'
+        else:
+            new = ('        obj = new(cls%s)\n'
+                   '        if not isinstance(obj, cls):  # like type.__call__: no __init__ for it\n'
+                   '            return obj') % _arguments(new_spec, defaults)
+        inits = []
+        for i, spec in enumerate(init_specs):
+            inits.append('        i%d(obj%s)' % (i, _arguments(spec, defaults)))
+        source = _TEMPLATE.format(
+            steps=''.join('i%d, ' % i for i in range(len(init_specs))),
+            defaults=', '.join('d%d' % i for i in range(len(defaults))) or '_=None',
+            new=new, inits='\n'.join(inits) or '        pass')
+        namespace = {}
+        exec(compile(source, '<chain constructor>', 'exec'), namespace)
+        factory = _factories[shape] = namespace['factory']
+    return factory
+
+
+class Chain(object):
+    """
+    The resolved construction sequence of one class: called with the keyword arguments of an instantiation.
+    """
+    def __init__(self, cls):
+        self.cls, self.mro, self.key, self.generation = cls, cls.__mro__, versions(cls), snapshots.generation
+        new = cls.__new__
+        self.new = None if new is object.__new__ else new
+        new_spec = spec_of(new) if self.new is not None else ()
+        inits, init_specs = [], []
+        for klass in reversed(cls.__mro__[:-1]):
+            init = vars(klass).get('__init__')
+            if init is None:
+                continue
+            if names_init(init):
+                raise TypeError('%s.__init__ calls another __init__ (super().__init__(), Base.__init__(self)...): '
+                                "with chain=True the chain calls the bases' __init__ itself" % klass.__name__)
+            inits.append(init)
+            init_specs.append(spec_of(init))
+        self.inits = tuple(inits)
+        specs = [new_spec] + init_specs
+        # None: some __init__ takes **kwargs, any keyword is accepted
+        self.accepted = None if None in specs else frozenset(p[0] for spec in specs for p in spec)
+        self.required = frozenset(p[0] for spec in specs if spec for p in spec if p[2] is inspect.Parameter.empty)
+        defaults = [p[2] for spec in specs if spec for p in spec if p[2] is not inspect.Parameter.empty]
+        self.construct = _factory(new_spec, tuple(init_specs))(
+            cls, isinstance, object.__new__, self.new, *(self.inits + tuple(defaults or (None,))))
+
+    def __call__(self, *args, **kwargs):
+        if args:
+            raise TypeError('%s() takes keyword arguments only, its __init__ chain is flattened (chain=True)'
+                            % self.cls.__name__)
+        keys = kwargs.keys()
+        if self.accepted is not None and not keys <= self.accepted:
+            raise TypeError('%s() got unexpected keyword arguments %s'
+                            % (self.cls.__name__, ', '.join(sorted(keys - self.accepted))))
+        if self.required and not keys >= self.required:
+            raise TypeError('%s() missing required keyword arguments %s'
+                            % (self.cls.__name__, ', '.join(sorted(self.required - keys))))
+        return self.construct(kwargs)
+
+    def __repr__(self):
+        return '<Chain %s: %s>' % (self.cls.__name__, ' -> '.join(
+            init.__qualname__ for init in self.inits) or 'no __init__')
+
+
+def current(cls, chain):
+    """
+    The chain of cls, given the one it inherited or was created with: rebuilt when it belongs to a base,
+    or when a class of its MRO was modified since it was built.
+    """
+    if chain.cls is cls and chain.generation == snapshots.generation:
+        return chain
+    if chain.cls is cls and chain.mro == cls.__mro__ and chain.key == versions(cls):
+        chain.generation = snapshots.generation  # something else was modified
+        return chain
+    chain = Chain(cls)
+    type.__setattr__(cls, '__chain__', chain)
+    return chain
+
+
+class Pending(object):
+    """
+    Stands for the chain of a lazy class (lazy.py) until its first instantiation, so creating it
+    doesn't finalize it.
+    """
+    cls = None
+
+PENDING = Pending()
@@ -0,0 +1,235 @@
+"""
+Columnar (struct-of-arrays) storage for Meta classes, instruction 'columns':
+
+    class Trade(metaclass=Meta, config=dict(attr_list='_attrs', instruction='columns',
+                                            columns={'price': 'd', 'qty': 'q'})):
+        _attrs = ['price', 'qty', 'symbol']
+
+Every field of the attr list lives in one per-class column: an array.array for (numeric) fields given
+a typecode in 'columns', a list for the others. An instance is only a row number
+in a single slot; its fields are descriptors reading and writing that row. Unset fields read as defaults.
+
+Bulk work goes over the columns directly, without any attribute access:
+
+    store = Trade.__store__
+    store.append_rows([(10.5, 3, 'X'), ...])  # rows without instances
+    store.sum('qty'); store.filter('price', lambda p: p > 10); store.update('price', lambda p: p * 2)
+    store.view(0).price
+
+With NumPy installed, numeric columns are handed to sum/filter/update as zero-copy NumPy views, so
+predicates and functions given to them must work on an array as well as on a scalar (comparisons
+and arithmetic do). Views pin a column's buffer: don't keep store.column() results around while adding rows.
+
+Where it pays off: rows loaded and worked on through the store. Instances cost about as much as
+dict-backed ones, and reading their fields through the descriptors is slower than plain attributes.
+python -m benchmarks.columns, 200k records of 3 fields, without NumPy (bytes/record: everything
+allocated for the records, columns included):
+    nullify, instances      104 bytes/record, sum(qty) through attributes   8.0 ms
+    columns, instances       98 bytes/record, sum(qty) through attributes  40 ms
+      ...of which columns    18 bytes/record (an instance: 40 bytes, and 32 for its row number)
+    columns, renewed         48 bytes/record: as many instances again, into the rows the first ones gave back
+    columns, rows only       18 bytes/record, store.sum('qty')              4.3 ms
+
+Adding rows is all or nothing: a short row or a value a typed column can't hold raises before
+any column is extended, so the columns always keep one length.
+
+An instance gives its row back when it goes (a __del__ installed on the class, after the class' own):
+the row is reset to the defaults and reused by the next instance, len(store) counts the rows in use.
+Until then a free row stays in the columns, holding the defaults: sum, filter and update see it.
+Rows loaded with append_rows belong to no instance and stay until store.clear(), which is for a store
+no instance is using anymore. A view() doesn't own its row: it gives nothing back when it goes, and
+reads whatever the row holds, the fields of a later instance if its owner is gone.
+"""
+import array
+
+try:
+    import numpy
+except ImportError:  # optional, columns work without it
+    numpy = None
+
+_DTYPES = {'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4',
+           'l': 'i%d' % array.array('l').itemsize, 'L': 'u%d' % array.array('L').itemsize,
+           'q': 'i8', 'Q': 'u8', 'f': 'f4', 'd': 'f8'}
+
+
+class ColumnStore(object):
+    def __init__(self, cls, defaults, typecodes):
+        self.cls = cls
+        self.defaults = defaults
+        self.typecodes = typecodes
+        self.fields = tuple(defaults)
+        self._view_class = None
+        self.clear()
+
+    def clear(self):
+        self._columns = {name: array.array(tc) if tc else [] for name, tc in self.typecodes.items()}
+        self._rows = 0
+        self._free = []  # rows given back, reused before the columns grow
+
+    def __len__(self):
+        return self._rows - len(self._free)
+
+    def append_row(self, values=()):
+        """
+        A new row with the given values (a mapping), defaults for the rest. Returns its number.
+        """
+        if self._free:
+            row = self._free.pop()
+            try:
+                for name in self.fields:
+                    if values and name in values:
+                        self._columns[name][row] = values[name]
+            except BaseException:
+                self.release(row)
+                raise
+            return row
+        appended = []
+        try:
+            for name in self.fields:
+                column = self._columns[name]
+                column.append(values.get(name, self.defaults[name]) if values else self.defaults[name])
+                appended.append(column)
+        except BaseException:
+            for column in appended:
+                column.pop()
+            raise
+        self._rows += 1
+        return self._rows - 1
+
+    def append_rows(self, rows):
+        """
+        Bulk load: each row is a tuple of values in field order. No instance is created.
+        Every row is checked (and typed columns converted) before any column is extended.
+        """
+        rows = list(rows)
+        width = len(self.fields)
+        for n, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError('row %d has %d values, %s has %d fields' % (n, len(row), self.cls.__name__, width))
+        chunks = []
+        for i, name in enumerate(self.fields):
+            values = [row[i] for row in rows]
+            typecode = self.typecodes[name]
+            # array.array() raises on a value of the wrong type, here, while nothing has been changed yet
+            chunks.append(array.array(typecode, values) if typecode else values)
+        for name, chunk in zip(self.fields, chunks):
+            self._columns[name].extend(chunk)
+        self._rows += len(rows)
+
+    def release(self, row):
+        """
+        Give a row back: its fields are reset to the defaults and the row is reused.
+        """
+        if row >= self._rows:
+            return  # a row of the columns before clear()
+        for name in self.fields:
+            self._columns[name][row] = self.defaults[name]
+        self._free.append(row)
+
+    def get(self, name, row):
+        return self._columns[name][row]
+
+    def set(self, name, row, value):
+        self._columns[name][row] = value
+
+    def view(self, row):
+        """
+        An instance standing for an existing row (__init__ is not run), which doesn't own it.
+        """
+        if self._view_class is None:
+            # a subclass which keeps the row when it goes; created bare, without Meta.__new__
+            cls = self.cls
+            self._view_class = type.__new__(type(cls), cls.__name__, (cls,), {
+                '__slots__': (), '__del__': _keep_row, '__module__': cls.__module__, '__qualname__': cls.__qualname__})
+        obj = object.__new__(self._view_class)
+        object.__setattr__(obj, '_row', row)
+        return obj
+
+    def column(self, name):
+        """
+        The column itself: a NumPy view (zero copy) of numeric columns when NumPy is there.
+        """
+        column = self._columns[name]
+        if self._vectorized(name):
+            return numpy.frombuffer(column, dtype=_DTYPES[self.typecodes[name]])
+        return column
+
+    def _vectorized(self, name):
+        return numpy is not None and self.typecodes[name] in _DTYPES
+
+    def sum(self, name):
+        return self.column(name).sum() if self._vectorized(name) else sum(self._columns[name])
+
+    def filter(self, name, predicate):
+        """
+        Numbers of the rows whose field satisfies predicate.
+        """
+        column = self.column(name)
+        if self._vectorized(name):
+            return numpy.nonzero(predicate(column))[0].tolist()
+        return [i for i, value in enumerate(column) if predicate(value)]
+
+    def update(self, name, func):
+        """
+        field = func(field), for every row.
+        """
+        column = self.column(name)
+        if self._vectorized(name):
+            column[:] = func(column)
+        elif self.typecodes[name]:
+            column[:] = array.array(self.typecodes[name], map(func, column))
+        else:
+            column[:] = map(func, column)
+
+
+def _keep_row(self):
+    pass
+
+
+def release_rows(cls, store):
+    """
+    Have the instances of cls give their row back to store when they go.
+    """
+    own = cls.__dict__.get('__del__')
+
+    def __del__(self):
+        if own is not None:
+            own(self)
+        try:
+            row = self._row
+        except AttributeError:
+            return  # no field was ever set
+        store.release(row)
+    setattr(cls, '__del__', __del__)
+
+
+class ColumnField(object):
+    """
+    A field of the attr list: reads and writes the instance's row of the class' column.
+    The first write to an instance without a row appends one.
+    """
+    __slots__ = ('name', 'store')
+
+    def __init__(self, name, store):
+        self.name, self.store = name, store
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.store.defaults[self.name]
+        try:
+            row = instance._row
+        except AttributeError:
+            return self.store.defaults[self.name]
+        return self.store._columns[self.name][row]
+
+    def __set__(self, instance, value):
+        try:
+            row = instance._row
+        except AttributeError:
+            row = self.store.append_row()
+            object.__setattr__(instance, '_row', row)
+        self.store._columns[self.name][row] = value
+
+    def __delete__(self, instance):
+        # back to the default, rows have a fixed shape
+        self.__set__(instance, self.store.defaults[self.name])
@@ -0,0 +1,120 @@
+"""
+Signature-specialized constructors for Meta-managed classes (class keyword specialize=True).
+
+Meta.__call__ takes *args, **kwargs and hands them to type.__call__, which unpacks them into __new__,
+checks what __new__ returned and unpacks them once more into __init__. For a class with a fixed signature,
+    def __new__(cls, arg, alternative_instance=None)
+    def __init__(self, arg, alternative_instance=None)
+the same can be written out with exact positional parameters:
+
+    def __call__(cls, arg, alternative_instance=_d0):
+        if trace.level:
+            trace_call(cls, (arg, alternative_instance), {})
+        obj = cls.__new__(cls, arg, alternative_instance)
+        if isinstance(obj, cls):                # __new__ returned not an instance of cls -> no __init__
+            init = type(obj).__init__           # like type.__call__: the __init__ of what __new__ returned
+            if init is not object_init and init(obj, arg, alternative_instance) is not None:
+                raise TypeError("__init__() should return None, not ...")
+            if cls.__freeze__:                  # instruction 'freeze'
+                object.__setattr__(obj, '__frozen__', True)
+        if cls.__tracker__ is not None:         # track=, see tracking.py
+            cls.__tracker__.add(obj)
+        return obj
+
+Source is compiled ONCE per signature shape (parameter names, number of defaults, whether __new__ is
+the class' own) into a factory, every class of that shape only calls the factory with its own defaults.
+__new__ and __init__ are still looked up at call time, so replacing them later by ones with the same
+signature (e.g. by a decorator) is honoured. Argument errors name the class: "Point() got an unexpected
+keyword argument 'z'", where type.__call__ would name Point.__new__.
+
+Differences with type.__call__ that remain: the generated __call__ is looked up on the metaclass, so a
+specialized class gets a metaclass of its own, a subclass of Meta - isinstance(cls, Meta) holds,
+type(cls) is Meta doesn't. Keeping Meta itself and dispatching from Meta.__call__ to a per-class
+constructor was measured too: the extra Python call and *args repacking ate the whole gain
+(python -m benchmarks.constructors: 1.6-1.8 usec an instance either way, 0.9-1.2 with a metaclass of its own).
+"""
+import inspect
+
+_factories = {}  # (parameter names, number of defaults, has __new__) -> factory
+
+_TEMPLATE = '''\
+def factory(trace, trace_call, isinstance, type, object_init, object_setattr, {defaults}):
+    def __call__(cls, {params}):
+        if trace.level:
+            trace_call(cls, ({args}{comma}), {{}})
+        obj = cls.__new__({new_args})
+        if isinstance(obj, cls):
+            init = type(obj).__init__
+            if init is not object_init:
+                result = init(obj{init_args})
+                if result is not None:
+                    raise TypeError("__init__() should return None, not '%s'" % type(result).__name__)
+            if cls.__freeze__:
+                object_setattr(obj, '__frozen__', True)
+        if cls.__tracker__ is not None:
+            cls.__tracker__.add(obj)
+        return obj
+    return __call__
+'''
+
+
+def signature_of(func):
+    """
+    Parameter names (self/cls excluded) and defaults of a plain positional function, None otherwise.
+    """
+    if not inspect.isfunction(func):
+        return None
+    params = list(inspect.signature(func).parameters.values())[1:]
+    if any(p.kind is not p.POSITIONAL_OR_KEYWORD for p in params):
+        return None
+    return tuple(p.name for p in params), tuple(p.default for p in params if p.default is not p.empty)
+
+
+def shape_of(cls):
+    """
+    The common signature of cls.__new__ and cls.__init__, plus which of them object doesn't provide.
+    None when there's no single fixed signature to specialize for.
+    """
+    new = cls.__new__ if cls.__new__ is not object.__new__ else None
+    init = cls.__init__ if cls.__init__ is not object.__init__ else None
+    signatures = set(filter(None, (signature_of(f) for f in (new, init) if f is not None)))
+    if len(signatures) != 1 or (new and signature_of(new) is None) or (init and signature_of(init) is None):
+        return None
+    names, defaults = signatures.pop()
+    return names, defaults, new is not None, init is not None
+
+
+def _factory(names, n_defaults, has_new):
+    key = names, n_defaults, has_new
+    factory = _factories.get(key)
+    if factory is None:
+        default_names = ['_d%d' % i for i in range(n_defaults)]
+        required = names[:len(names) - n_defaults]
+        params = list(required) + ['%s=%s' % pair for pair in zip(names[len(required):], default_names)]
+        args = ', '.join(names)
+        source = _TEMPLATE.format(
+            defaults=', '.join(default_names) or '_=None', params=', '.join(params), args=args,
+            comma=',' if len(names) == 1 else '',
+            new_args='cls, ' + args if has_new else 'cls', init_args=', ' + args if args else '')
+        namespace = {}
+        exec(compile(source, '<specialized constructor %s>' % ', '.join(names), 'exec'), namespace)
+        factory = _factories[key] = namespace['factory']
+    return factory
+
+
+def specialize(cls, trace, trace_call):
+    """
+    Return a __call__ specialized for cls, or None if its signature doesn't allow it.
+    Hash-consed classes (instruction 'hashcons') and flattened hierarchies (chain=True) keep the generic one,
+    which looks their table, or their chain, up.
+    """
+    if cls.__values__ is not None or cls.__chain__ is not None:
+        return None
+    shape = shape_of(cls)
+    if shape is None:
+        return None
+    names, defaults, has_new, _ = shape
+    constructor = _factory(names, len(defaults), has_new)(
+        trace, trace_call, isinstance, type, object.__init__, object.__setattr__, *(defaults or (None,)))
+    constructor.__name__, constructor.__qualname__ = cls.__name__, cls.__qualname__
+    return constructor
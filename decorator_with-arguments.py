@@ -1,5 +1,16 @@
 import types
 
+import events
+import flyweights
+import memo
+import profiling
+import snapshots
+import tracing
+from tracing import DEBUG, echo
+
+# switch off with tracing.configure('decorator_with-arguments', level=tracing.OFF)
+trace = tracing.get_tracer('decorator_with-arguments')
+
 def decorator(*conf_args, **conf_kwargs):
     """
     Complete decorator logic, when instantiating decorated object 'obj' with
@@ -9,8 +20,19 @@ def decorator(*conf_args, **conf_kwargs):
     This part of a decorator is called ONCE at object definition,
     not on instantiation or at a runtime. It remembers (*conf_args, **conf_kwargs) arguments
     used to configure object behaviour, and returns next layer of decoration (actual 'obj' decoration).
+
+    Recognized configuration:
+        'print__class_name'  - positional, report decorated object's name on every call
+        mixin={name: func}   - methods added to every instance of a decorated class
+        mixin_mode='class'   - install mixins as class attributes instead of per-instance bound methods
+        cache=True           - memoize results (intern instances of a class) keyed on the call arguments,
+                               or cache=dict(maxsize=128, ttl=None): see memo.py
     """
-    print("""  decorator(*conf_args=%s, **conf_kwargs=%s""" % (conf_args, conf_kwargs))
+    configured = profiling.decorators.enabled and profiling.clock()
+    trace("""  decorator(*conf_args=%s, **conf_kwargs=%s""", conf_args, conf_kwargs)
+    # events.recorder.enabled: the layers are recorded as compact records, see events.py
+    if events.recorder.enabled:
+        events.recorder.record(events.DECORATOR)
 
     def decorator_(obj):
         """
@@ -21,49 +43,102 @@ def decorator(*conf_args, **conf_kwargs):
         not on instantiation or at a runtime. It remembers obj to execute and returns
         next (final) layer of wrapping which will be called each time object is executed.
         """
-        print("""  -- decorator.decorator_(
-            obj=%s""" % obj)
+        decorated = profiling.decorators.enabled and profiling.clock()
+        trace("""  -- decorator.decorator_(
+            obj=%s""", obj)
+        if events.recorder.enabled:
+            events.recorder.record(events.DECORATOR_, obj)
+
+        mixin = conf_kwargs.get('mixin', {})
+        print_name = 'print__class_name' in conf_args
+
+        # Mixins are installed right here, ONCE per decoration (not applicable for functions).
+        if isinstance(obj, type):
+            if conf_kwargs.get('mixin_mode') == 'class':
+                # mixin='class': entries become real class attributes. Functions turn into bound methods
+                # through the descriptor protocol on lookup, so nothing is stored per instance.
+                for k, v in mixin.items():
+                    setattr(obj, k, v)
+                trace('  -- mixins %s installed into %s', list(mixin), obj.__name__, level=DEBUG)
+            else:
+                # default: every instance receives its own bound methods, from a substituted __init__
+                original__init__ = obj.__init__
+
+                def init(self, *iargs, **ikwargs):
+                    trace('  %s.__init__ WAS ALTERED BY A DECORATOR!', self.__class__.__name__)
+                    for k, v in mixin.items():
+                        setattr(self, k, types.MethodType(v, self))
+                    original__init__(self, *iargs, **ikwargs)
+
+                # substituting original __init__ call.
+                # Not executed but *referenced* for use by every call below
+                obj.__init__ = init
+
+            # obj is not created by Meta, nothing else tells cached renderings of obj it has changed
+            snapshots.invalidate(obj)
+
+        cache = conf_kwargs.get('cache')
+        cache = cache and memo.Memo.from_config(cache)
+        if cache and isinstance(obj, type):
+            # whatever __new__ returns instead of an instance (alternative_instance) is never interned
+            keep = lambda result: isinstance(result, obj)
+        else:
+            keep = None
+
         def wrapper(*args, **kwargs):
             """
             A wrapper around actual object, called at at EVERY execution.
 
             It has access to previously stored conf_args, conf_kwargs and obj,
-            which are typically used here.
+            which are typically used here. Nothing is patched here anymore:
+            obj is fully prepared by decorator_, so a call only constructs.
             """
-            print(chr(95)*90, """\n  decorator.decorator_.wrapper(
+            probe = profiling.decorators.enabled and profiling.decorators.start(obj)
+            trace("""%s \n  decorator.decorator_.wrapper(
             *conf_args=%s, **conf_kwargs=%s,
-            *args=%s, **kwargs=%s""" % (conf_args, conf_kwargs, args, kwargs))
-
-            mixin = conf_kwargs.get('mixin', {})
+            *args=%s, **kwargs=%s""", chr(95)*90, conf_args, conf_kwargs, args, kwargs)
 
-            # in case of function: <method-wrapper '__init__' of function object at 0x...>
-            original__init__ = obj.__init__
-
-            def init(self, *iargs, **ikwargs):
-                print('  %s.__init__ WAS ALTERED BY A DECORATOR!' % self.__class__.__name__)
-                for k, v in mixin.items():
-                    setattr(self, k, types.MethodType(v, self))
-                original__init__(self, *iargs, **ikwargs)
-
-            # substituting original __init__ call.
-            # Not executed but *referenced* for use in call below (not applicable for functions)
-            obj.__init__ = init
+            if probe:
+                probe.lap('trace')
+            recording = events.recorder.enabled
+            if recording:
+                events.recorder.record(events.WRAPPER, obj)
+                hits = cache and cache.hits
 
             # Pass control to relevant authorities: __new__ & __init__ for classes,
             # direct execution for functions.
-            normal_call_result = obj(*args, **kwargs)
+            if not cache:
+                normal_call_result = obj(*args, **kwargs)
+            elif kwargs.get('alternative_instance') is not None:
+                # the payload is returned as it is, not an instance to intern: no need to key it at all
+                normal_call_result = cache.bypass(obj, args, kwargs)
+            else:
+                normal_call_result = cache.call(obj, args, kwargs, keep)
+            if probe:
+                probe.lap('target')
 
-            if set(conf_args) & {'print__class_name', }:
+            if print_name:
                 # if order of positional arguments matters, use 'v' in ('v',)
-                print('  decorator.decorator_.wrapper: Decorated object is: %s' % obj.__name__)
+                trace('  decorator.decorator_.wrapper: Decorated object is: %s', obj.__name__)
 
+            if probe:
+                probe.done()
+            if recording:
+                events.recorder.record(events.WRAPPER_RETURN, obj, events.CACHED if cache and cache.hits != hits else 0)
             return normal_call_result
+        wrapper.cache = cache  # stats() and clear(), None without cache=
+        if decorated:
+            if configured:
+                profiling.decorators.record(obj, 'decorator', configured_ns)
+            profiling.decorators.record(obj, 'decorator_', profiling.clock() - decorated)
         return wrapper
+
+    configured_ns = configured and profiling.clock() - configured
     return decorator_
 
 ####### FLIGHT
 ############################################################################################
-print(chr(96)*90)
+echo(chr(96)*90)
 
 @decorator('print__class_name',
     mixin={'meth': lambda self: '!s% morf dlrow olleH '[::-1] % self.__class__.__name__})
@@ -88,20 +163,22 @@ class xClass(object):
         not on a upper level (in a metaclass or parent object) like all the rest of magic methods.
         This is important to understand, because both the class and the metaclass can define this method.
         """
-        _fmt = """
+        trace("""  xClass.__new__(
             cls=%s,
-            arg=%s, alternative_instance=%s""" % (cls, arg, alternative_instance)
-        print('  xClass.__new__(%s)' % _fmt)
+            arg=%s, alternative_instance=%s)""", cls, arg, alternative_instance)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_NEW, cls)
 
         if alternative_instance is not None:
-            obj = alternative_instance
+            # equal payloads come back as one shared frozen object when flyweights.alternatives is enabled
+            obj = flyweights.alternatives.intern(alternative_instance)
             desc = 'directly, without __init__ invocation'
         else:
             _super = super()
-            print('  --- call to super() returns %s' % _super)
+            trace('  --- call to super() returns %s', _super, level=DEBUG)
             obj = _super.__new__(cls) # needs to be a class not type
             desc = 'to __init__'
-        print('  -- dispatching %s %s' % (obj, desc))
+        trace('  -- dispatching %s %s', obj, desc, level=DEBUG)
         return obj
 
     def __init__(self, arg, alternative_instance=None):
@@ -109,17 +186,19 @@ class xClass(object):
         Received an instance created in __new__
         Remaining arguments *are the same* as were passed to __new__
         """
-        _fmt = """
+        trace("""  xClass.__init__(
             self=%s,
-            arg=%s, alternative_instance=%s""" % (self, arg, alternative_instance)
-        print('  xClass.__init__(%s)' % _fmt)
+            arg=%s, alternative_instance=%s)""", self, arg, alternative_instance)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_INIT, type(self))
         self.arg = arg
         self.alternative_instance = alternative_instance
         return super().__init__()
 
     def __str__(self):
-        # dir(self) and getattr(self, key) alternative is inspect.getmembers(self)
-        attrs = dict((k, getattr(self, k)) for k in dir(self) if not k.startswith(chr(95)*2))
+        # dir(self) and getattr(self, key) alternative is inspect.getmembers(self),
+        # snapshots.instance_attrs does the same out of a cached class snapshot and self.__dict__
+        attrs = snapshots.instance_attrs(self)
         _args = getattr(self, 'arg', 'MISSING'), getattr(self, 'alternative_instance', 'MISSING'), attrs
         return """<an Instance of xClass:
             arg=%s, alternative_instance=%s,
@@ -127,13 +206,13 @@ class xClass(object):
 
 
 _obj = xClass('posarg_A')
-print('%s\n%s' % (_obj, _obj.meth()))
+echo('%s\n%s' % (_obj, _obj.meth()))
 
 _altered_obj = xClass('posarg_B', alternative_instance={'key': 'value', 'self': None})
-print('%s' % _altered_obj)
+echo('%s' % _altered_obj)
 
-print(chr(96)*90)
-print(chr(96)*90)
+echo(chr(96)*90)
+echo(chr(96)*90)
 
 
 @decorator('print__class_name', None,
@@ -142,8 +221,8 @@ def plain_func(a, b='abc'):
     return '%s %s' % (a, b)
 
 
-print(plain_func('Also good for', 'regular functions!'))
-print(chr(96)*90)
+echo(plain_func('Also good for', 'regular functions!'))
+echo(chr(96)*90)
 
 
 # ``````````````````````````````````````````````````````````````````````````````````````````
@@ -1,7 +1,174 @@
+import collections
+import inspect
+import threading
+import weakref
+
+import dynamic
+import events
+import profiling
+import tracing
+from tracing import DEBUG
+
+# switch off with tracing.configure('decorators_optional-arguments', level=tracing.OFF)
+trace = tracing.get_tracer('decorators_optional-arguments')
+
+# prefix of the stable names generated classes are registered under, see dynamic.py
+SCRIPT = 'decorators_optional-arguments'
+
 case_spacer, hairline = (chr(c)*90 for c in (94, 95))
 sp_short, sp = chr(32)*2, chr(32)*6
 
 
+class Counters(object):
+    """
+    Statistics counters which threads never contend for: each thread increments its own shard,
+    totals are summed when read.
+    """
+    def __init__(self, *names):
+        self.names = names
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # guards the list of shards, taken once per thread
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = dict.fromkeys(self.names, 0)
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def totals(self):
+        with self._lock:
+            shards = list(self._shards)
+        return {name: sum(shard[name] for shard in shards) for name in self.names}
+
+    def clear(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.update(dict.fromkeys(self.names, 0))
+
+
+class VariantRegistry(object):
+    """
+    Interns classes generated by the decorator out of an original class,
+    so that every (original class, kind, value) variant is built with type() exactly ONCE.
+
+    Two tables are kept:
+        - a weak-value table, finding any variant which is still alive (e.g. held by its instances).
+          Instances of the same variant keep sharing one class: type(a) is type(b) -> True
+        - a bounded LRU of strong references, keeping most recently used variants alive
+          between calls even if no instance holds them. Least recently used are evicted first.
+
+    An evicted variant is dropped from the weak table by the garbage collector
+    once its last instance goes away (classes are cyclic, so it may take a gc pass).
+    With maxsize=None nothing is ever evicted.
+
+    Safe to share between threads: a hit is a plain lookup, without any lock.
+    Only a miss takes the registry's lock, checks again and builds the variant,
+    so concurrent first calls still end up with one and the same class.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._alive = weakref.WeakValueDictionary()
+        self._pinned = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = Counters('hits', 'misses', 'evictions')
+
+    def get(self, key, factory):
+        """
+        Return the variant stored under key, calling factory() to build it on a miss.
+        """
+        variant = self._pinned.get(key)
+        if variant is not None:
+            self._counters.shard()['hits'] += 1
+            if self.maxsize is not None:
+                try:
+                    self._pinned.move_to_end(key)
+                except KeyError:
+                    pass  # evicted by another thread meanwhile, the variant itself is still valid
+            return variant
+
+        with self._lock:
+            counters = self._counters.shard()
+            variant = self._alive.get(key)
+            if variant is None:
+                counters['misses'] += 1
+                variant = self._alive[key] = factory()
+            else:
+                counters['hits'] += 1
+            self._pinned[key] = variant
+            while self.maxsize is not None and len(self._pinned) > self.maxsize:
+                self._pinned.popitem(last=False)
+                counters['evictions'] += 1
+        return variant
+
+    def stats(self):
+        return dict(self._counters.totals(),
+                    pinned=len(self._pinned), alive=len(self._alive), maxsize=self.maxsize)
+
+    def clear(self):
+        with self._lock:
+            self._pinned.clear()
+            self._alive.clear()
+            self._counters.clear()
+
+
+# shared by every decoration, so that decorating the same class with the same
+# configuration (see the inline decorations in the FLIGHT section) reuses its variant
+variants = VariantRegistry()
+
+# classes returned by xClass.__new__ instead of an xClass instance, interned by name:
+# all alternative instances named alike share one type (and CPython's type attribute cache)
+alternative_types = VariantRegistry(maxsize=None)
+
+
+def _alternative_str(self):
+    return '%s (instance of %s)' % (self.__class__.__name__, self.__class__)
+
+
+@dynamic.builder(SCRIPT + '.alternative_type')
+def alternative_type(name):
+    """
+    Return the empty class named 'name' which stands in for an xClass instance.
+    """
+    return alternative_types.get(name, lambda: dynamic.register(
+        type(name, (object,), {'__str__': _alternative_str}),
+        '%s.alternative_type(%r)' % (SCRIPT, name), (SCRIPT + '.alternative_type', (name,))))
+
+
+@dynamic.builder(SCRIPT + '.variant')
+def variant(obj, kind, value):
+    """
+    Return the subclass of obj the decorator uses for kind ('alternative' or 'change_name') set to value.
+    obj may be given by its stable name (that's how recipes of pickled instances give it).
+    """
+    obj = dynamic.resolve(obj)
+
+    def build():
+        if kind == 'alternative':
+            cls = type(obj.__name__, (obj,), {'alternative_obj': value})
+        else:
+            cls = type(value, (obj,), {})
+        ref = dynamic.name_of(obj)
+        name = ref if isinstance(ref, str) else '%s.%s' % (obj.__module__, obj.__qualname__)
+        return dynamic.register(cls, '%s[%s=%r]' % (name, kind, value), (SCRIPT + '.variant', (ref, kind, value)))
+    return variants.get((obj, kind, value), build)
+
+
+def is_async(obj):
+    """
+    Whether calling obj gives something to await: obj is a coroutine function (or an object with
+    an async __call__), or a class with an async constructor - an async def __new__ or a metaclass
+    with an async def __call__.
+    """
+    if isinstance(obj, type):
+        return (inspect.iscoroutinefunction(obj.__new__)
+                or inspect.iscoroutinefunction(getattr(type(obj), '__call__', None)))
+    return inspect.iscoroutinefunction(obj) or inspect.iscoroutinefunction(getattr(obj, '__call__', None))
+
+
 def decorator(*conf_args, **conf_kwargs):
     """
     Decorator which may be called with or without configuration arguments, like so:
@@ -10,8 +177,12 @@ def decorator(*conf_args, **conf_kwargs):
         2. @decorator(*conf_args, **conf_kwargs), translated into
              -> decorator(*conf_args, **conf_kwargs)(func)(*args, **kwargs)
     """
+    configured = profiling.decorators.enabled and profiling.clock()
     confs = conf_args, conf_kwargs
-    print('%sdecorator(*conf_args=%s, **conf_kwargs=%s)' % (sp_short, *confs))
+    trace('%sdecorator(*conf_args=%s, **conf_kwargs=%s)', sp_short, *confs)
+    # events.recorder.enabled: the layers are recorded as compact records, see events.py
+    if events.recorder.enabled:
+        events.recorder.record(events.DECORATOR)
 
     def decorator_(obj):
         """
@@ -21,27 +192,20 @@ def decorator(*conf_args, **conf_kwargs):
             - immediately, in case of no-args decorator, where obj is implicitly the only argument.
             - after args processed/memoized with previous layer, and now an obj is explicitly passed.
         """
-        print('%sdecorator.decorator_(obj=%s)' % (sp_short, obj))
-
-        arg_is_obj = conf_args and conf_args[0] is obj or False
-        slice_start = arg_is_obj and 3 or 0
-        slice_obj = slice(slice_start, slice_start+3)
-        cfg = ("", "", "meaning", "not ", "any ", "so")[slice_obj] + (arg_is_obj,)
-        print('{}-- decorator was {}called with {}configurations {} '
-              'conf_args[0] is obj -> {}'.format(sp_short, *cfg, *confs))
-
-        def wrapper(*args, **kwargs):
-            """
-            Each time there's new instantiation,
-            this wrapper, representing an obj which it holds, is called.
-            """
-            print('{}\n{}decorator.decorator_.wrapper(\n'
-                  '{sp}*args={}, **kwargs={})'.format(hairline, sp_short, args, kwargs, sp=sp))
-
-            nonlocal obj
-            # modifying obj should not have any effect on other obj instances
-            original_obj = obj
-
+        decorated = profiling.decorators.enabled and profiling.clock()
+        trace('%sdecorator.decorator_(obj=%s)', sp_short, obj)
+        if events.recorder.enabled:
+            events.recorder.record(events.DECORATOR_, obj)
+
+        if trace.enabled(DEBUG):
+            arg_is_obj = conf_args and conf_args[0] is obj or False
+            slice_start = arg_is_obj and 3 or 0
+            slice_obj = slice(slice_start, slice_start+3)
+            cfg = ("", "", "meaning", "not ", "any ", "so")[slice_obj] + (arg_is_obj,)
+            trace.format('{}-- decorator was {}called with {}configurations {} '
+                         'conf_args[0] is obj -> {}', sp_short, *cfg, *confs, level=DEBUG)
+
+        def variant_for():
             # if decorator was 'configured'
             dec_config = conf_kwargs.get('dec_config') or conf_kwargs # allowing skipping on dec_conf
             alternative = dec_config.get('alternative')
@@ -49,20 +213,85 @@ def decorator(*conf_args, **conf_kwargs):
 
             # proper OOP inheritance will have the class created at local namespace, not what we want
             # <class '__main__.decorator.<locals>.decorator_.<locals>.wrapper.<locals>.ClassName'>
+            # type() is called once per variant, later calls are served by the registry,
+            # variants are registered with dynamic.py so that their instances can be pickled
             if alternative:
-                obj = type(obj.__name__, (obj,), {'alternative_obj': alternative})
+                return variant(obj, 'alternative', alternative)
             elif change_name:
-                obj = type(change_name, (obj,), {})
-            result = obj(*args, **kwargs)
+                return variant(obj, 'change_name', change_name)
+            return obj
 
+        def check(result):
             # id() or its equivalent is used in the is operator,
             # "An integer (or long) guaranteed to be unique and constant for this object during its lifetime."
             # CPython implementation compares the memory address an object resides in.
-            if result.__class__ is not original_obj:
-                print('{}decorator.decorator_.wrapper(\n'
-                      '{sp}ALARM! It\'s a mutation, object has been compromised!'.format(sp_short, sp=sp))
+            if result.__class__ is not obj:
+                trace.format('{}decorator.decorator_.wrapper(\n'
+                             '{sp}ALARM! It\'s a mutation, object has been compromised!', sp_short, sp=sp)
+            return result
+
+        def wrapper(*args, **kwargs):
+            """
+            Each time there's new instantiation,
+            this wrapper, representing an obj which it holds, is called.
+            """
+            probe = profiling.decorators.enabled and profiling.decorators.start(obj)
+            trace.format('{}\n{}decorator.decorator_.wrapper(\n'
+                         '{sp}*args={}, **kwargs={})', hairline, sp_short, args, kwargs, sp=sp)
+            if events.recorder.enabled:
+                events.recorder.record(events.WRAPPER, obj)
+
+            # obj is never rebound: every call derives its variant from the very same original class,
+            # otherwise each call would subclass the previous call's subclass (ever-deeper MRO)
+            if not probe:
+                result = check(variant_for()(*args, **kwargs))
+            else:
+                probe.lap('trace')
+                cls = variant_for()
+                probe.lap('variant')
+                result = cls(*args, **kwargs)
+                probe.lap('target')
+                check(result)
+                probe.lap('check')
+                probe.done()
+            if events.recorder.enabled:
+                events.recorder.record(events.WRAPPER_RETURN, obj)
+            return result
+
+        async def async_wrapper(*args, **kwargs):
+            """
+            The wrapper of a coroutine function or of a class with an async constructor:
+            awaits what obj returns, and only then checks it.
+            """
+            probe = profiling.decorators.enabled and profiling.decorators.start(obj)
+            trace.format('{}\n{}decorator.decorator_.async_wrapper(\n'
+                         '{sp}*args={}, **kwargs={})', hairline, sp_short, args, kwargs, sp=sp)
+            if events.recorder.enabled:
+                events.recorder.record(events.WRAPPER, obj)
+            if not probe:
+                result = check(await variant_for()(*args, **kwargs))
+            else:
+                probe.lap('trace')
+                cls = variant_for()
+                probe.lap('variant')
+                result = await cls(*args, **kwargs)  # time spent suspended counts, it's what a caller waits for
+                probe.lap('target')
+                check(result)
+                probe.lap('check')
+                probe.done()
+            if events.recorder.enabled:
+                events.recorder.record(events.WRAPPER_RETURN, obj)
             return result
-        return wrapper
+
+        # decided once, here: a plain wrapper would hand out un-awaited coroutines
+        chosen = async_wrapper if is_async(obj) else wrapper
+        if decorated:
+            if configured:
+                profiling.decorators.record(obj, 'decorator', configured_ns)
+            profiling.decorators.record(obj, 'decorator_', profiling.clock() - decorated)
+        return chosen
+
+    configured_ns = configured and profiling.clock() - configured
 
     if (len(conf_args) == 1         # decorating a function, a class or a method
         and callable(*conf_args)    # must be top-level callable - @decorator() w/o args will be left out
@@ -86,11 +315,13 @@ class xClass(object):
     _sp = '%s%s' % (chr(10), sp)
 
     def __new__(cls, arg, kw_arg=None):
-        print('{}xClass.__new__({sp}cls={},{sp}arg={}, kw_arg={})'.format(
-            sp_short, cls, arg, kw_arg, sp=cls._sp))
+        trace.format('{}xClass.__new__({sp}cls={},{sp}arg={}, kw_arg={})',
+                     sp_short, cls, arg, kw_arg, sp=cls._sp)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_NEW, cls)
 
         _super = super()
-        print('{}--- call to super() returns {}'.format(sp_short, _super))
+        trace.format('{}--- call to super() returns {}', sp_short, _super, level=DEBUG)
 
         # If decorator defined alternative_obj,
         # create <a: new empty class named alternative_obj as it's name>
@@ -101,9 +332,8 @@ class xClass(object):
 
             # __new__ will construct something else than instance of it's cls
             # __init__ will not be called (as it won't make any sense)
-            # return predefined alternative class with given name
-            str_ = lambda self: '%s (instance of %s)' % (self.__class__.__name__, self.__class__)
-            obj = _super.__new__(type(alternative_obj, (object,), {'__str__': str_}))
+            # return predefined alternative class with given name (created once, see alternative_type)
+            obj = _super.__new__(alternative_type(alternative_obj))
             desc = 'directly, without __init__ invocation'
 
         else:
@@ -113,7 +343,7 @@ class xClass(object):
 
         # internally, isinstance(obj, cls) is performed before __init__
         # if __new__ returns other than an instance of a cls, __init__ will be skipped
-        print('%s--- dispatching %s %s' % (sp_short, obj, desc))
+        trace('%s--- dispatching %s %s', sp_short, obj, desc, level=DEBUG)
         return obj
 
 
@@ -121,8 +351,10 @@ class xClass(object):
         # Declaration below will initialize instance.
         # args_ = self.arg, self.kw_arg = arg, kw_arg
         args_ = arg, kw_arg
-        _fmt = sp_short, '{sp}self={},{sp}arg={}, kw_arg={}'.format(self, *args_, sp=self._sp)
-        print('%sxClass.__init__(%s)' % _fmt)
+        trace.format('{}xClass.__init__({sp}self={},{sp}arg={}, kw_arg={})',
+                     sp_short, self, *args_, sp=self._sp)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_INIT, type(self))
         self.arg, self.kw_arg = args_
         return super().__init__()
 
@@ -134,6 +366,10 @@ class xClass(object):
                'kw_arg={},{sp}**instance-attributes={}>'.format(*_args, sp=self._sp)
 
 
+# this script isn't importable: xClass instances (and variants built on xClass) pickle by this name
+dynamic.register(xClass, SCRIPT + '.xClass')
+
+
 #### FLIGHT
 ########################
 
@@ -211,13 +447,18 @@ decorators = (
 
 def _launcher() -> None:
     for uc in decorators:
-        print('%s\n+++ TRYING %s\n' % (case_spacer, uc.description))
-        print("+++ RESULT: %s\n%s" % (uc.obj(), hairline))
+        tracing.echo('%s\n+++ TRYING %s\n' % (case_spacer, uc.description))
+        tracing.echo("+++ RESULT: %s\n%s" % (uc.obj(), hairline))
 
 
 if __name__ == "__main__":
     if __import__('sys').version_info.major < 3:
         exit('Tested with Python 3.5.')
+    if '--parallel' in __import__('sys').argv:
+        # every UseCase in a process pool, one report: see scenarios.py
+        _report = __import__('scenarios').run(__file__, table='decorators')
+        tracing.echo(_report.format())
+        exit(0 if _report.ok else 1)
     try:
         _launcher()
     except Exception as exc:
@@ -0,0 +1,134 @@
+"""
+Classes built at runtime (type(name, bases, ns)), registered under stable names so that their instances
+can be pickled - e.g. sent to and back from ProcessPoolExecutor workers.
+
+pickle stores a class by reference (module + qualified name) and then has to find it by importing;
+a class made by type() inside a function, or in a script which isn't importable, can't be found.
+Here, instances of a registered class are reduced to:
+
+    dynamic.restore(<stable name>, <recipe>), <instance __dict__>
+
+or, for instances with slots, <(instance __dict__ or None, {slot: value})> - the state pickle's default
+protocol builds too, so unpickling sets the slots back (set slots only; '__frozen__' last).
+
+The receiving process looks the name up in its own registry: the class is built (by the recipe)
+at most once per process, and every further instance only costs a dict lookup.
+A recipe is (builder name, args): a function registered with @builder which returns the class.
+Classes among the args are given as name_of(cls) - their stable name when they have one - and
+the builder resolve()-s them back, so classes of scripts which aren't importable can take part.
+
+The process unpickling has to have the same builders and named classes registered, i.e. run the same
+code first: it does with the 'fork' start method; otherwise use the executor's initializer.
+
+What it costs (python -m benchmarks.pickling, 30k instances, 4 workers): pickled in batches, the name and
+recipe are memoized and an instance takes ~21 bytes, against ~19 for the manual (name, __dict__) pairs;
+pickled one by one, ~174 bytes. Round trips run at 75-95k instances/s, the manual pairs at 150-160k/s:
+convenience, not speed.
+"""
+import copyreg
+import weakref
+
+_classes = weakref.WeakValueDictionary()  # stable name -> class, which holds (name, recipe) as __dynamic__
+_builders = {}                            # builder name -> function(*args) returning a class
+
+
+def builder(name):
+    """
+    Register the decorated function under name, for recipes to build classes with.
+    """
+    def register_builder(func):
+        _builders[name] = func
+        return func
+    return register_builder
+
+
+def register(cls, name, recipe=None):
+    """
+    Make instances of cls picklable under name. Without a recipe, cls can't be rebuilt in a process
+    which didn't register it itself. Returns cls.
+    """
+    _classes[name] = cls
+    # type.__setattr__: the point is to add the hook, not to notify the class' metaclass about it
+    type.__setattr__(cls, '__dynamic__', (name, recipe))
+    type.__setattr__(cls, '__reduce__', reduce)
+    return cls
+
+
+def name_of(cls):
+    """
+    The stable name of cls, or cls itself when it has none.
+    """
+    registered = cls.__dict__.get('__dynamic__')
+    return registered[0] if registered else cls
+
+
+def resolve(ref):
+    """
+    The class a (stable name or class) reference given by name_of() stands for.
+    """
+    if isinstance(ref, str):
+        try:
+            return _classes[ref]
+        except KeyError:
+            raise LookupError('no class registered as %r in this process' % ref) from None
+    return ref
+
+
+def _slot_state(obj, cls):
+    """
+    {slot name: value} of the slots set on obj, along cls' MRO.
+    """
+    state = {}
+    for klass in cls.__mro__:
+        for name in klass.__dict__.get('__slots__', ()):
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_%s%s' % (klass.__name__.lstrip('_'), name)  # mangled, like the slot itself
+            # a slot with a class-level default (instruction 'slots') is wrapped: read the slot itself
+            descriptor = klass.__dict__.get(name)
+            member = getattr(descriptor, 'member', descriptor)
+            try:
+                state[name] = member.__get__(obj, cls)
+            except AttributeError:
+                pass  # unset
+    if '__frozen__' in state:
+        # restored last: a frozen instance refuses any setattr after it
+        state['__frozen__'] = state.pop('__frozen__')
+    return state
+
+
+def reduce(self):
+    cls = type(self)
+    # looked up in cls' own namespace: subclasses inherit __dynamic__ but aren't registered by it
+    registered = cls.__dict__.get('__dynamic__')
+    state = getattr(self, '__dict__', None) or None
+    slots = _slot_state(self, cls)
+    if slots:
+        state = state, slots
+    if registered is None:
+        # not registered itself: the default protocol-2 reduction
+        return copyreg.__newobj__, (cls,), state
+    return restore, registered, state
+
+
+def restore(name, recipe):
+    """
+    A bare instance (neither __new__ nor __init__ run, as usual for unpickling) of the class registered
+    as name, which is built by its recipe first if this process hasn't registered it yet.
+    """
+    cls = _classes.get(name)
+    if cls is None:
+        if recipe is None:
+            raise LookupError('no class registered as %r in this process, and no recipe to build it' % name)
+        builder_name, args = recipe
+        try:
+            build = _builders[builder_name]
+        except KeyError:
+            raise LookupError('no builder %r registered in this process' % builder_name) from None
+        cls = build(*args)
+    return object.__new__(cls)
+
+
+def stats():
+    return {'classes': len(_classes), 'builders': len(_builders)}
@@ -0,0 +1,323 @@
+"""
+Bulk creation of Meta classes out of a table of specs (Meta.build_family):
+
+    family = Meta.build_family(families.read_json_lines(open('schema.jsonl')),
+                               configs={'record': dict(attr_list='_attrs', instruction='slots')},
+                               lazy=True)
+    family['Point'], family.get('Line'), len(family), family.stats()
+
+A spec is a dict:
+    name      - the class name, unique within the family
+    bases     - names of classes built earlier in the family (or given as classes=), or classes; default object
+    attrs     - the class namespace (what a class body would write)
+    config    - an instruction config (see instructions.py), or the name of one given as configs=
+    mixin     - a mixin dict, or the name of one given as mixins=
+    ...and any other Meta class keyword (pool, specialize, lazy, track, chain), which
+    override the family-wide ones given to build_family.
+
+Every spec is validated before any class is built: names, bases, configs (an invalid one is reported
+with the spec's name), the MRO and the metaclass of each distinct tuple of bases - classes of the family
+are stood for by their names then, a conflict in the last spec raises before the first class exists.
+Configs and mixins equal by value - keys in any order, values of the same types - are made one object
+(inline dicts out of JSON lines or CSV are all distinct otherwise), so each distinct config is compiled
+once, and its Plan is what Meta is given. Per class, only its namespace is put together and the
+metaclass is called.
+
+It is not faster than class statements: the classes are created by the very same Meta calls, and
+validating the table first costs on top. Timed whole (python -m benchmarks.families), it builds about
+nine tenths as many classes per second as a loop of class statements with named configs and mixins,
+two thirds as many with inline ones. stats() times the whole build_family call.
+"""
+import csv
+import json
+import time
+
+import flyweights
+import instructions
+import lazy
+import tracing
+
+trace = tracing.get_tracer('metaclasses')
+
+KEYWORDS = ('pool', 'specialize', 'lazy', 'track', 'chain')
+_FIELDS = frozenset(('name', 'bases', 'attrs', 'config', 'mixin') + KEYWORDS)
+_CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+def read_json_lines(lines):
+    """
+    Specs out of JSON lines (a stream or any iterable of lines); blank lines are skipped.
+    """
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _cell(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def read_csv(stream):
+    """
+    Specs out of CSV rows with a header: name, bases (space separated), config and mixin (names of
+    shared ones), the Meta keywords; every other column is a class attribute. Cells holding JSON
+    (numbers, true, lists...) are decoded, empty cells are left out.
+    """
+    for row in csv.DictReader(stream):
+        spec, attrs = {'attrs': {}}, {}
+        for column, value in row.items():
+            if value is None or value == '':
+                continue
+            if column == 'bases':
+                spec['bases'] = value.split()
+            elif column in ('name', 'config', 'mixin'):
+                spec[column] = value
+            elif column in KEYWORDS:
+                spec[column] = _cell(value)
+            else:
+                attrs[column] = _cell(value)
+        spec['attrs'] = attrs
+        yield spec
+
+
+class Family(object):
+    """
+    The classes of a family by name, in the order they were built.
+    """
+    def __init__(self):
+        self._classes = {}
+        self.seconds = 0.0
+        self.plans = self.mixins = self.bases = 0
+
+    def __getitem__(self, name):
+        try:
+            return self._classes[name]
+        except KeyError:
+            raise LookupError('no class %r in this family' % (name,)) from None
+
+    def get(self, name, default=None):
+        return self._classes.get(name, default)
+
+    def __contains__(self, name):
+        return name in self._classes
+
+    def __iter__(self):
+        return iter(self._classes)
+
+    def __len__(self):
+        return len(self._classes)
+
+    def items(self):
+        return self._classes.items()
+
+    def stats(self):
+        return {'classes': len(self._classes), 'seconds': self.seconds,
+                'classes_per_second': len(self._classes) / self.seconds if self.seconds else 0.0,
+                'plans': self.plans, 'mixins': self.mixins, 'bases': self.bases}
+
+    def __repr__(self):
+        return '<Family of %d classes>' % len(self._classes)
+
+
+class _Shared(object):
+    """
+    One object per distinct value: by identity first, then by value and type (flyweights.typed_key:
+    1, 1.0 and True stay apart). A value holding anything unhashable is only ever shared by identity.
+    """
+    def __init__(self, named, kind):
+        self.named, self.kind = named, kind
+        self._by_id, self._by_value = {}, {}  # id -> (value, shared): the value is kept, its id stays its own
+        self.distinct = set()
+
+    def __call__(self, spec_name, value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                shared = self.named[value]
+            except KeyError:
+                raise LookupError('%s: no %s named %r' % (spec_name, self.kind, value)) from None
+            self.distinct.add(id(shared))
+            return shared
+        if not isinstance(value, dict):
+            raise ValueError('%s: %s must be a dict or a name, not %r' % (spec_name, self.kind, value))
+        cached = self._by_id.get(id(value))
+        if cached is None:
+            try:
+                shared = self._by_value.setdefault(self._key(value), value)
+            except TypeError:
+                shared = value
+            cached = self._by_id[id(value)] = value, shared
+            self.distinct.add(id(shared))
+        return cached[1]
+
+    @staticmethod
+    def _key(value):
+        if any(isinstance(v, _CONTAINERS) for v in value.values()):
+            return flyweights.typed_key(value)
+        # flat values, like most mixins: type-exact in one pass, without the recursion
+        return frozenset((k, type(v), v) for k, v in value.items())
+
+
+class _Derived(object):
+    """
+    Stands for the metaclass Meta.__new__ derives for a specialized class (specialize=True, or derived
+    from one) before it exists: all that is known of it is that it derives from parent, and nothing else does.
+    """
+    __slots__ = ('parent', '__name__')
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.__name__ = parent.__name__ if _specialized(parent) else 'Specialized%s' % parent.__name__
+
+
+def _specialized(metaclass):
+    return type(metaclass) is _Derived or metaclass.__dict__.get('_specialized', False)
+
+
+def _derives(candidate, base):
+    while type(candidate) is _Derived:
+        if candidate is base:
+            return True
+        candidate = candidate.parent
+    return type(base) is not _Derived and issubclass(candidate, base)
+
+
+def _name(base):
+    return base if isinstance(base, str) else base.__name__
+
+
+def linearize(bases, mro_of=None):
+    """
+    The C3 linearization of a class with these bases (without the class itself); TypeError if there's none.
+    mro_of(base) gives the MRO of a base, base.__mro__ by default: bases may stand for classes not built yet.
+    """
+    sequences = [list(mro_of(base) if mro_of else base.__mro__) for base in bases] + [list(bases)]
+    result = []
+    while True:
+        sequences = [sequence for sequence in sequences if sequence]
+        if not sequences:
+            return result
+        for sequence in sequences:
+            head = sequence[0]
+            if not any(head in other[1:] for other in sequences):
+                break
+        else:
+            raise TypeError('Cannot create a consistent method resolution order (MRO) for bases %s'
+                            % ', '.join(map(_name, bases)))
+        result.append(head)
+        for sequence in sequences:
+            if sequence[0] is head:
+                del sequence[0]
+
+
+def metaclass_for(mcs, metaclasses):
+    """
+    The most derived metaclass among mcs and metaclasses (those of the bases), like a class statement
+    picks it. A metaclass may be one still to be derived (_Derived).
+    """
+    winner = mcs
+    for candidate in metaclasses:
+        if _derives(winner, candidate):
+            continue
+        if _derives(candidate, winner):
+            winner = candidate
+        else:
+            raise TypeError('metaclass conflict: %s and %s' % (winner.__name__, candidate.__name__))
+    return winner
+
+
+def build(mcs, specs, classes=None, configs=None, mixins=None, module='families', **defaults):
+    """
+    Build a Family out of specs (dicts, see read_json_lines and read_csv), see Meta.build_family.
+    """
+    started = time.perf_counter()
+    unknown = set(defaults) - set(KEYWORDS)
+    if unknown:
+        raise ValueError('unknown family-wide keywords %s' % ', '.join(sorted(unknown)))
+    shared_config = _Shared(configs or {}, 'config')
+    shared_mixin = _Shared(mixins or {}, 'mixin')
+    known = dict(classes or {}, object=object)
+
+    # 1. validate every spec and resolve its shared pieces, before any class is built: classes of the
+    # family are stood for by their names, with the MRO and the metaclass they will have
+    rows, names, keywords_of, plans = [], set(), {}, {}
+    bases_of, metaclasses, resolved = {}, {}, {}  # per name its bases and metaclass; per bases (MRO, metaclass)
+    mro_of = lambda base: [base] + resolved[bases_of[base]][0] if isinstance(base, str) else base.__mro__
+    for spec in specs:
+        name = spec.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError('a spec needs a name, got %r' % (spec,))
+        unknown = spec.keys() - _FIELDS
+        if unknown:
+            raise ValueError('%s: unknown spec keys %s' % (name, ', '.join(sorted(unknown))))
+        if name in names:
+            raise ValueError('%s: defined twice in the family' % name)
+        bases = tuple(spec.get('bases') or ('object',))
+        for base in bases:
+            if isinstance(base, str) and (base == name or base not in names) and base not in known:
+                raise LookupError('%s: base %r is neither given nor built earlier in the family' % (name, base))
+        names.add(name)
+        # a name of the family stays a name, a given class is the class (complete, if it was lazy)
+        bases = tuple(known[base] if isinstance(base, str) and base not in bases_of else base for base in bases)
+        config = shared_config(name, spec.get('config'))
+        plan = plans.get(id(config))  # shared_config keeps config alive: its id stays its own
+        if plan is None:
+            try:
+                plan = plans[id(config)] = instructions.plan_for(config)
+            except ValueError as exc:
+                raise ValueError('%s: %s' % (name, exc)) from None
+        mixin = shared_mixin(name, spec.get('mixin'))
+        keywords = dict(defaults, **{k: spec[k] for k in KEYWORDS if k in spec})
+        checked = resolved.get(bases)
+        if checked is None:
+            for base in bases:
+                if not isinstance(base, str):
+                    lazy.finalize(base)
+            try:
+                checked = resolved[bases] = (linearize(bases, mro_of), metaclass_for(
+                    mcs, [metaclasses[base] if isinstance(base, str) else type(base) for base in bases]))
+            except TypeError as exc:
+                raise TypeError('%s: %s' % (name, exc)) from None
+        bases_of[name] = bases
+        # Meta.__new__ derives a metaclass of its own for a specialized class, see metaclasses.py
+        metaclasses[name] = (_Derived(checked[1]) if keywords.get('specialize') or _specialized(checked[1])
+                             else checked[1])
+        if config is not None:
+            keywords['config'] = plan  # compiled once here, Meta.__new__ takes it as it is
+        if mixin is not None:
+            keywords['mixin'] = mixin
+        # one keywords dict per distinct combination, shared by the calls
+        key = tuple(sorted((k, id(v) if isinstance(v, dict) else v) for k, v in keywords.items()))
+        keywords = keywords_of.setdefault(key, keywords)
+        rows.append((name, bases, spec.get('attrs') or {}, mixin, keywords))
+
+    # 2. build: per class, a namespace and one metaclass call
+    family, winners = Family(), {}
+    family.plans, family.mixins = len(shared_config.distinct), len(shared_mixin.distinct)
+    for name, base_names, attrs, mixin, keywords in rows:
+        bases = tuple(family._classes[base] if isinstance(base, str) else base for base in base_names)
+        checked = winners.get(bases)
+        if checked is None:
+            for base in bases:
+                lazy.finalize(base)
+            # checked in 1., only the metaclasses derived meanwhile are new
+            checked = winners[bases] = metaclass_for(mcs, map(type, bases))
+        if mixin is None or keywords.get('lazy') and lazy.can_defer(checked, keywords):
+            # a lazy class gets its mixin when finalized (lazy.py)
+            namespace = dict(attrs)
+        else:
+            # what __prepare__ would have returned, and the class body written into
+            namespace = dict(mixin)
+            namespace.update(attrs)
+        namespace.setdefault('__module__', module)
+        namespace.setdefault('__qualname__', name)
+        family._classes[name] = checked(name, bases, namespace, **keywords)
+    family.seconds = time.perf_counter() - started
+    family.bases = len(winners)
+    trace('  Meta.build_family built %d classes in %.6fs (%d plans, %d mixins, %d distinct bases)',
+          len(family), family.seconds, family.plans, family.mixins, family.bases)
+    return family
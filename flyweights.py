@@ -0,0 +1,206 @@
+"""
+Interning of payloads passed as alternative_instance to the xClass examples.
+
+xClass.__new__ returns alternative_instance as it is, skipping __init__. When the same few payloads
+(dicts of config) come in over and over, each one stays alive on its own and downstream code can only
+compare them by value. With interning on:
+
+    flyweights.alternatives.enabled = True
+
+an equal dict payload always comes back as ONE shared, frozen object:
+    xClass('a', alternative_instance={'key': 'value'}) is xClass('b', alternative_instance={'key': 'value'})
+
+Freezing is recursive: dict -> FrozenDict, list -> tuple, set -> frozenset. Payloads are equal when their
+values are equal AND of the same types, all the way down ({'flag': 1} and {'flag': True} stay apart, like
+in Values below). Payloads holding anything unhashable after freezing are returned untouched. The table holds its objects weakly:
+a payload nobody uses anymore is dropped from it.
+
+Values does the same for instances of Meta classes created with instruction 'hashcons' (instructions.py).
+"""
+import threading
+import weakref
+
+
+class FrozenDict(dict):
+    """
+    A read-only, hashable dict (still a dict for isinstance, printing and comparison).
+    """
+    __slots__ = ('_hash', '__weakref__')
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('%s is frozen' % type(self).__name__)
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+# hashable, with nothing inside to type: typed_key keys them as they are
+SCALARS = frozenset((str, int, float, bool, bytes, complex, type(None)))
+
+
+def typed_key(value):
+    """
+    A hashable key, equal for equal values of the same types only, all the way down: 1, 1.0 and True,
+    or [1] and (1,), stay apart. TypeError when value holds anything unhashable.
+    """
+    kind = type(value)
+    if kind in SCALARS:
+        return kind, value
+    if isinstance(value, dict):
+        return type(value), frozenset((k, typed_key(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(map(typed_key, value))
+    if isinstance(value, (set, frozenset)):
+        return type(value), frozenset(map(typed_key, value))
+    hash(value)
+    return type(value), value
+
+
+class Flyweights(object):
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._table = weakref.WeakValueDictionary()
+        self.requests = self.shared = self.unhashable = 0
+
+    def intern(self, value):
+        """
+        The canonical object equal to a dict payload (a frozen copy of it the first time).
+        Anything else, and everything while interning is off, is returned as it is.
+        """
+        if not self.enabled or not isinstance(value, dict):
+            return value
+        self.requests += 1
+        frozen = freeze(value)
+        try:
+            # the key must not be the frozen object itself, or the table would keep it alive forever
+            key = typed_key(frozen)
+        except TypeError:
+            self.unhashable += 1
+            return value
+        canonical = self._table.get(key)
+        if canonical is not None:
+            self.shared += 1
+            return canonical
+        self._table[key] = frozen
+        return frozen
+
+    def stats(self):
+        return {'requests': self.requests, 'shared': self.shared, 'unhashable': self.unhashable,
+                'alive': len(self._table),
+                'dedup_ratio': self.shared / self.requests if self.requests else 0.0}
+
+
+# the table both xClass examples intern their alternative_instance payloads with
+alternatives = Flyweights()
+
+
+class Values(object):
+    """
+    Weak hash-consing table of a value class: constructing a value equal to one still alive returns that one.
+
+    An instance's value is its type, the fields of the attr list and whatever else __init__ put into its
+    __dict__, typed all the way down (typed_key: 1 and 1.0, or (1,) and (True,), stay apart). Calls are
+    also remembered by their arguments (typed the same way), so a repeated call returns the instance without
+    even allocating - which assumes, as a value class does, that equal arguments always construct equal
+    values. Instances whose value is unhashable (a list in a field included: it could change under the
+    table), and whatever __new__ returns instead of an instance, are returned as they are.
+    """
+    def __init__(self, cls, fields):
+        self.cls, self.fields = cls, tuple(fields)
+        self._by_value = weakref.WeakValueDictionary()
+        self._by_args = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.requests = self.hits = self.shared = self.unhashable = 0
+
+    def value(self, obj):
+        values = tuple([getattr(obj, name) for name in self.fields])
+        extra = ()
+        instance_dict = getattr(obj, '__dict__', None)
+        if instance_dict:
+            extra = tuple(sorted((k, v) for k, v in instance_dict.items()
+                                 if not k.startswith('__') and k not in self.fields))
+            values += tuple(v for _, v in extra)
+        hash(values)  # typed_key would take a list, an instance holding one isn't a value
+        return type(obj), tuple(k for k, _ in extra), typed_key(values)
+
+    def construct(self, call, cls, args, kwargs):
+        """
+        (instance, created): the canonical instance for call(*args, **kwargs), created is false when
+        an existing one was returned.
+        """
+        self.requests += 1
+        values = args + tuple(kwargs.values()) if kwargs else args
+        types = tuple(map(type, values))
+        try:
+            # scalars are keyed as they are, with their types (like memo.Memo.key), the rest by typed_key
+            key = ((cls, values, tuple(kwargs), types) if SCALARS.issuperset(types)
+                   else (cls, tuple(kwargs), typed_key(values)))
+        except TypeError:
+            key = obj = None
+        else:
+            # a hit takes no lock (like memo.Memo): one dict lookup, no allocation of an instance
+            obj = self._by_args.get(key)
+        if obj is not None:
+            self.hits += 1
+            return obj, False
+
+        obj = call(*args, **kwargs)
+        if not isinstance(obj, self.cls):
+            return obj, True
+        try:
+            value = self.value(obj)
+            hashed = hash(value)
+        except TypeError:
+            self.unhashable += 1
+            return obj, True
+        with self._lock:
+            canonical = self._by_value.get(value)
+            if canonical is None:
+                object.__setattr__(obj, '__hash_value__', hashed)
+                # frozen before any other caller can get it (Meta.__call__ would, a moment later)
+                object.__setattr__(obj, '__frozen__', True)
+                self._by_value[value] = canonical = obj
+            else:
+                self.shared += 1
+            if key is not None:
+                self._by_args[key] = canonical
+        return canonical, canonical is obj
+
+    def stats(self):
+        deduplicated = self.hits + self.shared
+        return {'requests': self.requests, 'hits': self.hits, 'shared': self.shared, 'unhashable': self.unhashable,
+                'alive': len(self._by_value),
+                'dedup_ratio': deduplicated / self.requests if self.requests else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._by_value.clear()
+            self._by_args.clear()
+            self.requests = self.hits = self.shared = self.unhashable = 0
+
+
+def values_of(cls):
+    values = cls.__values__
+    if values is None:
+        raise TypeError("%s was not created with instruction 'hashcons'" % cls.__name__)
+    return values
@@ -0,0 +1,322 @@
+"""
+Class-construction instructions, applied by Meta.__new__ to the namespace of a class being created:
+
+    class Record(metaclass=Meta, config=dict(attr_list='_attrs', instruction=('defaults', 'freeze'),
+                                             defaults={'A': 1})):
+        _attrs = ['A', 'B']
+
+'instruction' is a name or a sequence of names:
+    nullify       - elements of the attr list become class attributes with value 0
+    defaults      - class attributes from the config's 'defaults' mapping
+    slots         - the attr list becomes __slots__, with class-level defaults (see SlotDefault)
+    columns       - the attr list is stored column-wise, per class (see columns.py)
+    intern        - string constants of the namespace are sys.intern()-ed
+    drop_private  - _single_underscore names are removed from the namespace
+    freeze        - instances become read-only once constructed: Meta.__call__ marks them after the outermost
+                    __init__ has returned, so subclass __init__s may still set attributes after super().__init__()
+    hashcons      - value classes (implies freeze): an instance equal to one still alive is never created
+                    again, the existing one is returned instead (see flyweights.Values). Its hash is
+                    computed once, equality stays object identity unless the class defines __eq__.
+
+Instructions working on the attr list (nullify, slots, columns) need an 'attr_list' in the config. A class whose
+namespace doesn't hold that list (e.g. one more class created with the same config) gets the other steps only.
+
+A config is parsed and validated ONCE into a Plan, cached by the config's contents (a typed copy of them, see
+flyweights.typed_key), so that creating many classes out of equal configs - the same dict or a new one each
+time - only replays the plan. A config changed after use gets a plan of its own. The cache keeps the
+PLAN_CACHE_SIZE most recently used plans; configs holding unhashable values are compiled every time.
+The config object passed again (a class keyword shared by many classes) is recognized by identity first,
+and only compared with the plan's copy of it - equal values, same types - instead of being keyed again.
+A Plan given as the config is taken as it is (Meta.build_family compiles each distinct config once).
+"""
+import array
+import collections
+import sys
+import time
+
+import columns
+import flyweights
+
+
+class SlotDefault(object):
+    """
+    Wraps the member descriptor type.__new__ creates for a slot, so that an unset slot reads as its
+    class-level default (like a 'nullify'-ed class attribute would) instead of raising AttributeError.
+    """
+    __slots__ = ('member', 'default')
+
+    def __init__(self, member, default):
+        self.member, self.default = member, default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        try:
+            return self.member.__get__(instance, owner)
+        except AttributeError:
+            return self.default
+
+    def __set__(self, instance, value):
+        self.member.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.member.__delete__(instance)
+
+
+#### instructions: (namespace step, class step), either may be None
+#### namespace steps run on attrs before type.__new__, class steps on the created class
+########################
+
+def _nullify(config, attrs, state):
+    attrs.update(dict.fromkeys(state['fields'], 0))
+
+
+def _defaults(config, attrs, state):
+    attrs.update(config['defaults'])
+
+
+def _slots(config, attrs, state):
+    # A slot and a class attribute can't share a name, so defaults (0, or a value the class body,
+    # mixin or a previous instruction assigned to that name) are taken out of attrs for SlotDefault.
+    state['slot_defaults'] = {k: attrs.pop(k, 0) for k in state['fields']}
+    attrs['__slots__'] = tuple(state['fields'])
+
+
+def _install_slot_defaults(config, cls, state):
+    for k, default in state['slot_defaults'].items():
+        setattr(cls, k, SlotDefault(cls.__dict__[k], default))
+
+
+def _columns(config, attrs, state):
+    state['column_defaults'] = {k: attrs.pop(k, 0) for k in state['fields']}
+    attrs['__slots__'] = ('_row',)
+
+
+def _install_columns(config, cls, state):
+    typecodes = config.get('columns', {})
+    defaults = state['column_defaults']
+    store = columns.ColumnStore(cls, defaults, {k: typecodes.get(k) for k in defaults})
+    setattr(cls, '__store__', store)
+    for k in defaults:
+        setattr(cls, k, columns.ColumnField(k, store))
+    columns.release_rows(cls, store)
+
+
+def _intern(config, attrs, state):
+    for k, v in attrs.items():
+        if type(v) is str:
+            attrs[k] = sys.intern(v)
+
+
+def _drop_private(config, attrs, state):
+    for k in [k for k in attrs if k.startswith('_') and not k.startswith('__')]:
+        del attrs[k]
+
+
+def _frozen_setattr(self, name, value):
+    if hasattr(self, '__frozen__'):
+        raise AttributeError('%s instance is frozen, can not set %r' % (type(self).__name__, name))
+    object.__setattr__(self, name, value)
+
+
+def _frozen_delattr(self, name):
+    if hasattr(self, '__frozen__'):
+        raise AttributeError('%s instance is frozen, can not delete %r' % (type(self).__name__, name))
+    object.__delattr__(self, name)
+
+
+def _freeze(config, attrs, state):
+    if '__slots__' in attrs:
+        attrs['__slots__'] += ('__frozen__',)
+    attrs['__setattr__'], attrs['__delattr__'] = _frozen_setattr, _frozen_delattr
+
+
+def _mark_frozen(config, cls, state):
+    # inherited: instances of subclasses are frozen as well
+    type.__setattr__(cls, '__freeze__', True)
+
+
+def _cached_hash(self):
+    try:
+        return self.__hash_value__
+    except AttributeError:
+        raise TypeError('unhashable %s instance: its value is unhashable' % type(self).__name__) from None
+
+
+def _hashcons(config, attrs, state):
+    if '__slots__' in attrs:
+        attrs['__slots__'] += ('__hash_value__',)
+        if not any(base.__weakrefoffset__ for base in state['bases']):
+            attrs['__slots__'] += ('__weakref__',)
+    attrs.setdefault('__hash__', _cached_hash)
+
+
+def _install_values(config, cls, state):
+    # without an attr list, an instance's value is its __dict__ alone
+    type.__setattr__(cls, '__values__', flyweights.Values(cls, state.get('fields', ())))
+
+
+# name: (phase, needs the attr list, namespace step, class step)
+# Steps run ordered by phase (stable, so the configured order decides within a phase):
+# values are set before slots take them out of the namespace, and freeze comes last.
+INSTRUCTIONS = {
+    'nullify':      (0, True, _nullify, None),
+    'defaults':     (0, False, _defaults, None),
+    'slots':        (1, True, _slots, _install_slot_defaults),
+    'columns':      (1, True, _columns, _install_columns),
+    'intern':       (2, False, _intern, None),
+    'drop_private': (2, False, _drop_private, None),
+    'freeze':       (3, False, _freeze, _mark_frozen),
+    'hashcons':     (4, False, _hashcons, _install_values),
+}
+
+
+class Plan(object):
+    """
+    A validated, ordered list of instruction steps for one config.
+    """
+    def __init__(self, config):
+        # a copy (nested dicts and lists too): plans are shared by equal configs, whatever happens to this one later
+        config = self.config = {k: type(v)(v) if type(v) in (dict, list) else v for k, v in config.items()}
+        self.attr_list = config.get('attr_list')
+        names = config.get('instruction') or ()
+        names = (names,) if isinstance(names, str) else tuple(names)
+        for name in names:
+            if name not in INSTRUCTIONS:
+                raise ValueError('unknown class creation instruction %r, expected one of %s'
+                                 % (name, ', '.join(sorted(INSTRUCTIONS))))
+        if 'hashcons' in names and 'freeze' not in names:
+            # a shared instance must not change under the feet of the others holding it
+            names += ('freeze',)
+        on_fields = [name for name in names if INSTRUCTIONS[name][1]]
+        if on_fields and not self.attr_list:
+            raise ValueError("instruction %r works on the attr list: config needs an 'attr_list'" % on_fields[0])
+        if 'defaults' in names and not isinstance(config.get('defaults'), dict):
+            raise ValueError("instruction 'defaults' requires a 'defaults' mapping in config")
+        if 'slots' in names and 'columns' in names:
+            raise ValueError("instructions 'slots' and 'columns' exclude each other")
+        for field, typecode in config.get('columns', {}).items():
+            if typecode not in array.typecodes:
+                raise ValueError('column %r: %r is not an array typecode' % (field, typecode))
+
+        steps = sorted((INSTRUCTIONS[name] for name in names), key=lambda instruction: instruction[0])
+        self.names = names
+        self.needs_fields = any(needs_fields for _, needs_fields, _, _ in steps)
+        self.namespace_steps = tuple(step for _, _, step, _ in steps if step)
+        self.class_steps = tuple(step for _, _, _, step in steps if step)
+        # for a class without the attr list: only the steps which don't work on it
+        self.fieldless_steps = (tuple(step for _, needs_fields, step, _ in steps if step and not needs_fields),
+                                tuple(step for _, needs_fields, _, step in steps if step and not needs_fields))
+
+    def apply(self, attrs, bases=()):
+        """
+        Run namespace steps on attrs (in place). Returns the state class steps will need.
+        """
+        state = {'bases': bases}
+        steps = self.namespace_steps
+        if self.needs_fields:
+            if self.attr_list in attrs:
+                state['fields'] = list(attrs.pop(self.attr_list))
+            else:
+                # like before, the instructions working on the attr list are skipped without one - only those
+                steps = self.fieldless_steps[0]
+        for step in steps:
+            step(self.config, attrs, state)
+        return state
+
+    def finish(self, cls, state):
+        steps = self.class_steps if 'fields' in state or not self.needs_fields else self.fieldless_steps[1]
+        for step in steps:
+            step(self.config, cls, state)
+        return cls
+
+    def __repr__(self):
+        return '<Plan %s>' % (', '.join(self.names) or 'empty')
+
+
+EMPTY_PLAN = Plan({})
+
+PLAN_CACHE_SIZE = 1024
+_plans = collections.OrderedDict()  # config_key(config) -> plan, least recently used first
+_seen = collections.OrderedDict()   # id(config) -> (config, plan): kept alive, so its id stays its own
+stats = {'classes': 0, 'seconds': 0.0, 'plans_compiled': 0, 'plans_reused': 0}
+
+
+def config_key(config):
+    """
+    The contents of config as a hashable key (instruction names normalized to a tuple), None if it holds
+    anything unhashable.
+    """
+    names = config.get('instruction') or ()
+    names = (names,) if isinstance(names, str) else tuple(names)
+    try:
+        return names, flyweights.typed_key({k: v for k, v in config.items() if k != 'instruction'})
+    except TypeError:
+        return None
+
+
+def _unchanged(config, copy):
+    """
+    Whether config still holds what copy (Plan.config) was taken from: equal values of the same types.
+    """
+    if config != copy:
+        return False
+    for k, v in config.items():
+        other = copy[k]
+        if type(v) is not type(other):
+            return False
+        if type(v) is dict:
+            for n, x in v.items():
+                if type(x) is not type(other[n]):
+                    return False
+    return True
+
+
+def plan_for(config):
+    if type(config) is Plan:
+        return config
+    if not config:
+        return EMPTY_PLAN
+    seen = _seen.get(id(config))
+    if seen is not None and _unchanged(config, seen[1].config):
+        stats['plans_reused'] += 1
+        return seen[1]
+    plan = _plan_by_key(config)
+    _seen[id(config)] = config, plan
+    while len(_seen) > PLAN_CACHE_SIZE:
+        _seen.popitem(last=False)
+    return plan
+
+
+def _plan_by_key(config):
+    key = config_key(config)
+    plan = _plans.get(key) if key is not None else None
+    if plan is not None:
+        stats['plans_reused'] += 1
+        try:
+            _plans.move_to_end(key)
+        except KeyError:
+            pass  # evicted by another thread meanwhile, the plan itself is still valid
+        return plan
+    plan = Plan(config)
+    stats['plans_compiled'] += 1
+    if key is not None:
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def record_creation(started):
+    """
+    Account for one class created since perf_counter() returned 'started'.
+    """
+    stats['classes'] += 1
+    stats['seconds'] += time.perf_counter() - started
+
+
+def throughput():
+    """
+    Classes created per second of Meta.__new__.
+    """
+    return stats['classes'] / stats['seconds'] if stats['seconds'] else 0.0
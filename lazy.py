@@ -0,0 +1,136 @@
+"""
+Lazy class finalization for Meta (class keyword lazy=True).
+
+A module defining hundreds of Meta classes pays, at import, for every mixin merge, instruction plan and
+diagnostic line, even for classes the process never uses. A lazy class is created bare instead:
+its own class body only. It is then finalized - mixin merged in (the class body still wins),
+config instructions applied, diagnostics traced - at its first use:
+    - instantiation
+    - any attribute looked up on the class
+    - a subclass being created
+
+Until then it is an instance of a Lazy<Metaclass> subclass, whose __call__ and __getattribute__
+finalize it and turn it back into an instance of the real metaclass, so nothing is left to pay afterwards.
+
+Instructions which decide the layout of instances (slots, columns), the pool/specialize keywords and
+specialized bases need the class to be complete at creation: classes using them are never lazy. Neither are
+classes whose body declares __slots__ when freeze or hashcons would add slots of their own to them.
+The class body of a lazy class does not see names coming from the mixin.
+
+Finalization takes a lock, and the class only turns into an instance of the real metaclass once it is
+complete: another thread using the class meanwhile waits for it instead of seeing it half-built.
+"""
+import threading
+import time
+import weakref
+
+import instructions
+import tracing
+from tracing import Lazy
+
+# finalization is part of creating a Meta class: traced (and silenced) with Meta's own diagnostics
+trace = tracing.get_tracer('metaclasses')
+
+_pending = weakref.WeakKeyDictionary()  # lazy cls -> (metaclass to become, mixin, plan)
+_lazy_metaclasses = {}                  # metaclass -> its Lazy subclass
+_EAGER_INSTRUCTIONS = {'slots', 'columns'}
+_SLOT_INSTRUCTIONS = {'freeze', 'hashcons'}  # they add to a __slots__ the class body declares
+_lock = threading.RLock()
+_finalizing = set()  # classes being finalized, by the thread holding _lock
+
+
+def can_defer(mcs, configs, attrs=None, plan=None):
+    """
+    Whether a class created with these keywords can be lazy. With attrs (its namespace; __prepare__
+    doesn't have it yet), whether the class body allows it too. plan: the one of configs['config'],
+    when the caller has it already.
+    """
+    if configs.get('pool') or configs.get('specialize') or mcs.__dict__.get('_specialized'):
+        return False
+    if plan is None:
+        plan = instructions.plan_for(configs.get('config'))
+    if attrs is not None and '__slots__' in attrs and _SLOT_INSTRUCTIONS.intersection(plan.names):
+        return False
+    return not _EAGER_INSTRUCTIONS.intersection(plan.names)
+
+
+def merged(mixin, attrs):
+    """
+    The namespace __prepare__ would have given the class body, for a class it deferred that can't be lazy.
+    """
+    if not isinstance(mixin, dict):
+        return attrs
+    namespace = dict(mixin)
+    namespace.update(attrs)
+    return namespace
+
+
+def lazy_metaclass(mcs):
+    lazy_mcs = _lazy_metaclasses.get(mcs)
+    if lazy_mcs is None:
+        def __getattribute__(cls, name):
+            finalize(cls)
+            return type.__getattribute__(cls, name)
+
+        def __call__(cls, *args, **kwargs):
+            finalize(cls)
+            return cls(*args, **kwargs)
+
+        lazy_mcs = _lazy_metaclasses[mcs] = type('Lazy%s' % mcs.__name__, (mcs,), {
+            '__module__': mcs.__module__, '_eager': mcs,
+            '__getattribute__': __getattribute__, '__call__': __call__})
+    return lazy_mcs
+
+
+def eager_metaclass(mcs):
+    """
+    The metaclass a class created by (a subclass of) mcs should really get.
+    """
+    return mcs.__dict__.get('_eager', mcs)
+
+
+def defer(cls, mcs, mixin, plan):
+    # like Meta.__prepare__, anything but a dict for a mixin is ignored
+    _pending[cls] = mcs, mixin if isinstance(mixin, dict) else None, plan
+
+
+def is_pending(cls):
+    return cls in _pending
+
+
+def finalize(cls):
+    """
+    Complete a lazy class (no-op for any other class). Returns cls.
+    """
+    if cls not in _pending:
+        return cls  # no lock: a class leaves _pending once it is complete
+    with _lock:
+        entry = _pending.get(cls)
+        if entry is None or cls in _finalizing:
+            # finalized by another thread meanwhile, or looked up by this very finalization
+            return cls
+        _finalizing.add(cls)
+        try:
+            _finalize(cls, *entry)
+            # last: the class turns into a plain instance of mcs only once it is complete
+            cls.__class__ = entry[0]
+            del _pending[cls]
+        finally:
+            _finalizing.discard(cls)
+    trace('  Meta finalized lazy %s: mixin=[%s], %r', cls, Lazy(', '.join, entry[1] or ()), entry[2])
+    return cls
+
+
+def _finalize(cls, mcs, mixin, plan):
+    started = time.perf_counter()
+    own = dict(type.__getattribute__(cls, '__dict__'))
+    attrs = dict(mixin or {})
+    attrs.update(own)
+    state = plan.apply(attrs, type.__getattribute__(cls, '__bases__'))
+    for k in set(own) - set(attrs):
+        delattr(cls, k)
+    for k, v in attrs.items():
+        if k not in own or own[k] is not v:
+            setattr(cls, k, v)
+    plan.finish(cls, state)
+    instructions.record_creation(started)
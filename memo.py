@@ -0,0 +1,135 @@
+"""
+Memoization for decorator_with-arguments' cache= configuration:
+
+    @decorator(cache=True)                           # LRU of 128 results
+    @decorator(cache=dict(maxsize=1024, ttl=30.0))   # ...and results expire after 30 seconds
+    @decorator(cache=dict(maxsize=None))             # unbounded
+
+Results are keyed on the call arguments (keyword arguments in the order given, like functools.lru_cache)
+and on their types, like flyweights.Values keys its calls: f(1), f(True) and f(1.0) are three entries.
+Arguments holding containers are keyed with flyweights.typed_key, types included all the way down:
+f([1]), f([True]) and f((1,)) stay apart too, and lists, dicts and sets are hashable there. Calls whose
+arguments hold something unhashable even then run uncached.
+
+For a class, caching is instance interning: equal arguments give back THE same instance, so it only
+suits classes whose instances aren't modified afterwards. A hit still costs a key and a lookup, about a
+microsecond: it saves time only on constructors slower than that, otherwise what it saves is memory.
+A call returning something else than an instance of the class (alternative_instance) is never cached,
+and a call given alternative_instance= by keyword doesn't even look the cache up.
+
+decorated.cache.stats() and decorated.cache.clear() for the rest. Hits are looked up without a lock,
+so under heavy threading the hit count is approximate; everything else is exact.
+"""
+import collections
+import threading
+import time
+
+import flyweights
+
+_NESTED = object()  # marks keys made with typed_key
+
+
+class Memo(object):
+    def __init__(self, maxsize=128, ttl=None, clock=time.monotonic):
+        self.maxsize, self.ttl, self.clock = maxsize, ttl, clock
+        self._entries = collections.OrderedDict()  # key -> (result, expires at or None)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expired = self.uncacheable = self.bypassed = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        cache=True, cache=<maxsize> or cache={'maxsize': ..., 'ttl': ...}
+        """
+        if isinstance(config, Memo):
+            return config
+        if config is True:
+            config = {}
+        elif isinstance(config, int) and not isinstance(config, bool):
+            config = {'maxsize': config}
+        elif not isinstance(config, dict):
+            raise ValueError('cache= expects True, a maxsize or a dict(maxsize=, ttl=), not %r' % (config,))
+        unknown = set(config) - {'maxsize', 'ttl'}
+        if unknown:
+            raise ValueError('unknown cache configuration %s' % ', '.join(sorted(unknown)))
+        maxsize, ttl = config.get('maxsize', 128), config.get('ttl')
+        if maxsize is not None and (not isinstance(maxsize, int) or maxsize < 0):
+            raise ValueError('cache maxsize is a number of results >= 0, or None for no bound, not %r' % (maxsize,))
+        if ttl is not None and not ttl > 0:
+            raise ValueError('cache ttl is a number of seconds > 0, or None, not %r' % (ttl,))
+        return cls(**config)
+
+    def key(self, args, kwargs):
+        """
+        The key of a call, or None when its arguments can't make one.
+        """
+        if kwargs:
+            values, names = args + tuple(kwargs.values()), tuple(kwargs)
+        else:
+            values, names = args, ()
+        # 1 == True == 1.0 for a dict, not for the cache: the types follow the values
+        types = tuple(map(type, values))
+        if flyweights.SCALARS.issuperset(types):
+            return values, names, types  # the common call: hashable as it is, nothing nested to type
+        try:
+            return _NESTED, names, tuple(map(flyweights.typed_key, values))
+        except TypeError:
+            return None
+
+    def call(self, func, args, kwargs, keep=None):
+        """
+        func(*args, **kwargs), from the cache when possible. Results for which keep(result) is false
+        are returned but not stored.
+        """
+        key = self.key(args, kwargs)
+        if key is None:
+            with self._lock:
+                self.uncacheable += 1
+            return func(*args, **kwargs)
+
+        # a hit takes no lock (like VariantRegistry.get): one dict lookup, a clock read only with a ttl
+        entry = self._entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > self.clock()):
+            self.hits += 1
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                pass  # evicted by another thread meanwhile, the result itself is still valid
+            return entry[0]
+
+        with self._lock:
+            if entry is not None and self._entries.get(key) is entry:
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+
+        # computed outside the lock: concurrent misses on one key may both compute, the last one is kept
+        result = func(*args, **kwargs)
+        if keep is not None and not keep(result):
+            return result
+        with self._lock:
+            self._entries[key] = result, (self.clock() + self.ttl if self.ttl is not None else None)
+            self._entries.move_to_end(key)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def bypass(self, func, args, kwargs):
+        """
+        func(*args, **kwargs), neither looked up nor stored.
+        """
+        with self._lock:
+            self.bypassed += 1
+        return func(*args, **kwargs)
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'expired': self.expired,
+                'uncacheable': self.uncacheable, 'bypassed': self.bypassed, 'size': len(self._entries),
+                'maxsize': self.maxsize, 'ttl': self.ttl, 'hit_rate': self.hits / calls if calls else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expired = self.uncacheable = self.bypassed = 0
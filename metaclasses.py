@@ -1,3 +1,23 @@
+import time
+
+import chains
+import constructors
+import events
+import families
+import flyweights
+import instructions
+import lazy
+import pools
+import profiling
+import snapshots
+import tracing
+import tracking
+from tracing import DEBUG, Lazy, echo
+
+# switch off with tracing.configure('metaclasses', level=tracing.OFF) or METACLASSING_TRACE=metaclasses=off
+trace = tracing.get_tracer('metaclasses')
+
+
 class Meta(type):
     """
     By convention, when defining metaclasses cls is used rather than self
@@ -6,6 +26,15 @@ class Meta(type):
 
     cls is the class object that is being modified.
     """
+    # a class created with track= holds its own tracking.Tracker, looked up on every instantiation
+    __tracker__ = None
+    # ...and one created with instruction 'hashcons' its flyweights.Values table
+    __values__ = None
+    # ...and a hierarchy created with chain=True the chains.Chain of the class (chains.py)
+    __chain__ = None
+    # ...and one created with instruction 'freeze' (or 'hashcons') True: instances are frozen once constructed
+    __freeze__ = False
+
     @classmethod
     def __prepare__(mcs, name, bases, **configs):
         """
@@ -31,11 +60,22 @@ class Meta(type):
 
         Class decorators can not replace the default dictionary but __prepare__ could.
         __prepare__ has no effect when defined in regular classes - it isn't called.
+
+        With lazy=True the mixin is merged when the class is finalized (see lazy.py), not here.
         """
-        arguments = (mcs, name, bases, configs)
-        print("""  Meta.__prepare__(\tmcs=%s,
+        # profiling.classes.enabled: every phase of the creation is measured, see profiling.py
+        profile = profiling.classes.enabled and profiling.classes.begin()
+        # events.recorder.enabled: the lifecycle is recorded as compact records, see events.py
+        if events.recorder.enabled:
+            events.recorder.record(events.PREPARE, name)
+        if configs.get('lazy') and lazy.can_defer(mcs, configs):
+            extra_dict = {}
+            if profile:
+                profiling.classes.prepared(profile, mcs, name, extra_dict)
+            return extra_dict
+        trace("""  Meta.__prepare__(\tmcs=%s,
                    \tname=%r, bases=%s,
-                   \t**%s)""" % arguments)
+                   \t**%s)""", mcs, name, bases, configs)
         # in the long-term, mutating methods will have no effect  (__new__ gets the original *configs*)
         mixin = configs.get('mixin')  # [it's an inter-method immutable] - changes won't persist across calls
         if isinstance(mixin, dict):
@@ -44,6 +84,8 @@ class Meta(type):
         else:
             # ignoring inheritance: return {}, without calling on super()
             extra_dict = super().__prepare__(name, bases, **configs)
+        if profile:
+            profiling.classes.prepared(profile, mcs, name, extra_dict)
         return extra_dict
 
     def __new__(mcs, name, bases, attrs, **configs):
@@ -55,24 +97,80 @@ class Meta(type):
         DO NOT send *configs* to type.__new__
         It won't catch them and will raise a TypeError: type() takes 1 or 3 arguments" exception.
         """
-        arguments = (mcs, name, bases, ', '.join(attrs), configs)
-        print("""  Meta.__new__(\t\tmcs=%s,
+        profile = profiling.classes.enabled and profiling.classes.begin()
+        namespace = attrs  # what __prepare__ returned, profiling knows the class by it
+        try:
+            # a lazy base has to be complete before anything is derived from it
+            for base in bases:
+                lazy.finalize(base)
+            # ...and the metaclass derived from a lazy base's type is the Lazy variant: go back to the real one
+            requested, mcs = mcs, lazy.eager_metaclass(mcs)
+            # The config is parsed into a plan once, further classes with an equal config reuse it.
+            plan = instructions.plan_for(configs.get('config'))
+            deferred = configs.get('lazy') and lazy.can_defer(mcs, configs, plan=plan)
+            if deferred and not lazy.can_defer(mcs, configs, attrs, plan):
+                # __prepare__ deferred the mixin, but the class body rules laziness out: merge it now
+                attrs, deferred = lazy.merged(configs.get('mixin'), attrs), False
+            if events.recorder.enabled:
+                events.recorder.record(events.NEW, name, events.LAZY if deferred else 0)
+            if deferred:
+                # bare class out of the class body alone, mixin/instructions/diagnostics wait for its first use
+                _q = super().__new__(lazy.lazy_metaclass(mcs), name, bases, attrs)
+                lazy.defer(_q, mcs, configs.get('mixin'), plan)
+                mcs._track(_q, configs)
+                if configs.get('chain') or type.__getattribute__(_q, '__chain__') is not None:
+                    type.__setattr__(_q, '__chain__', chains.PENDING)
+                if profile:
+                    profiling.classes.phase(profile, 'new', namespace, _q)
+                return _q
+            trace("""  Meta.__new__(\t\tmcs=%s,
                     name=%r, bases=%s,
                     attrs=[%s],
-                    **%s)""" % arguments)
-        # Per instructions for cls creation, apply _attrs into actual cls attributes w/default values
-        conf_attr_pointer, values = (configs.setdefault('config', {}).get(k) for k in ('attr_list', 'instruction'))
-        if conf_attr_pointer in attrs and values in ('nullify',):
-            attrs.update(dict.fromkeys(attrs.pop(conf_attr_pointer), 0))
-
-        # super() is the same as super(__class__, <first argument>),
-        # super() ==  super(__class__, mcs)                        -> False
-        # super().__class__ == super(__class__, mcs).__class__     -> True (<class 'super'>)
-        metasuper = super()  # <super: <class 'Meta'>, <Meta object>>
-        print('  --- call to [mcs:Meta]\'s super() returns %s' % metasuper)
-        _q = metasuper.__new__(mcs, name, bases, attrs)
-        print('  --- returns %s' % _q)
-        return _q
+                    **%s)""", mcs, name, bases, Lazy(', '.join, attrs), configs)
+            started = time.perf_counter()
+            # Per instructions for cls creation, apply _attrs into actual cls attributes w/default values.
+            state = plan.apply(attrs, bases)
+            # __call__ is looked up on the metaclass, so a class with its own __call__ needs its own metaclass
+            # (a subclass of Meta: type(cls) is Meta no longer holds, see constructors.py for why).
+            # Subclasses of such a class inherit that metaclass and need their own as well (another signature).
+            specialize = configs.get('specialize') or mcs.__dict__.get('_specialized', False)
+            if configs.get('pool') and 'hashcons' in plan.names:
+                raise ValueError("pool= can't reuse the instances of a class with instruction 'hashcons', they are shared")
+            if configs.get('pool'):
+                # allocations asked for by super().__new__(cls) will be served by the class' free-list
+                bases = pools.pooled_bases(bases)
+            if specialize:
+                mcs = type('Specialized%s' % Meta.__name__, (mcs,), {'__module__': mcs.__module__, '_specialized': True})
+
+            # super() is the same as super(__class__, <first argument>),
+            # super() ==  super(__class__, mcs)                        -> False
+            # super().__class__ == super(__class__, mcs).__class__     -> True (<class 'super'>)
+            metasuper = super()  # <super: <class 'Meta'>, <Meta object>>
+            trace('  --- call to [mcs:Meta]\'s super() returns %s', metasuper, level=DEBUG)
+            _q = plan.finish(metasuper.__new__(mcs, name, bases, attrs), state)
+            if configs.get('pool'):
+                type.__setattr__(_q, '__pool__', pools.Pool(_q, configs['pool']))
+            mcs._track(_q, configs)
+            if configs.get('chain') or _q.__chain__ is not None:
+                # subclasses of a chain=True class are flattened as well, each with its own chain
+                type.__setattr__(_q, '__chain__', chains.Chain(_q))
+            if specialize:
+                specialized = configs.get('specialize') and constructors.specialize(_q, trace, Meta._trace_call)
+                mcs.__call__ = specialized or Meta.__call__
+                trace('  --- __call__ of %r specialized: %s', name, bool(specialized), level=DEBUG)
+            instructions.record_creation(started)
+            trace('  --- returns %s', _q, level=DEBUG)
+            if profile:
+                profiling.classes.phase(profile, 'new', namespace, _q)
+            if requested is not mcs and not isinstance(_q, requested):
+                # derived from a lazy base, the class statement called its Lazy metaclass: type.__call__
+                # only runs __init__ for an instance of that one, this class isn't
+                type(_q).__init__(_q, name, bases, namespace, **configs)
+            return _q
+        except BaseException:
+            # the class isn't created: nothing will close what profiling opened for it in __prepare__
+            profiling.classes.abandon(namespace)
+            raise
 
     def __init__(cls, name, bases, attrs, **configs):
         """
@@ -81,27 +179,176 @@ class Meta(type):
         DO NOT forward *configs* to type.__init__
         type won't get'em them but raise TypeError: "type.__init__() takes NO keyword arguments".
         """
-        arguments = (cls, name, bases, ', '.join(attrs), configs)
-        print("""  Meta.__init__(\tcls=%s,
+        profile = profiling.classes.enabled and profiling.classes.begin()
+        if events.recorder.enabled:
+            events.recorder.record(events.INIT, cls)
+        # rendering a lazy cls would finalize it
+        if not lazy.is_pending(cls):
+            trace("""  Meta.__init__(\tcls=%s,
                     name=%r, bases=%s,
                     attrs=[%s],
-                    **%s)""" % arguments)
-        return super().__init__(name, bases, attrs)
+                    **%s)""", cls, name, bases, Lazy(', '.join, attrs), configs)
+        try:
+            super().__init__(name, bases, attrs)
+        except BaseException:
+            profiling.classes.abandon(attrs)
+            raise
+        if profile:
+            profiling.classes.phase(profile, 'init', attrs, cls)
 
     def __call__(cls, *args, **kwargs):
         """
         xClass already exists -> class creation configuration params are redundant (and excluded).
         It's a different breed of __magic__. The args it's passed to are the same as for xClass.
+
+        Classes created with specialize=True get their own metaclass, whose __call__ is generated
+        for the exact signature of the class (see constructors.py) and replaces this generic one.
+        In a hierarchy created with chain=True, construction runs the __init__ chain resolved for
+        the class instead of type.__call__ (see chains.py).
+        """
+        if trace.level:
+            cls._trace_call(args, kwargs)
+        recording = events.recorder.enabled
+        if recording:
+            events.recorder.record(events.CALL, cls)
+        chain = cls.__chain__
+        call = super().__call__ if chain is None else chains.current(cls, chain)
+        values = cls.__values__
+        if values is None:
+            obj, created = call(*args, **kwargs), True
+        else:
+            # hash-consed: an equal instance still alive is returned, and was counted when it was created
+            obj, created = values.construct(call, cls, args, kwargs)
+        if cls.__freeze__ and created and isinstance(obj, cls):
+            # after the outermost __init__: those of subclasses set attributes after calling super().__init__()
+            object.__setattr__(obj, '__frozen__', True)
+        if created and cls.__tracker__ is not None:
+            cls.__tracker__.add(obj)
+        if recording:
+            events.recorder.record(events.RETURN, cls, (0 if created else events.SHARED)
+                                   | (0 if isinstance(obj, cls) else events.SKIPPED_INIT))
+        return obj
+
+    @staticmethod
+    def _track(cls, configs):
+        track = configs.get('track')
+        if track:
+            type.__setattr__(cls, '__tracker__', tracking.Tracker(cls, 1 if track is True else track))
+
+    def _trace_call(cls, args, kwargs):
+        trace.format('{1}class_instantiation____\n  {0:*<135}', Lazy('''Meta.__call__(\tcls=%s,
+                    args=%s, kwargs=%s'''.__mod__, (cls, args, kwargs)), chr(95)*90)
+
+    def create_many(cls, rows, report=None):
+        """
+        Bulk instantiation: for args in rows: yield cls(*args) - lazily, one row at a time,
+        so a huge (or endless) iterable of rows is never held in memory at once.
+
+        What cls(*args) looks up on every call (metaclass __call__, cls.__new__, cls.__init__) is resolved
+        once for the whole batch. Each row still goes through __new__, and __init__ is still skipped
+        for whatever isn't an instance of cls (alternative_instance).
+
+        Pass a dict as report to have it filled with rows, seconds spent constructing and rows_per_second.
+        """
+        call = type(cls).__call__
+        if ((call is not Meta.__call__ and not type(cls).__dict__.get('_specialized'))
+                or cls.__values__ is not None or cls.__chain__ is not None):
+            # a metaclass with its own idea of instantiation, a hash-consing table or a chain: leave it to them
+            construct = cls
+        else:
+            new, init, tracing_on, tracker = cls.__new__, cls.__init__, trace.enabled(), cls.__tracker__
+            freeze = cls.__freeze__
+
+            def construct(*args):
+                if tracing_on:
+                    cls._trace_call(args, {})
+                obj = new(cls, *args)
+                if isinstance(obj, cls):
+                    # like type.__call__: the __init__ of what __new__ returned, an instance of a subclass too
+                    result = (init if type(obj) is cls else type(obj).__init__)(obj, *args)
+                    if result is not None:
+                        raise TypeError("__init__() should return None, not '%s'" % type(result).__name__)
+                    if freeze:
+                        object.__setattr__(obj, '__frozen__', True)
+                if tracker is not None:
+                    tracker.add(obj)
+                return obj
+
+        if report is None:
+            for args in rows:
+                yield construct(*args)
+            return
+
+        clock, count, seconds = time.perf_counter, 0, 0.0
+        report.update(rows=0, seconds=0.0, rows_per_second=0.0)
+        for args in rows:
+            started = clock()
+            obj = construct(*args)
+            seconds += clock() - started
+            count += 1
+            yield obj
+        report.update(rows=count, seconds=seconds, rows_per_second=count / seconds if seconds else 0.0)
+        trace('  Meta.create_many(cls=%r) built %d instances in %.6fs', cls.__name__, count, seconds)
+
+    @classmethod
+    def build_family(mcs, specs, classes=None, configs=None, mixins=None, module='families', **defaults):
+        """
+        Bulk class creation out of a table: specs are dicts (see families.read_json_lines, families.read_csv)
+        with name, bases, attrs, config, mixin and Meta keywords. configs=/mixins=/classes= give shared pieces
+        specs refer to by name; defaults (e.g. lazy=True) apply to every spec.
+        Returns a families.Family: the classes by name, and stats() with classes_per_second.
+        """
+        return families.build(mcs, specs, classes, configs, mixins, module, **defaults)
+
+    def release(cls, obj):
+        """
+        Give an instance of a pool=<size> class back: it is reset to class defaults and reused.
         """
-        print('{1}class_instantiation____\n  {0:*<135}'.format('''Meta.__call__(\tcls=%s,
-                    args=%s, kwargs=%s''' % (cls, args, kwargs), chr(95)*90))
-        return super().__call__(*args, **kwargs)
+        pools.pool_of(cls).release(obj)
+
+    def pooled(cls, *args, **kwargs):
+        """
+        with Record.pooled(*args) as record: ... - an instance, released when the block is left.
+        """
+        return pools.pooled(cls, *args, **kwargs)
+
+    def pool_stats(cls):
+        return pools.pool_of(cls).stats()
+
+    def live_stats(cls):
+        """
+        Live instances of a track= class: count, high-water mark, approximate deep size (see tracking.py).
+        """
+        return tracking.tracker_of(cls).stats()
+
+    def live_instances(cls):
+        return tracking.tracker_of(cls).instances()
+
+    def value_stats(cls):
+        """
+        Hash-consing of a class with instruction 'hashcons': calls, values shared, values alive.
+        """
+        return flyweights.values_of(cls).stats()
+
+    def __setattr__(cls, name, value):
+        # every modification of a class drops cached renderings of it and of its subclasses
+        super().__setattr__(name, value)
+        snapshots.invalidate(cls)
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+        snapshots.invalidate(cls)
 
     def __str__(cls):
-        cls_attrs = {k: getattr(cls, k) for k in dir(cls) if not k.startswith(chr(95)*2)}
+        # same as {k: getattr(cls, k) for k in dir(cls) if not k.startswith(chr(95)*2)},
+        # built once and cached until cls (or one of its bases) is modified
+        cls_attrs = snapshots.class_attrs(cls)
         return '''<an Instance of Meta: %s,
                         **class-attributes=%s>''' % (repr(cls), cls_attrs)
 
+# Meta.__setattr__/__delattr__ report every modification: snapshots go by the versions of Meta classes
+snapshots.reporting(Meta)
+
 
 class xClass(object, config=dict(attr_list='_attrs', instruction='nullify'),
              metaclass=Meta, mixin=dict(returning='*** Returning', plaindict='plain dict')):
@@ -113,6 +360,8 @@ class xClass(object, config=dict(attr_list='_attrs', instruction='nullify'),
 
     Configuring class creation achieved by sending keyword arguments to it's metaclass.
     > Take elements in _attrs and make them class attributes with value 0
+    (see instructions.py for the other instructions and for combining them; 'slots' would make them
+     __slots__ instead, but not for xClass itself: its __init__ also sets arg and alternative_instance)
     """
     _attrs = ['A', 'B']
     def __new__(cls, arg, alternative_instance=None):
@@ -135,12 +384,14 @@ class xClass(object, config=dict(attr_list='_attrs', instruction='nullify'),
         not on a upper level (in a metaclass or parent object) like all the rest of magic methods.
         This is important to understand, because both the class and the metaclass can define this method.
         """
-        _fmt = """\tcls=%s,
-                    arg=%s, alternative_instance=%s""" % (cls, arg, alternative_instance)
-        print('  xClass.__new__(%s)' % _fmt)
+        trace("""  xClass.__new__(\tcls=%s,
+                    arg=%s, alternative_instance=%s)""", cls, arg, alternative_instance)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_NEW, cls)
 
         if alternative_instance is not None:
-            obj = alternative_instance
+            # equal payloads come back as one shared frozen object when flyweights.alternatives is enabled
+            obj = flyweights.alternatives.intern(alternative_instance)
             desc = 'directly, without __init__ invocation'
         else:
             #  super(), super(__class__, cls), ->  superclass is a wrapper around cls
@@ -148,10 +399,10 @@ class xClass(object, config=dict(attr_list='_attrs', instruction='nullify'),
             #  object.__new__(cls) ->  <__main__.xClass object at 0xMemAddr>
             #  super().__self_class__ == super().__thisclass__ == cls -> True  # wrapped object
             _super = super()  # -> <super: <class 'xClass'>, <xClass object>>
-            print('  --- call to super() returns %s' % _super)
+            trace('  --- call to super() returns %s', _super, level=DEBUG)
             obj = _super.__new__(cls) # needs to be a class not type
             desc = 'to __init__' # internally, isinstance(obj, cls) is performed before __init__...
-        print('  --- dispatching %s %s' % (obj, desc))
+        trace('  --- dispatching %s %s', obj, desc, level=DEBUG)
         return obj  # ...and if __new__ returned not an instance of a cls, __init__ will be skipped
 
     def __init__(self, arg, alternative_instance=None):
@@ -159,28 +410,32 @@ class xClass(object, config=dict(attr_list='_attrs', instruction='nullify'),
         Received an instance created in __new__
         Remaining arguments *are the same* as were passed to __new__
         """
-        _fmt = """\tself=%s,
-                    arg=%s, alternative_instance=%s""" % (self, arg, alternative_instance)
-        print('  xClass.__init__(%s)' % _fmt)
+        trace("""  xClass.__init__(\tself=%s,
+                    arg=%s, alternative_instance=%s)""", self, arg, alternative_instance)
+        if events.recorder.enabled:
+            events.recorder.record(events.C_INIT, type(self))
         self.arg = arg
         self.alternative_instance = alternative_instance
         return super().__init__()
 
     def __str__(self):
-        # dir(self) and getattr(self, key) alternative is inspect.getmembers(self)
-        attrs = dict((k, getattr(self, k)) for k in dir(self) if not k.startswith(chr(95)*2))
+        # dir(self) and getattr(self, key) alternative is inspect.getmembers(self),
+        # snapshots.instance_attrs does the same out of a cached class snapshot and self.__dict__
+        attrs = snapshots.instance_attrs(self)
         _args = getattr(self, 'arg', 'MISSING'), getattr(self, 'alternative_instance', 'MISSING'), attrs
         return """<an Instance of xClass:
             arg=%s, alternative_instance=%s,
             **instance-attributes=%s>""" % _args
 
-_obj = xClass('posarg')
-print(_obj.returning, _obj)
 
-_altered_obj = xClass('posarg', alternative_instance={'key': 'value', 'self': None})
-print(xClass.returning, xClass.plaindict, _altered_obj)
+if __name__ == "__main__":
+    _obj = xClass('posarg')
+    echo(_obj.returning, _obj)
+
+    _altered_obj = xClass('posarg', alternative_instance={'key': 'value', 'self': None})
+    echo(xClass.returning, xClass.plaindict, _altered_obj)
 
-print('\ntype(xClass) == Meta: %s, type(xClass): %s' % (type(xClass) == Meta, type(xClass)))
+    echo('\ntype(xClass) == Meta: %s, type(xClass): %s' % (type(xClass) == Meta, type(xClass)))
 
 #   Meta.__prepare__(mcs=<class '__main__.Meta'>,
 #                    name='xClass', bases=(<class 'object'>,),
@@ -0,0 +1,121 @@
+"""
+Instance free-lists for Meta-managed classes (class keyword pool=<size>):
+
+    class Record(metaclass=Meta, pool=256, config=dict(attr_list='_attrs', instruction='nullify')):
+        ...
+
+    record = Record(1)
+    Record.release(record)          # reset and kept for reuse
+    with Record.pooled(2) as record:  # or released on leaving the block
+        ...
+
+Meta puts Pooled right before object in the bases of such a class, so the allocation a __new__ asks for
+with super().__new__(cls) is served from the class' free-list first. A __new__ which returns
+something else (like xClass with alternative_instance) never touches the pool; __init__ runs as usual.
+
+A released instance is reset to class defaults at once (so it holds no references while pooled):
+its __dict__ is cleared and its slots are emptied, which makes every attribute read fall back to
+the class level again - 0 for 'nullify'-ed ones, SlotDefault's default for 'slots'.
+
+A pool is a memory trade-off, not a speed-up, and stays opt-in: it keeps up to <size> idle instances
+alive so that create-and-discard churn stops allocating and freeing (fewer allocator round trips,
+less garbage for the collector to look at). Each cycle is SLOWER than a fresh allocation on CPython:
+Pooled.__new__, release() and the reset are Python code where object.__new__ is C
+(python -m benchmarks.lifecycle --filter churn: a pooled cycle takes 2.5 to 3.5 times as long).
+The free-list and the counters are guarded by a lock: pools are safe to share between threads.
+"""
+import contextlib
+import threading
+
+
+class Pool(object):
+    def __init__(self, cls, size):
+        self.cls, self.size = cls, size
+        self.free = []
+        self._free_ids = set()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.releases = self.discards = 0
+        self._slots = tuple(name for klass in cls.__mro__ for name in vars(klass).get('__slots__', ())
+                            if name not in ('__dict__', '__weakref__'))
+
+    def allocate(self):
+        with self._lock:
+            if not self.free:
+                self.misses += 1
+                obj = None
+            else:
+                obj = self.free.pop()
+                self._free_ids.discard(id(obj))
+                self.hits += 1
+        return object.__new__(self.cls) if obj is None else obj
+
+    def release(self, obj):
+        if type(obj) is not self.cls:
+            raise TypeError('%r is not an instance of %s' % (obj, self.cls.__name__))
+        with self._lock:
+            if id(obj) in self._free_ids:
+                raise ValueError('%r was released already' % obj)
+            self.releases += 1
+            self.reset(obj)
+            if len(self.free) < self.size:
+                self._free_ids.add(id(obj))
+                self.free.append(obj)
+            else:
+                self.discards += 1
+
+    def reset(self, obj):
+        if hasattr(obj, '__dict__'):
+            vars(obj).clear()
+        for name in self._slots:
+            try:
+                object.__delattr__(obj, name)
+            except AttributeError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        requests = self.hits + self.misses
+        return {'size': self.size, 'free': len(self.free), 'hits': self.hits, 'misses': self.misses,
+                'releases': self.releases, 'discards': self.discards,
+                'hit_rate': self.hits / requests if requests else 0.0}
+
+
+class Pooled(object):
+    """
+    Base Meta adds to pooled classes: allocation goes through the class' own free-list.
+    Subclasses without a pool of their own allocate as usual.
+    """
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        pool = cls.__dict__.get('__pool__')
+        return pool.allocate() if pool is not None else object.__new__(cls)
+
+
+def pooled_bases(bases):
+    """
+    Bases for a pooled class: Pooled goes right before object in the MRO.
+    """
+    if any(issubclass(base, Pooled) for base in bases):
+        return bases
+    return tuple(base for base in bases if base is not object) + (Pooled,)
+
+
+@contextlib.contextmanager
+def pooled(cls, *args, **kwargs):
+    obj = cls(*args, **kwargs)
+    try:
+        yield obj
+    finally:
+        if type(obj) is cls:  # __new__ may have returned something else, which isn't ours to pool
+            pool_of(cls).release(obj)
+
+
+def pool_of(cls):
+    try:
+        return cls.__dict__['__pool__']
+    except KeyError:
+        raise TypeError('%s was not created with pool=<size>' % cls.__name__) from None
@@ -0,0 +1,317 @@
+"""
+Opt-in instrumentation of the decorators and of Meta class creation.
+
+Decorator layers, per decorated object (target):
+    decorator   - the configuration layer, once per decoration
+    decorator_  - the gatekeeper, once per decoration
+    wrapper     - a whole call of the decorated object, decorator overhead included
+    trace       - the wrapper's own trace line
+    variant     - choosing the class to instantiate (decorators_optional-arguments)
+    target      - the decorated object's own call: __new__/__init__, or the function
+    check       - the mutation check (decorators_optional-arguments)
+
+    profiling.decorators.configure(enabled=True, sample=10)   # time 1 call in 10, count all of them
+    ... run ...
+    profiling.decorators.snapshot()                           # {target: {layer: stats}}
+    profiling.decorators.export(open('calls.jsonl', 'w'))     # a JSON line per (target, layer)
+
+Disabled (the default), a call pays one attribute check. 'calls' of the wrapper counts every call,
+of the layers within it the sampled calls only. Latencies go into power-of-two histograms
+(bucket i holds latencies below 2**i ns). Statistics belong to the decorated object itself, held weakly:
+two decorations of one name (lambdas, a name defined twice) are reported apart, as name#2, name#3... Counters are updated without locks: exact with the GIL
+as long as a single thread calls, approximate otherwise.
+
+Meta class creation, per class: wall time and allocated memory blocks (net, sys.getallocatedblocks)
+of __prepare__, of the class body, of __new__ and of __init__, the size of the merged namespace,
+and the defining module. Turn it on before the imports to measure:
+
+    profiling.classes.enabled = True
+    import models
+    print(profiling.classes.report())   # costliest class definitions first, like python -X importtime
+
+Both can be switched on from the environment: METACLASSING_PROFILE=decorators,classes,sample=10
+An unknown switch or a sample which isn't a number >= 1 there is warned about and ignored.
+"""
+import collections
+import itertools
+import json
+import os
+import sys
+import time
+import warnings
+import weakref
+
+# perf_counter_ns is new in Python 3.7
+clock = getattr(time, 'perf_counter_ns', None) or (lambda: int(time.perf_counter() * 1e9))
+
+
+class LayerStats(object):
+    __slots__ = ('calls', 'sampled', 'total_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.calls = self.sampled = self.total_ns = self.max_ns = 0
+        self.histogram = [0] * 40  # up to 2**39 ns, ~9 minutes
+
+    def add(self, ns):
+        self.sampled += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.histogram[min(ns.bit_length(), 39)] += 1
+
+    def as_dict(self):
+        return {'calls': self.calls, 'sampled': self.sampled,
+                'total_us': self.total_ns / 1e3, 'max_us': self.max_ns / 1e3,
+                'mean_us': self.total_ns / self.sampled / 1e3 if self.sampled else 0.0,
+                'histogram_us': {'<%g' % (2 ** i / 1e3): n for i, n in enumerate(self.histogram) if n}}
+
+
+class Target(dict):
+    """
+    The per-layer statistics of one decorated object: {layer: LayerStats}, reported under name.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name, layers):
+        super().__init__((layer, LayerStats()) for layer in layers)
+        self.name = name
+
+
+class Probe(object):
+    """
+    Times the layers of one sampled call: lap(layer) charges the time since the previous lap to layer.
+    """
+    __slots__ = ('target', 'started', 'last')
+
+    def __init__(self, target):
+        self.target = target
+        self.started = self.last = clock()
+
+    def lap(self, layer):
+        now = clock()
+        stats = self.target[layer]
+        stats.calls += 1
+        stats.add(now - self.last)
+        self.last = now
+
+    def done(self):
+        self.target['wrapper'].add(clock() - self.started)
+
+
+class DecoratorProfiler(object):
+    LAYERS = ('decorator', 'decorator_', 'wrapper', 'trace', 'variant', 'target', 'check')
+
+    def __init__(self, enabled=False, sample=1):
+        self._targets = weakref.WeakKeyDictionary()  # decorated object -> Target
+        self._unreferenced = {}  # id(obj) -> (obj, Target), for objects without weak references
+        self._names = {}         # name -> counter of the targets reported under it
+        self.configure(enabled, sample)
+
+    def configure(self, enabled=None, sample=None):
+        """
+        sample=N: time one call in N (every call is counted).
+        """
+        if enabled is not None:
+            self.enabled = enabled
+        if sample is not None:
+            if sample < 1:
+                raise ValueError('sample is one call in N, N >= 1, not %r' % (sample,))
+            self.sample = sample
+
+    def target(self, obj):
+        """
+        The per-layer statistics of obj, created on first use; None while profiling is disabled.
+        """
+        if not self.enabled:
+            return None
+        try:
+            target = self._targets.get(obj)
+        except TypeError:  # no weak references to obj (or unhashable): kept alive, its id can't be reused
+            entry = self._unreferenced.get(id(obj))
+            target = entry and entry[1]
+            if target is None:
+                target = self._new_target(obj)
+                self._unreferenced[id(obj)] = obj, target
+            return target
+        if target is None:
+            target = self._targets[obj] = self._new_target(obj)
+        return target
+
+    def _new_target(self, obj):
+        name = '%s.%s' % (getattr(obj, '__module__', '?'), getattr(obj, '__qualname__', type(obj).__name__))
+        number = next(self._names.setdefault(name, itertools.count(1)))
+        return Target(name if number == 1 else '%s#%d' % (name, number), self.LAYERS)
+
+    def record(self, obj, layer, ns):
+        target = self.target(obj)
+        if target is not None:
+            stats = target[layer]
+            stats.calls += 1
+            stats.add(ns)
+
+    def start(self, obj):
+        """
+        Count a call of obj: a Probe when this call is sampled, None otherwise.
+        """
+        target = self.target(obj)
+        if target is None:
+            return None
+        wrapper = target['wrapper']
+        wrapper.calls += 1
+        if wrapper.calls % self.sample:
+            return None
+        return Probe(target)
+
+    def _all_targets(self):
+        return list(self._targets.values()) + [target for _, target in self._unreferenced.values()]
+
+    def snapshot(self):
+        snapshot = {}
+        for target in sorted(self._all_targets(), key=lambda target: target.name):
+            layers = {layer: stats.as_dict() for layer, stats in target.items() if stats.calls}
+            if layers:
+                snapshot[target.name] = layers
+        return snapshot
+
+    def export(self, stream):
+        """
+        Write the snapshot as JSON lines, one per (target, layer), to stream (anything with write()).
+        """
+        for name, layers in self.snapshot().items():
+            for layer, stats in layers.items():
+                stream.write(json.dumps(dict(stats, target=name, layer=layer), sort_keys=True) + '\n')
+
+    def clear(self):
+        # in place: a target keeps its name for as long as its object lives
+        for target in self._all_targets():
+            for layer in target:
+                target[layer] = LayerStats()
+
+
+class ClassProfiler(object):
+    PHASES = ('prepare', 'body', 'new', 'init')
+    # more than class statements ever nest: beyond it, the oldest were abandoned by a raising class body
+    MAX_OPEN = 64
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        # id(namespace) -> (namespace, record) of a class being created: the namespace is held,
+        # its id can't be reused by another class while the record is open
+        self._open = collections.OrderedDict()
+
+    @staticmethod
+    def _mark():
+        return clock(), sys.getallocatedblocks()
+
+    def begin(self):
+        return self._mark()
+
+    def _open_record(self, namespace, record):
+        self._open[id(namespace)] = namespace, record
+        while len(self._open) > self.MAX_OPEN:
+            self._open.popitem(last=False)
+        return record
+
+    def _record(self, namespace, cls):
+        entry = self._open.get(id(namespace))
+        if entry is None:
+            # __prepare__ didn't see this class (a metaclass called directly, not from a class statement)
+            return self._open_record(namespace, {'class': type.__getattribute__(cls, '__name__'),
+                                                 'metaclass': type(cls).__name__,
+                                                 'body_started': None})
+        return entry[1]
+
+    def prepared(self, mark, mcs, name, namespace):
+        ns, blocks = self._mark()
+        self._open_record(namespace, {
+            'class': name, 'metaclass': mcs.__name__,
+            'prepare_us': (ns - mark[0]) / 1e3, 'prepare_blocks': blocks - mark[1], 'body_started': (ns, blocks)})
+
+    def abandon(self, namespace):
+        """
+        Forget the class being created out of namespace: its creation raised.
+        """
+        self._open.pop(id(namespace), None)
+
+    def phase(self, mark, phase, namespace, cls):
+        """
+        Account phase ('new' or 'init'), which began at mark (begin()), to cls, created out of namespace.
+        """
+        ns, blocks = self._mark()
+        record = self._record(namespace, cls)
+        if phase == 'new':
+            body_started = record.pop('body_started')
+            if body_started is not None:
+                record['body_us'] = (mark[0] - body_started[0]) / 1e3
+                record['body_blocks'] = mark[1] - body_started[1]
+            # plain type lookups: attribute access through the metaclass would finalize a lazy class
+            record['module'] = type.__getattribute__(cls, '__module__')
+            record['qualname'] = type.__getattribute__(cls, '__qualname__')
+            record['namespace_keys'] = len(namespace)
+            record['namespace_bytes'] = sys.getsizeof(namespace)
+        record['%s_us' % phase] = (ns - mark[0]) / 1e3
+        record['%s_blocks' % phase] = blocks - mark[1]
+        if phase == 'init':
+            del self._open[id(namespace)]
+            record.pop('body_started', None)
+            record['total_us'] = sum(record.get('%s_us' % p, 0.0) for p in self.PHASES)
+            record['total_blocks'] = sum(record.get('%s_blocks' % p, 0) for p in self.PHASES)
+            self.records.append(record)
+
+    def report(self, limit=None, sort='total_us'):
+        """
+        One line per class, costliest first, then the total per module.
+        """
+        records = sorted(self.records, key=lambda record: record.get(sort, 0), reverse=True)[:limit]
+        lines = ['class cost: %s | %9s | %6s | %9s | class' % (
+            ' | '.join('%9s' % ('%s [us]' % p) for p in self.PHASES + ('total',)), 'blocks', 'keys', 'ns bytes')]
+        for record in records:
+            lines.append('class cost: %s | %9d | %6d | %9d | %s.%s' % (
+                ' | '.join('%9.1f' % record.get('%s_us' % p, 0.0) for p in self.PHASES + ('total',)),
+                record['total_blocks'], record.get('namespace_keys', 0), record.get('namespace_bytes', 0),
+                record.get('module', '?'), record.get('qualname', record['class'])))
+        modules = {}
+        for record in self.records:
+            module = modules.setdefault(record.get('module', '?'), [0, 0.0, 0])
+            module[0] += 1
+            module[1] += record['total_us']
+            module[2] += record['total_blocks']
+        for name, (count, total, blocks) in sorted(modules.items(), key=lambda item: -item[1][1]):
+            lines.append('module cost: %5d classes | %9.1f us | %9d blocks | %s' % (count, total, blocks, name))
+        return '\n'.join(lines)
+
+    def clear(self):
+        self.records = []
+        self._open.clear()
+
+
+_SWITCHES = frozenset(('decorators', 'classes'))
+
+
+def _parse_environ(value):
+    """
+    'decorators,classes,sample=10' -> ({'decorators', 'classes'}, 10)
+    """
+    switches, sample = set(), 1
+    for item in filter(None, (i.strip() for i in value.split(','))):
+        name, _, number = (part.strip() for part in item.partition('='))
+        if name == 'sample':
+            try:
+                sample = int(number)
+                if sample < 1:
+                    raise ValueError(number)
+            except ValueError:
+                sample = 1
+                warnings.warn('METACLASSING_PROFILE: ignoring %r, sample is one call in N, N >= 1' % item,
+                              RuntimeWarning)
+        elif name in _SWITCHES:
+            switches.add(name)
+        else:
+            warnings.warn('METACLASSING_PROFILE: ignoring %r, the switches are %s and sample=N'
+                          % (item, ', '.join(sorted(_SWITCHES))), RuntimeWarning)
+    return switches, sample
+
+_switches, _sample = _parse_environ(os.environ.get('METACLASSING_PROFILE', ''))
+decorators = DecoratorProfiler('decorators' in _switches, _sample)
+classes = ClassProfiler('classes' in _switches)
@@ -0,0 +1,141 @@
+"""
+Runs a table of UseCase scenarios (objects with .description and .obj, a callable) concurrently
+in a process pool, as a smoke and perf gate:
+
+    report = scenarios.run('decorators_optional-arguments.py', table='decorators', workers=4)
+    print(report.format())
+    exit(0 if report.ok else 1)
+
+Scenarios are lambdas, which can't be pickled: each worker executes the script itself (once)
+and is sent indices into its table. Every scenario runs alone, with the trace sink replaced,
+so that its output (trace lines, echo-es, the rendered result) and timing are its own.
+A scenario fails by raising; its traceback becomes its output.
+
+The report lists scenarios in table order whatever order they finished in, and
+the outcome of a scenario doesn't depend on the worker it ran on: runs are deterministic
+except for timings (and memory addresses in the output).
+"""
+import concurrent.futures
+import io
+import os
+import runpy
+import statistics
+import time
+import traceback
+
+import tracing
+
+_namespaces = {}  # per worker process: script path -> its namespace
+
+
+def _namespace(path):
+    namespace = _namespaces.get(path)
+    if namespace is None:
+        sink = io.StringIO()
+        tracing.configure(sink=sink)  # whatever running the script itself traces isn't a scenario's
+        try:
+            namespace = _namespaces[path] = runpy.run_path(path, run_name='scenarios')
+        finally:
+            tracing.configure(sink=tracing.stdout)
+    return namespace
+
+
+def run_one(path, table, index):
+    """
+    Run scenario number index of the script's table. Returns (ok, seconds, output).
+    """
+    uc = _namespace(path)[table][index]
+    sink = io.StringIO()
+    tracing.configure(sink=sink)
+    started = time.perf_counter()
+    try:
+        result = uc.obj()
+        tracing.echo('+++ RESULT: %s' % (result,))
+        ok = True
+    except Exception:
+        tracing.flush()
+        sink.write(traceback.format_exc())
+        ok = False
+    finally:
+        seconds = time.perf_counter() - started
+        tracing.configure(sink=tracing.stdout)
+    return ok, seconds, sink.getvalue()
+
+
+def _run_chunk(path, table, indices):
+    return [run_one(path, table, index) for index in indices]
+
+
+class Result(object):
+    __slots__ = ('index', 'description', 'ok', 'seconds', 'output')
+
+    def __init__(self, index, description, ok, seconds, output):
+        self.index, self.description, self.ok, self.seconds, self.output = index, description, ok, seconds, output
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Report(object):
+    def __init__(self, results, seconds, workers):
+        self.results = sorted(results, key=lambda result: result.index)
+        self.seconds, self.workers = seconds, workers
+        self.failed = [result for result in self.results if not result.ok]
+        self.ok = not self.failed
+
+    def latency(self):
+        """
+        Scenario latencies in ms: min, median, p95 and max.
+        """
+        ms = sorted(result.seconds * 1e3 for result in self.results)
+        if not ms:
+            return {}
+        return {'min': ms[0], 'median': statistics.median(ms),
+                'p95': ms[min(len(ms) - 1, int(len(ms) * 0.95))], 'max': ms[-1]}
+
+    def as_dict(self):
+        return {'passed': len(self.results) - len(self.failed), 'failed': len(self.failed),
+                'seconds': self.seconds, 'workers': self.workers, 'latency_ms': self.latency(),
+                'results': [result.as_dict() for result in self.results]}
+
+    def format(self, outputs=False):
+        """
+        One line per scenario, then the summary. Failures always come with their output,
+        the output of every scenario with outputs=True.
+        """
+        lines = ['%5s %-4s %10s  %s' % ('#', '', 'ms', 'scenario')]
+        for result in self.results:
+            title = ' '.join(result.description.split())
+            lines.append('%5d %-4s %10.3f  %s' % (result.index, 'ok' if result.ok else 'FAIL',
+                                                 result.seconds * 1e3, title[:100]))
+            if outputs or not result.ok:
+                lines.extend('      | ' + line for line in result.output.splitlines())
+        latency = self.latency()
+        lines.append('%d passed, %d failed in %.3fs on %d worker(s); latency ms: %s' % (
+            len(self.results) - len(self.failed), len(self.failed), self.seconds, self.workers,
+            ', '.join('%s=%.3f' % (name, latency[name]) for name in ('min', 'median', 'p95', 'max')
+                      if name in latency)))
+        return '\n'.join(lines)
+
+
+def run(path, table='decorators', workers=None, chunksize=None):
+    """
+    Run every scenario of the script's table; workers=0 runs them in this process, one after another.
+    """
+    path = os.path.abspath(path)
+    scenarios = _namespace(path)[table]
+    indices = list(range(len(scenarios)))
+    started = time.perf_counter()
+    if workers == 0:
+        outcomes = [run_one(path, table, index) for index in indices]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = chunksize or max(1, len(indices) // (workers * 4))
+        chunks = [indices[i:i + chunksize] for i in range(0, len(indices), chunksize)]
+        tracing.flush()  # forked workers would write pending lines once more
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(_run_chunk, path, table, chunk) for chunk in chunks]
+            outcomes = [outcome for future in futures for outcome in future.result()]
+    seconds = time.perf_counter() - started
+    return Report([Result(index, scenarios[index].description, *outcome)
+                   for index, outcome in zip(indices, outcomes)], seconds, workers)
@@ -0,0 +1,132 @@
+"""
+Cached public-attribute snapshots, used by the __str__ of Meta and of the xClass examples.
+
+dir() sorts the whole namespace of a class and its bases on every call, and getattr() is then run
+for each of its names. The class part of that never changes between two modifications of the class,
+so it is built once per class and kept until a class of its MRO is modified. Every class of the MRO
+is checked on each use:
+
+    - classes of a metaclass which reports their modifications (reporting(Meta): Meta.__setattr__ and
+      __delattr__ call invalidate) by their version alone
+    - builtin classes not at all, they can't be modified
+    - any other class by its namespace: the names and the identity of the values. The snapshot holds
+      the values it was built out of, an id can't be reused by a new value meanwhile.
+      invalidate(cls) is still worth calling after modifying one (decorators installing mixins do):
+      chains.py goes by the versions only.
+
+An instance's attributes are its class snapshot with descriptors bound to the instance,
+overlaid by the public part of the instance's own __dict__, in the order of dir(): sorted.
+Like dir(), names starting with a double underscore are left out. What an instance rendering still
+costs is a copy of the class part and a bound method per method, getattr() binds a new one every
+time too: the MRO walk, the sort and the getattr() per name are what is saved.
+"""
+import weakref
+
+_versions = weakref.WeakKeyDictionary()   # cls -> number of modifications
+_snapshots = weakref.WeakKeyDictionary()  # cls -> Snapshot
+_reporting = ()  # metaclasses whose classes call invalidate() on every modification, see reporting()
+_HEAPTYPE = 1 << 9  # Py_TPFLAGS_HEAPTYPE: not set for the builtin (static) classes, which can't be modified
+generation = 0  # modifications of any class so far: one comparison tells nothing changed (see chains.py)
+
+
+def reporting(metaclass):
+    """
+    Declare that classes of metaclass (and of its subclasses) invalidate() themselves when modified.
+    """
+    global _reporting
+    _reporting += (metaclass,)
+    return metaclass
+
+
+def invalidate(cls):
+    """
+    Record a modification of cls: snapshots of cls and of its subclasses will be rebuilt.
+    """
+    global generation
+    _versions[cls] = _versions.get(cls, 0) + 1
+    generation += 1
+
+
+def version(cls):
+    return _versions.get(cls, 0)
+
+
+def _state(klass):
+    if issubclass(type(klass), _reporting):  # type(): isinstance() would finalize a lazy class
+        return _versions.get(klass, 0)
+    if not klass.__flags__ & _HEAPTYPE:
+        return 0
+    namespace = vars(klass)
+    return _versions.get(klass, 0), tuple(namespace), tuple(map(id, namespace.values()))
+
+
+class Snapshot(object):
+    """
+    Public attributes of a class (as getattr(cls, name) would return them), split for instance rendering:
+        plain     - every name, sorted, with the values which aren't descriptors (None for the others):
+                    the same for every instance, and in the order of dir()
+        non_data  - descriptors an instance __dict__ entry overrides (functions -> bound methods)
+        data      - descriptors overriding an instance __dict__ entry (properties, slots)
+    """
+    __slots__ = ('key', 'held', 'class_attrs', 'plain', 'non_data', 'data')
+
+    def __init__(self, cls, key):
+        raw = {}
+        for klass in reversed(cls.__mro__):
+            raw.update((k, v) for k, v in vars(klass).items() if not k.startswith('__'))
+        self.key = key
+        # the values of the namespaces, dunders and overridden ones too: their ids in key stay theirs
+        self.held = [tuple(vars(klass).values()) for klass in cls.__mro__]
+        self.class_attrs, self.plain, self.non_data, self.data = {}, {}, [], []
+        for k in sorted(raw):
+            v = raw[k]
+            get = getattr(type(v), '__get__', None)
+            self.plain[k] = v if get is None else None
+            if get is None:
+                self.class_attrs[k] = v
+                continue
+            self.class_attrs[k] = get(v, None, cls)
+            if hasattr(type(v), '__set__') or hasattr(type(v), '__delete__'):
+                self.data.append((k, v))
+            else:
+                self.non_data.append((k, v))
+
+
+def snapshot(cls):
+    key = tuple(map(_state, cls.__mro__))
+    snap = _snapshots.get(cls)
+    if snap is None or snap.key != key:
+        snap = _snapshots[cls] = Snapshot(cls, key)
+    return snap
+
+
+def class_attrs(cls):
+    """
+    {name: getattr(cls, name)} for the public names of dir(cls). Shared, do not modify.
+    """
+    return snapshot(cls).class_attrs
+
+
+def instance_attrs(obj):
+    """
+    {name: getattr(obj, name)} for the public names of dir(obj).
+    """
+    cls = type(obj)
+    snap = snapshot(cls)
+    attrs = snap.plain.copy()  # every class name in place already: values are replaced, not moved
+    for k, v in snap.non_data:
+        attrs[k] = v.__get__(obj, cls)
+    added = False
+    for k, v in getattr(obj, '__dict__', {}).items():
+        if not k.startswith('__'):
+            added = added or k not in attrs
+            attrs[k] = v
+    for k, v in snap.data:
+        try:
+            attrs[k] = v.__get__(obj, cls)
+        except AttributeError:  # e.g. a slot not set yet
+            del attrs[k]
+    if added:
+        # names of the instance alone come last: sorted in, like dir() does (mostly sorted, a short sort)
+        attrs = {k: attrs[k] for k in sorted(attrs)}
+    return attrs
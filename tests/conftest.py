@@ -0,0 +1,10 @@
+import os
+import sys
+
+# the modules live at the repository root, next to the scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+
+# the scripts trace every stage of class creation: silent before anything imports them
+tracing.configure(level=tracing.OFF)
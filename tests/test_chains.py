@@ -0,0 +1,60 @@
+import pytest
+
+from metaclasses import Meta
+
+
+def make_base(**configs):
+    class Base(metaclass=Meta, chain=True, **configs):
+        def __init__(self, name):
+            self.name = name
+    return Base
+
+
+def test_chain_calls_every_init_once():
+    Base = make_base()
+    calls = []
+
+    class Left(Base):
+        def __init__(self, left=0):
+            calls.append('left')
+            self.left = left
+
+    class Right(Base):
+        def __init__(self, right=0):
+            calls.append('right')
+            self.right = right
+
+    class Diamond(Left, Right):
+        pass
+
+    obj = Diamond(name='d', right=2)
+    assert (obj.name, obj.left, obj.right) == ('d', 0, 2)
+    assert calls == ['right', 'left']
+
+
+@pytest.mark.parametrize('body', [
+    'super().__init__(name)',
+    'super(Child, self).__init__(name)',
+    'Base.__init__(self, name)',
+    'getattr(Base, "__init__")(self, name)',
+    '(lambda: Base.__init__(self, name))()',
+])
+def test_inits_calling_other_inits_are_refused(body):
+    Base = make_base()
+    namespace = {'Base': Base}
+    exec('def __init__(self, name):\n    %s\n' % body, namespace)
+    with pytest.raises(TypeError, match='calls another __init__'):
+        type(Base)('Child', (Base,), {'__init__': namespace['__init__']})
+
+
+def test_frozen_after_the_whole_chain():
+    Base = make_base(config=dict(instruction='freeze'))
+
+    class Child(Base):
+        def __init__(self, extra=0):
+            self.extra = extra
+
+    obj = Child(name='c', extra=1)
+    assert (obj.name, obj.extra) == ('c', 1)
+    with pytest.raises(AttributeError):
+        obj.extra = 2
@@ -0,0 +1,85 @@
+import pytest
+
+from metaclasses import Meta
+
+
+def make_trade():
+    return Meta('Trade', (object,), {'_attrs': ['price', 'qty', 'symbol']},
+                config=dict(attr_list='_attrs', instruction='columns', columns={'price': 'd', 'qty': 'q'}))
+
+
+def test_rows_and_instances_share_the_columns():
+    Trade = make_trade()
+    store = Trade.__store__
+    store.append_rows([(10.5, 3, 'X'), (2.0, 4, 'Y')])
+    trade = Trade()
+    trade.qty = 5
+    assert len(store) == 3 and store.sum('qty') == 12
+    assert store.view(0).symbol == 'X' and trade.price == 0
+    assert store.filter('price', lambda price: price > 5) == [0]
+
+
+@pytest.mark.parametrize('rows', [
+    [(1.0, 1, 'a'), (2.0, 2)],           # short row
+    [(1.0, 1, 'a'), (2.0, 'two', 'b')],  # not an integer for the 'q' column
+    [(1.0, 1, 'a'), ('one', 2, 'b')],    # not a float for the 'd' column
+])
+def test_failed_append_rows_leaves_the_store_unchanged(rows):
+    Trade = make_trade()
+    store = Trade.__store__
+    store.append_rows([(0.5, 0, 'z')])
+    with pytest.raises((TypeError, ValueError)):
+        store.append_rows(rows)
+    assert len(store) == 1
+    assert all(len(store.column(name)) == 1 for name in store.fields)
+    store.append_rows([(1.5, 1, 'y')])
+    assert store.view(1).symbol == 'y'
+
+
+def test_failed_append_row_leaves_the_store_unchanged():
+    Trade = make_trade()
+    store = Trade.__store__
+    with pytest.raises(TypeError):
+        store.append_row({'price': 1.0, 'qty': 'many'})
+    assert len(store) == 0 and all(len(store.column(name)) == 0 for name in store.fields)
+    trade = Trade()
+    with pytest.raises(TypeError):
+        trade.qty = 'many'
+    trade.qty = 2
+    assert trade.qty == 2 and len(store) == 1
+
+
+def test_rows_of_instances_gone_are_reused():
+    Trade = make_trade()
+    store = Trade.__store__
+    store.append_rows([(10.5, 3, 'X')])
+    first, second = Trade(), Trade()
+    first.qty, second.qty = 5, 7
+    assert len(store) == 3
+    del first
+    assert len(store) == 2 and store.sum('qty') == 10  # the free row holds the defaults
+    third = Trade()
+    third.symbol = 'Z'
+    assert third._row == 1 and third.qty == 0 and len(store) == 3
+    assert len(store.column('qty')) == 3
+
+
+def test_views_dont_give_rows_back():
+    Trade = make_trade()
+    store = Trade.__store__
+    trade = Trade()
+    trade.qty = 2
+    view = store.view(trade._row)
+    assert isinstance(view, Trade) and view.qty == 2
+    del view
+    assert len(store) == 1 and trade.qty == 2
+
+
+def test_a_del_of_the_class_still_runs():
+    gone = []
+    Trade = Meta('Trade', (object,), {'_attrs': ['qty'], '__del__': lambda self: gone.append(self.qty)},
+                 config=dict(attr_list='_attrs', instruction='columns', columns={'qty': 'q'}))
+    trade = Trade()
+    trade.qty = 4
+    del trade
+    assert gone == [4] and len(Trade.__store__) == 0
@@ -0,0 +1,57 @@
+import pytest
+
+from metaclasses import Meta
+
+
+def make_point(specialize=True):
+    class Point(metaclass=Meta, specialize=specialize):
+        def __new__(cls, x, alternative_instance=None):
+            if alternative_instance is not None:
+                return alternative_instance
+            return super().__new__(cls)
+
+        def __init__(self, x, alternative_instance=None):
+            self.x = x
+    return Point
+
+
+def test_specialized_class_gets_a_meta_subclass():
+    Point = make_point()
+    assert isinstance(Point, Meta) and type(Point).__call__ is not Meta.__call__
+    assert Point(1).x == 1 and Point(1, alternative_instance='alt') == 'alt'
+
+
+def test_subclasses_take_the_generic_path():
+    Point = make_point()
+
+    class Doubled(Point):
+        def __init__(self, x, alternative_instance=None):
+            super().__init__(x * 2)
+
+    assert type(Doubled).__call__ is Meta.__call__
+    assert Doubled(1).x == 2
+
+
+def test_init_of_the_instance_new_returned():
+    Point = make_point()
+    calls = []
+
+    class Sub(Point):
+        def __init__(self, x, alternative_instance=None):
+            calls.append(x)
+
+    Point.__new__ = lambda cls, x, alternative_instance=None: object.__new__(Sub)
+    assert isinstance(Point(1), Sub) and calls == [1]
+    assert [type(obj) for obj in Point.create_many([(2,), (3,)])] == [Sub, Sub] and calls == [1, 2, 3]
+    Point.__new__ = lambda cls, x, alternative_instance=None: alternative_instance
+    assert list(Point.create_many([(4, 'alt')])) == ['alt'] and calls == [1, 2, 3]
+
+
+@pytest.mark.parametrize('specialize', [False, True])
+def test_same_errors_as_type_call(specialize):
+    Point = make_point(specialize)
+    with pytest.raises(TypeError, match=r"Point(\.__new__)?\(\) got an unexpected keyword argument 'z'"):
+        Point(1, z=2)
+    Point.__init__ = lambda self, x, alternative_instance=None: 1
+    with pytest.raises(TypeError, match="should return None, not 'int'"):
+        Point(1)
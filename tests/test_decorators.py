@@ -0,0 +1,150 @@
+import asyncio
+import io
+import os
+import runpy
+import threading
+import time
+
+import pytest
+
+import tracing
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'decorators_optional-arguments.py')
+
+
+@pytest.fixture(scope='module')
+def script():
+    # the script's name isn't importable, its namespace is what scenarios.py runs too
+    return runpy.run_path(SCRIPT, run_name='test_decorators')
+
+
+class Created(object):
+    async def __new__(cls, value):
+        obj = super().__new__(cls)
+        obj.value = value
+        return obj
+
+
+def test_is_async(script):
+    async def coroutine():
+        pass
+    assert script['is_async'](coroutine)
+    assert script['is_async'](Created)
+    assert not script['is_async'](lambda: None)
+    assert not script['is_async'](script['xClass'])
+
+
+def test_decorated_coroutine_is_awaited(script):
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    decorated = script['decorator'](double)
+    assert decorated.__name__ == 'async_wrapper'
+    assert asyncio.run(decorated(21)) == 42
+
+
+def test_async_constructor_is_awaited(script):
+    decorated = script['decorator']()(Created)
+    obj = asyncio.run(decorated(3))
+    assert type(obj) is Created and obj.value == 3
+
+
+def test_traced_output_reaches_a_threaded_sink(script):
+    target = io.StringIO()
+    sink = tracing.ThreadedSink(target)
+    tracing.configure(sink=sink)
+    tracing.configure('decorators_optional-arguments', level=tracing.INFO)
+    try:
+        asyncio.run(script['decorator'](Created)(1))
+        tracing.flush()
+        assert sink.join(timeout=5)
+    finally:
+        tracing.configure('decorators_optional-arguments', level=tracing.OFF)
+        tracing.configure(sink=tracing.stdout)
+    assert 'decorator.decorator_.async_wrapper(' in target.getvalue()
+
+
+def test_registry_builds_each_variant_once(script):
+    registry, built = script['VariantRegistry'](maxsize=2), []
+
+    def factory(name):
+        return lambda: built.append(name) or type(name, (object,), {})
+    first = registry.get('a', factory('a'))
+    assert registry.get('a', factory('a')) is first and built == ['a']
+    registry.get('b', factory('b'))
+    registry.get('c', factory('c'))  # 'a' is the least recently used: evicted
+    stats = registry.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['pinned']) == (1, 3, 1, 2)
+    # evicted, but still alive: the weak table finds it, nothing is built again
+    assert registry.get('a', factory('a')) is first and built == ['a', 'b', 'c']
+
+
+def test_unbounded_registry_never_evicts(script):
+    registry = script['VariantRegistry'](maxsize=None)
+    for i in range(300):
+        registry.get(i, lambda: type('V', (object,), {}))
+    assert registry.stats()['pinned'] == 300 and registry.stats()['evictions'] == 0
+
+
+def test_decorations_alike_share_their_variant(script):
+    decorator, xClass = script['decorator'], script['xClass']
+    first = decorator('dec_posarg', dec_config={'change_name': 'Renamed'})(xClass)('a')
+    second = decorator(change_name='Renamed')(xClass)('b', 'kw')
+    assert type(first) is type(second) and type(first).__name__ == 'Renamed'
+    assert issubclass(type(first), xClass) and type(first).__bases__ == (xClass,)
+
+
+def test_alternative_types_are_interned_by_name(script):
+    alternative_type = script['alternative_type']
+    assert alternative_type('Alt') is alternative_type('Alt')
+    assert alternative_type('Alt') is not alternative_type('Other')
+    assert alternative_type('Alt').__name__ == 'Alt'
+
+
+def test_alternative_instances_share_their_type(script):
+    decorator, xClass = script['decorator'], script['xClass']
+    decorated = decorator('dec_posarg', dec_config={'alternative': 'Shared'})(xClass)
+    first, second = decorated('a'), decorated('b')
+    assert type(first) is type(second) is script['alternative_type']('Shared')
+    assert not isinstance(first, xClass) and str(first)
+
+
+def test_concurrent_first_calls_build_one_variant(script):
+    registry, built = script['VariantRegistry'](), []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        built.append(None)
+        time.sleep(0.01)  # a slow build: the other threads arrive while it is under way
+        return type('V', (object,), {})
+
+    def first_call(results):
+        barrier.wait()
+        results.append(registry.get('key', factory))
+    results = []
+    threads = [threading.Thread(target=first_call, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1 and len(results) == 8 and len(set(map(id, results))) == 1
+
+
+def test_counters_sum_the_shards_of_every_thread(script):
+    counters = script['Counters']('hits', 'misses')
+
+    def count():
+        shard = counters.shard()
+        for _ in range(1000):
+            shard['hits'] += 1
+        shard['misses'] += 1
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counters.totals() == {'hits': 4000, 'misses': 4}
+    counters.clear()
+    assert counters.totals() == {'hits': 0, 'misses': 0}
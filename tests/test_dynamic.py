@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+
+import dynamic
+from metaclasses import Meta
+
+
+class Slotted(object):
+    __slots__ = ('a', '__hidden', 'unset')
+
+    def __init__(self, a, hidden):
+        self.a, self.__hidden = a, hidden
+
+    def hidden(self):
+        return self.__hidden
+
+
+class Mixed(Slotted):
+    # no __slots__: instances have a __dict__ as well
+    pass
+
+
+dynamic.register(Slotted, 'tests.Slotted')
+dynamic.register(Mixed, 'tests.Mixed')
+
+
+def test_slots_survive_pickling():
+    obj = pickle.loads(pickle.dumps(Slotted(1, 'h')))
+    assert type(obj) is Slotted and (obj.a, obj.hidden()) == (1, 'h')
+    assert not hasattr(obj, 'unset')
+
+
+def test_slots_and_dict_survive_pickling():
+    mixed = Mixed(1, 'h')
+    mixed.extra = 2
+    obj = pickle.loads(pickle.dumps(mixed))
+    assert (obj.a, obj.hidden(), obj.extra) == (1, 'h', 2)
+
+
+def test_slotted_meta_classes_keep_slot_values_and_freeze():
+    Point = Meta('Point', (object,), {'_attrs': ['x', 'y'], '__init__': lambda self, x: setattr(self, 'x', x)},
+                 config=dict(attr_list='_attrs', instruction=('slots', 'freeze')))
+    dynamic.register(Point, 'tests.Point')
+    obj = pickle.loads(pickle.dumps(Point(3)))
+    assert (obj.x, obj.y) == (3, 0)  # y unset: still reads as its class-level default
+    with pytest.raises(AttributeError, match='frozen'):
+        obj.x = 4
@@ -0,0 +1,87 @@
+import gc
+
+import events
+
+
+class Subject(object):
+    pass
+
+
+def make_recorder(capacity=16):
+    recorder = events.Recorder(capacity)
+    recorder.enable()
+    return recorder
+
+
+def test_records_keep_their_order_through_the_ring():
+    recorder = make_recorder(capacity=4)
+    for phase in (events.CALL, events.C_NEW, events.C_INIT, events.RETURN, events.CALL):
+        recorder.record(phase, 'X')
+    assert [r[0] for r in recorder.records()] == ['C.new', 'C.init', 'M.return', 'M.call']
+    assert recorder.stats()['dropped'] == 1
+
+
+def test_binary_export_loads_back(tmp_path):
+    recorder = make_recorder()
+    recorder.record(events.CALL, Subject)
+    recorder.record(events.RETURN, Subject, events.SHARED)
+    path = str(tmp_path / 'run.bin')
+    with open(path, 'wb') as stream:
+        recorder.export(stream, binary=True)
+    written, records = events.load(path)
+    assert written == 2
+    assert events.golden(records) == ['M.call Subject', 'M.return Subject shared']
+
+
+def test_subjects_are_not_kept_alive():
+    recorder = make_recorder()
+    subject = type('Transient', (object,), {})
+    recorder.record(events.CALL, subject)
+    assert len(recorder._ids) == 1
+    del subject
+    gc.collect()
+    assert recorder._ids == {} and recorder._refs == {}
+    assert recorder.names == ['Transient']
+
+
+def test_unhashable_subjects_and_subjects_of_one_name():
+    recorder = make_recorder()
+    recorder.record(events.WRAPPER, [1, 2])
+    first, second = (lambda: None), (lambda: None)
+    recorder.record(events.WRAPPER, first)
+    recorder.record(events.WRAPPER, second)
+    assert recorder.names == ['list', first.__qualname__]
+    assert [r[1] for r in recorder.records()] == ['list', first.__qualname__, first.__qualname__]
+
+
+def test_recording_leaves_lazy_classes_pending():
+    import lazy
+    from metaclasses import Meta
+    recorder = make_recorder()
+    Record = Meta('Record', (object,), {}, lazy=True, mixin={'kind': 'record'})
+    recorder.record(events.INIT, Record)
+    assert lazy.is_pending(Record)
+    assert recorder.names == ['Record']
+
+
+def test_latency_report_per_phase():
+    records = [('M.call', 'X', 0, 0), ('C.new', 'X', 0, 1000), ('M.call', 'X', 0, 3000), ('C.new', 'X', 0, 4000)]
+    report = events.latency_report(records).splitlines()
+    assert report[1].split()[:3] == ['M.call', '2', '1.00']
+    assert report[2].split()[:3] == ['C.new', '1', '2.00']
+
+
+def test_chained_classes_record_their_calls():
+    from metaclasses import Meta
+    recorder = events.recorder
+    recorder.clear()
+    recorder.enable()
+    try:
+        class Chained(metaclass=Meta, chain=True):
+            def __init__(self, name=''):
+                self.name = name
+        Chained(name='x')
+    finally:
+        recorder.disable()
+    phases = [r[0] for r in recorder.records() if r[1].endswith('Chained')]
+    assert phases == ['M.prepare', 'M.new', 'M.init', 'M.call', 'M.return']
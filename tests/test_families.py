@@ -0,0 +1,87 @@
+import pytest
+
+import families
+import instructions
+from metaclasses import Meta
+
+
+def test_equal_configs_are_shared_whatever_their_order():
+    specs = [{'name': 'A', 'mixin': {'x': 1, 'y': 'y'}},
+             {'name': 'B', 'mixin': {'y': 'y', 'x': 1}},
+             {'name': 'C', 'config': {'attr_list': '_attrs', 'instruction': ['nullify']}, 'attrs': {'_attrs': ['a']}},
+             {'name': 'D', 'config': {'instruction': ['nullify'], 'attr_list': '_attrs'}, 'attrs': {'_attrs': ['a']}}]
+    family = Meta.build_family(specs)
+    assert family.stats()['mixins'] == 1 and family.stats()['plans'] == 1
+
+
+def test_values_of_other_types_stay_apart():
+    family = Meta.build_family([{'name': 'One', 'mixin': {'x': 1}},
+                                {'name': 'Yes', 'mixin': {'x': True}},
+                                {'name': 'Float', 'mixin': {'x': 1.0}},
+                                {'name': 'Nested', 'mixin': {'x': (1,)}},
+                                {'name': 'NestedYes', 'mixin': {'x': (True,)}}])
+    assert [type(family[name].x) for name in ('One', 'Yes', 'Float')] == [int, bool, float]
+    assert type(family['NestedYes'].x[0]) is bool
+    assert family.stats()['mixins'] == 5
+
+
+def test_unhashable_values_are_not_merged_by_their_text():
+    class Opaque(object):
+        __hash__ = None
+
+        def __repr__(self):
+            return 'same'
+    first, second = Opaque(), Opaque()
+    family = Meta.build_family([{'name': 'A', 'mixin': {'x': first}}, {'name': 'B', 'mixin': {'x': second}}])
+    assert family['A'].x is first and family['B'].x is second
+
+
+def test_specs_are_validated_before_any_class_is_built():
+    built = []
+
+    class Counting(Meta):
+        def __init__(cls, name, bases, attrs, **configs):
+            built.append(name)
+            super().__init__(name, bases, attrs, **configs)
+    specs = [{'name': 'A'}, {'name': 'B', 'config': {'instruction': 'no such instruction'}}]
+    with pytest.raises(ValueError, match='^B: '):
+        families.build(Counting, specs)
+    assert built == []
+
+
+@pytest.mark.parametrize('specs, error', [
+    ([{'name': 'A'}, {'name': 'B', 'bases': ['A']}, {'name': 'C', 'bases': ['A', 'B']}], 'consistent method resolution'),
+    ([{'name': 'A', 'specialize': True}, {'name': 'B', 'specialize': True}, {'name': 'C', 'bases': ['A', 'B']}],
+     'metaclass conflict'),
+])
+def test_mro_and_metaclass_conflicts_are_found_before_any_class_is_built(specs, error):
+    built = []
+
+    class Counting(Meta):
+        def __init__(cls, name, bases, attrs, **configs):
+            built.append(name)
+            super().__init__(name, bases, attrs, **configs)
+    with pytest.raises(TypeError, match='^C: .*%s' % error):
+        families.build(Counting, specs)
+    assert built == []
+
+
+def test_derived_from_a_specialized_class():
+    family = Meta.build_family([{'name': 'A', 'specialize': True}, {'name': 'B'},
+                                {'name': 'C', 'bases': ['A', 'B']}, {'name': 'D', 'bases': ['C']}])
+    assert issubclass(type(family['D']), type(family['C'])) and type(family['C']) is not type(family['A'])
+
+
+def test_each_config_is_planned_once():
+    reused = instructions.stats['plans_reused']
+    family = Meta.build_family([{'name': name, 'config': 'record', 'attrs': {'_attrs': ['a']}} for name in 'ABC'],
+                               configs={'record': {'attr_list': '_attrs', 'instruction': 'nullify'}})
+    assert instructions.stats['plans_reused'] - reused <= 1
+    assert family['C']().a == 0
+
+
+def test_stats_time_the_whole_call():
+    family = Meta.build_family([{'name': 'A'}, {'name': 'B', 'bases': ['A']}])
+    stats = family.stats()
+    assert issubclass(family['B'], family['A'])
+    assert stats['seconds'] > 0 and stats['classes_per_second'] == 2 / stats['seconds']
@@ -0,0 +1,49 @@
+import flyweights
+from metaclasses import Meta
+
+
+def make_table():
+    return flyweights.Flyweights(enabled=True)
+
+
+def test_equal_payloads_are_one_frozen_object():
+    table = make_table()
+    first = table.intern({'key': 'value', 'items': [1, 2]})
+    assert isinstance(first, flyweights.FrozenDict) and first['items'] == (1, 2)
+    assert table.intern({'items': [1, 2], 'key': 'value'}) is first
+    assert table.stats()['shared'] == 1
+
+
+def test_values_of_different_types_stay_apart():
+    table = make_table()
+    flag = table.intern({'flag': True})
+    one = table.intern({'flag': 1})
+    assert one is not flag and type(one['flag']) is int
+    assert type(table.intern({'nested': {'n': 1.0}})['nested']['n']) is float
+    assert type(table.intern({'nested': {'n': 1}})['nested']['n']) is int
+
+
+def test_hashconsed_values_of_different_nested_types_stay_apart():
+    class V(metaclass=Meta, config=dict(attr_list='_attrs', instruction='hashcons')):
+        _attrs = ['v']
+
+        def __init__(self, v):
+            self.v = v
+
+    one, flag, real = V((1,)), V((True,)), V(((1.0,),))
+    assert one is not flag and type(flag.v[0]) is bool
+    assert V(((1,),)) is not real and V((1,)) is one
+    assert V([1]) is not V([1])  # a list can change under the table: not a value
+
+
+def test_typed_key():
+    assert flyweights.typed_key([1]) != flyweights.typed_key((1,))
+    assert flyweights.typed_key({'a': 1}) == flyweights.typed_key({'a': 1})
+    assert flyweights.typed_key({'a': 1}) != flyweights.typed_key({'a': True})
+
+
+def test_unhashable_payloads_are_returned_as_they_are():
+    table = make_table()
+    payload = {'key': bytearray(b'x')}
+    assert table.intern(payload) is payload
+    assert table.stats()['unhashable'] == 1
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from benchmarks import harness
+
+
+def case(name):
+    return name, lambda: None
+
+
+def test_measure_reports_wall_and_cpu_time():
+    result = harness.measure('noop', lambda: None, number=10, repeat=3, warmup=1)
+    assert result['name'] == 'noop' and (result['number'], result['repeat']) == (10, 3)
+    for key in ('wall_us', 'wall_median_us', 'cpu_us', 'cpu_median_us'):
+        assert result[key] >= 0
+    assert result['wall_us'] <= result['wall_median_us']
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold():
+    baseline = [{'name': 'same', 'wall_us': 1.0}, {'name': 'slower', 'wall_us': 1.0},
+                {'name': 'a bit slower', 'wall_us': 1.0}]
+    results = [{'name': 'same', 'wall_us': 1.0}, {'name': 'slower', 'wall_us': 1.5},
+               {'name': 'a bit slower', 'wall_us': 1.05}, {'name': 'new', 'wall_us': 9.0}]
+    assert harness.compare(results, baseline, threshold=0.10) == ['slower']
+    assert harness.compare(results, baseline, threshold=0.60) == []
+
+
+def test_main_writes_results_and_exits_on_a_regression(tmp_path):
+    out = tmp_path / 'results.jsonl'
+    results = harness.main([case('noop'), case('other')], ['--out', str(out), '--number', '10', '--repeat', '2',
+                                                           '--filter', 'noop'])
+    assert [result['name'] for result in results] == ['noop']
+    assert harness.load(str(out)) == json.loads(json.dumps(results))
+
+    # a baseline 1000 times faster than anything can run: a sure regression
+    baseline = tmp_path / 'baseline.jsonl'
+    baseline.write_text(json.dumps(dict(results[0], wall_us=results[0]['wall_us'] / 1000)) + '\n')
+    with pytest.raises(SystemExit) as exited:
+        harness.main([case('noop')], ['--compare', str(baseline), '--number', '10', '--repeat', '2'])
+    assert 'noop' in str(exited.value.code)
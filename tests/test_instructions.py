@@ -0,0 +1,132 @@
+import pytest
+
+import instructions
+from metaclasses import Meta
+
+
+def make_frozen(instruction='freeze'):
+    class Base(metaclass=Meta, config=dict(attr_list='_attrs', instruction=instruction)):
+        _attrs = ['a']
+
+        def __init__(self, a):
+            self.a = a
+
+    class Child(Base):
+        def __init__(self, a, b):
+            super().__init__(a)
+            self.b = b
+
+    return Base, Child
+
+
+@pytest.mark.parametrize('instruction', ['freeze', 'hashcons'])
+def test_subclass_init_runs_to_the_end_before_freezing(instruction):
+    Base, Child = make_frozen(instruction)
+    child = Child(1, 2)
+    assert (child.a, child.b) == (1, 2)
+    with pytest.raises(AttributeError, match='frozen'):
+        child.b = 3
+    with pytest.raises(AttributeError, match='frozen'):
+        Base(1).a = 2
+
+
+def test_freeze_does_not_wrap_init():
+    Base, _ = make_frozen()
+    assert '__wrapped__' not in vars(Base.__init__)
+
+
+def test_freeze_through_specialized_constructor_and_create_many():
+    class Point(metaclass=Meta, specialize=True, config=dict(instruction='freeze')):
+        def __init__(self, x):
+            self.x = x
+
+    for point in [Point(1)] + list(Point.create_many([(2,)])):
+        with pytest.raises(AttributeError, match='frozen'):
+            point.x = 0
+
+
+def test_class_without_attr_list_still_gets_the_other_steps():
+    class Record(metaclass=Meta, config=dict(attr_list='_attrs', instruction=('nullify', 'freeze'))):
+        def __init__(self, a):
+            self.a = a
+
+    assert not hasattr(Record, '_attrs')
+    with pytest.raises(AttributeError, match='frozen'):
+        Record(1).a = 2
+
+
+def test_instructions_on_the_attr_list_need_one_configured():
+    with pytest.raises(ValueError, match="attr_list"):
+        Meta('Record', (object,), {}, config=dict(instruction='nullify'))
+
+
+def test_equal_configs_share_one_plan():
+    first = instructions.plan_for(dict(attr_list='_attrs', instruction=['nullify', 'intern']))
+    assert instructions.plan_for(dict(attr_list='_attrs', instruction=('nullify', 'intern'))) is first
+    assert instructions.plan_for(dict(attr_list='_attrs', instruction='nullify')) is not first
+
+
+def test_a_config_changed_after_use_gets_its_own_plan():
+    config = dict(attr_list='_attrs', instruction='nullify')
+    Meta('First', (object,), {'_attrs': ['a']}, config=config)
+    config['instruction'] = 'slots'
+    second = Meta('Second', (object,), {'_attrs': ['a']}, config=config)
+    assert second.__slots__ == ('a',)
+
+
+def test_a_config_reused_as_it_is_keeps_its_plan():
+    config = dict(attr_list='_attrs', instruction=['nullify'], defaults={'flag': 1})
+    first = instructions.plan_for(config)
+    assert instructions.plan_for(config) is first
+    config['instruction'].append('intern')  # in place: the plan's copy still has the old list
+    assert instructions.plan_for(config).names == ('nullify', 'intern')
+    config['instruction'].pop()
+    config['defaults']['flag'] = True  # equal to 1, but not the same value
+    assert instructions.plan_for(config) is not first
+    assert instructions.plan_for(config).config['defaults']['flag'] is True
+
+
+def test_defaults_of_different_types_get_different_plans():
+    one = Meta('One', (object,), {}, config=dict(instruction='defaults', defaults={'flag': 1}))
+    true = Meta('True_', (object,), {}, config=dict(instruction='defaults', defaults={'flag': True}))
+    assert type(one.flag) is int and true.flag is True
+
+
+def test_plan_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(instructions, 'PLAN_CACHE_SIZE', 8)
+    for i in range(20):
+        instructions.plan_for(dict(instruction='defaults', defaults={'n': i}))
+    assert len(instructions._plans) <= 8 and len(instructions._seen) <= 8
+
+
+def test_unset_slots_read_as_their_defaults():
+    class Record(metaclass=Meta, config=dict(attr_list='_attrs', instruction=('defaults', 'slots'),
+                                             defaults={'b': 'b default'})):
+        _attrs = ['a', 'b']
+
+    record = Record()
+    assert not hasattr(record, '__dict__') and isinstance(vars(Record)['a'], instructions.SlotDefault)
+    assert (record.a, record.b) == (0, 'b default') and Record.b == 'b default'
+    record.b = 'set'
+    assert record.b == 'set'
+    del record.b
+    assert record.b == 'b default'
+    with pytest.raises(AttributeError):
+        del record.b  # nothing set anymore
+
+
+def test_frozen_slotted_instances_reject_writes():
+    class Point(metaclass=Meta, config=dict(attr_list='_attrs', instruction=('slots', 'freeze'))):
+        _attrs = ['x', 'y']
+
+        def __init__(self, x):
+            self.x = x
+
+    point = Point(1)
+    assert (point.x, point.y) == (1, 0)
+    for name in ('x', 'y'):
+        with pytest.raises(AttributeError, match='frozen'):
+            setattr(point, name, 2)
+        with pytest.raises(AttributeError, match='frozen'):
+            delattr(point, name)
+    assert (point.x, point.y) == (1, 0)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+import events
+import lazy
+import profiling
+from metaclasses import Meta
+
+
+def make_lazy(**attrs):
+    return Meta('Record', (object,), dict(attrs), lazy=True, mixin={'kind': 'record'},
+                config=dict(attr_list='_attrs', instruction=('nullify', 'freeze')))
+
+
+def test_finalized_on_first_use():
+    Record = make_lazy(_attrs=['a'])
+    assert lazy.is_pending(Record)
+    assert Record.kind == 'record' and Record.a == 0
+    assert not lazy.is_pending(Record) and type(Record) is Meta
+
+
+def test_class_declaring_slots_with_freeze_is_not_deferred():
+    class V(metaclass=Meta, lazy=True, mixin={'kind': 'v'}, config=dict(instruction='freeze')):
+        __slots__ = ('x',)
+
+        def __init__(self, x):
+            self.x = x
+
+    assert not lazy.is_pending(V) and V.kind == 'v'
+    v = V(1)
+    assert v.x == 1
+    with pytest.raises(AttributeError, match='frozen'):
+        v.x = 2
+
+
+def test_subclass_of_a_lazy_base_is_initialized(monkeypatch):
+    monkeypatch.setattr(profiling, 'classes', profiling.ClassProfiler(enabled=True))
+    recorder = events.recorder
+    recorder.clear()
+    recorder.enable()
+    try:
+        Base = make_lazy(_attrs=['a'])
+
+        class Child(Base):
+            b = 1
+    finally:
+        recorder.disable()
+    assert type(Child) is Meta and not lazy.is_pending(Base)
+    assert Child.kind == 'record' and Child.a == 0 and Child.b == 1
+    phases = [r[0] for r in recorder.records() if r[1].endswith('Child')]
+    assert phases == ['M.prepare', 'M.new', 'M.init']
+    assert profiling.classes._open == {}
+    assert [r['class'] for r in profiling.classes.records] == ['Record', 'Child']
+
+
+def test_other_threads_wait_for_finalization(monkeypatch):
+    started = threading.Event()
+    finalize = lazy._finalize
+
+    def slow_finalize(*args):
+        started.set()
+        time.sleep(0.05)
+        finalize(*args)
+
+    monkeypatch.setattr(lazy, '_finalize', slow_finalize)
+    Record = make_lazy(_attrs=['a'])
+    first_use = threading.Thread(target=Record)
+    first_use.start()
+    started.wait()
+    # the class is being finalized by the other thread: this lookup waits for it to be complete
+    assert Record.kind == 'record' and Record.a == 0
+    first_use.join()
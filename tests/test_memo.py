@@ -0,0 +1,54 @@
+import pytest
+
+import memo
+
+
+def counting():
+    calls = []
+
+    def func(*args, **kwargs):
+        calls.append((args, kwargs))
+        return len(calls)
+    return func, calls
+
+
+@pytest.mark.parametrize('config', [-1, {'maxsize': -5}, {'maxsize': 1.5}, {'ttl': 0}, {'size': 3}, 'big', False])
+def test_invalid_configurations_are_rejected(config):
+    with pytest.raises(ValueError):
+        memo.Memo.from_config(config)
+
+
+@pytest.mark.parametrize('config, maxsize', [(True, 128), (0, 0), (16, 16), ({'maxsize': None}, None)])
+def test_valid_configurations(config, maxsize):
+    assert memo.Memo.from_config(config).maxsize == maxsize
+
+
+def test_equal_arguments_of_different_types_are_different_calls():
+    cache, (func, calls) = memo.Memo(), counting()
+    results = [cache.call(func, (value,), {}) for value in (1, True, 1.0, 1)]
+    assert results == [1, 2, 3, 1] and len(calls) == 3
+    assert cache.call(func, (), {'flag': 1}) != cache.call(func, (), {'flag': True})
+
+
+def test_lru_eviction_and_unhashable_arguments():
+    cache, (func, calls) = memo.Memo(maxsize=2), counting()
+    for value in ('a', 'b', 'a', 'c', 'b'):
+        cache.call(func, (value,), {})
+    assert cache.stats()['evictions'] == 2 and len(calls) == 4
+    assert cache.call(func, ([1],), {}) == cache.call(func, ([1],), {})
+    assert cache.call(func, ([1],), {}) != cache.call(func, ((1,),), {})
+
+
+def test_nested_arguments_of_different_types_are_different_calls():
+    cache, (func, calls) = memo.Memo(), counting()
+    for value in ([1], [True], (1,), (True,), ((1,),), ((1.0,),), {'a': [1]}, {'a': [True]}, [1], (True,)):
+        cache.call(func, (value,), {})
+    assert len(calls) == 8 and cache.stats()['hits'] == 2
+
+
+def test_keyword_names_are_part_of_the_key():
+    cache = memo.Memo()
+    assert cache.key((), {'a': 1}) != cache.key((), {'b': 1})
+    assert cache.key((1,), {}) != cache.key((), {'a': 1})
+    assert cache.key(([1],), {'a': [2]}) == cache.key(([1],), {'a': [2]})
+    assert cache.key(([{}],), {}) is not None and cache.key(([bytearray()],), {}) is None
@@ -0,0 +1,54 @@
+import os
+import runpy
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'decorator_with-arguments.py')
+
+
+@pytest.fixture(scope='module')
+def decorator():
+    return runpy.run_path(SCRIPT, run_name='test_mixins')['decorator']
+
+
+def greet(self):
+    return 'hello from %s' % type(self).__name__
+
+
+def test_mixins_are_bound_per_instance_by_default(decorator):
+    class Plain(object):
+        def __init__(self, value):
+            self.value = value
+
+    decorated = decorator(mixin={'greet': greet})(Plain)
+    first, second = decorated(1), decorated(2)
+    assert 'greet' in vars(first) and 'greet' not in vars(Plain)
+    assert first.greet() == 'hello from Plain' and first.greet.__self__ is first
+    assert first.greet is not second.greet and second.value == 2
+
+
+def test_class_mode_installs_mixins_as_class_attributes(decorator):
+    class Plain(object):
+        def __init__(self, value):
+            self.value = value
+
+    # the decorated name is the wrapper, the class itself is what gets the mixins
+    obj = decorator(mixin={'greet': greet}, mixin_mode='class')(Plain)(1)
+    assert vars(obj) == {'value': 1} and vars(Plain)['greet'] is greet
+    assert obj.greet() == 'hello from Plain'
+
+
+def test_init_is_substituted_once_at_decoration(decorator):
+    calls = []
+
+    class Plain(object):
+        def __init__(self, value):
+            calls.append(value)
+
+    decorated = decorator(mixin={'greet': greet})(Plain)
+    init = Plain.__init__
+    for value in range(5):
+        decorated(value)
+    # every call runs the original __init__ exactly once, nothing wraps it again
+    assert Plain.__init__ is init and calls == list(range(5))
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from metaclasses import Meta
+
+
+def make_pooled(size=4):
+    class Record(metaclass=Meta, pool=size, config=dict(attr_list='_attrs', instruction='nullify')):
+        _attrs = ['a']
+
+        def __init__(self, a):
+            self.a = a
+    return Record
+
+
+def test_released_instances_are_reset_and_reused():
+    Record = make_pooled()
+    first = Record(1)
+    Record.release(first)
+    assert first.a == 0
+    assert Record(2) is first and first.a == 2
+    assert Record.pool_stats()['hits'] == 1
+    Record.release(first)
+    with pytest.raises(ValueError, match='released already'):
+        Record.release(first)
+
+
+def test_counters_are_exact_across_threads():
+    Record = make_pooled(size=8)
+
+    def churn():
+        for i in range(2000):
+            Record.release(Record(i))
+
+    threads = [threading.Thread(target=churn) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = Record.pool_stats()
+    assert stats['hits'] + stats['misses'] == stats['releases'] == 8000
+    assert stats['free'] <= 8
@@ -0,0 +1,93 @@
+import pytest
+
+import profiling
+
+
+def make_profiler(enabled=True):
+    return profiling.DecoratorProfiler(enabled=enabled)
+
+
+def test_disabled_profiler_keeps_no_targets():
+    profiler = make_profiler(enabled=False)
+    func = lambda: None
+    assert profiler.target(func) is None
+    assert profiler.start(func) is None
+    profiler.record(func, 'decorator_', 10)
+    assert profiler.snapshot() == {}
+    assert len(profiler._targets) == 0
+
+
+def test_targets_of_one_name_stay_apart():
+    profiler = make_profiler()
+    first, second = (lambda: None), (lambda: None)
+    profiler.record(first, 'decorator_', 10)
+    profiler.record(second, 'decorator_', 20)
+    profiler.record(first, 'decorator_', 30)
+    snapshot = profiler.snapshot()
+    name = '%s.%s' % (__name__, first.__qualname__)
+    assert snapshot[name]['decorator_']['calls'] == 2
+    assert snapshot[name + '#2']['decorator_']['calls'] == 1
+
+
+def test_targets_go_with_their_object():
+    profiler = make_profiler()
+
+    def func():
+        pass
+    profiler.record(func, 'decorator_', 10)
+    assert len(profiler._targets) == 1
+    del func
+    assert len(profiler._targets) == 0
+
+
+def test_objects_without_weak_references():
+    profiler = make_profiler()
+    obj = [1, 2]  # neither hashable nor weakly referenced
+    assert profiler.target(obj) is profiler.target(obj)
+    assert profiler.target([1, 2]) is not profiler.target(obj)
+
+
+def test_start_samples_enabled_calls():
+    profiler = profiling.DecoratorProfiler(enabled=True, sample=2)
+    func = lambda: None
+    probes = [profiler.start(func) for _ in range(4)]
+    assert [probe is not None for probe in probes] == [False, True, False, True]
+    probes[1].lap('target')
+    probes[1].done()
+    layers = profiler.snapshot()['%s.%s' % (__name__, func.__qualname__)]
+    assert layers['wrapper']['calls'] == 4
+    assert layers['target']['sampled'] == 1
+
+
+def test_clock_counts_nanoseconds():
+    assert isinstance(profiling.clock(), int)
+
+
+def test_environment_switches():
+    assert profiling._parse_environ('decorators, classes,sample=10') == ({'decorators', 'classes'}, 10)
+
+
+@pytest.mark.parametrize('value, switches', [('classes,sample=often', {'classes'}), ('sample=0', set()),
+                                              ('decorators,clases', {'decorators'})])
+def test_bad_environment_values_are_ignored_with_a_warning(value, switches):
+    with pytest.warns(RuntimeWarning, match='METACLASSING_PROFILE'):
+        assert profiling._parse_environ(value) == (switches, 1)
+
+
+def test_classes_failing_to_be_created_leave_nothing_open(monkeypatch):
+    from metaclasses import Meta
+    profiler = profiling.ClassProfiler(enabled=True)
+    monkeypatch.setattr(profiling, 'classes', profiler)
+    with pytest.raises(ValueError, match='pool'):
+        class Shared(metaclass=Meta, pool=4, config=dict(instruction='hashcons')):
+            pass
+    assert profiler._open == {} and profiler.records == []
+    for _ in range(profiler.MAX_OPEN + 10):
+        with pytest.raises(ZeroDivisionError):
+            class Broken(metaclass=Meta):
+                1 / 0  # the body raises: Meta never hears about it again
+    assert len(profiler._open) == profiler.MAX_OPEN
+
+    class Fine(metaclass=Meta):
+        pass
+    assert [record['class'] for record in profiler.records] == ['Fine']
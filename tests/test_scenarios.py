@@ -0,0 +1,69 @@
+import os
+import textwrap
+
+import scenarios
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'decorators_optional-arguments.py')
+
+
+def table(tmp_path):
+    path = tmp_path / 'table.py'
+    path.write_text(textwrap.dedent('''
+        import tracing
+
+
+        class UseCase(object):
+            def __init__(self, description, obj):
+                self.description, self.obj = description, obj
+
+
+        def fails():
+            tracing.echo('before failing')
+            raise LookupError('no such thing')
+
+        cases = (
+            UseCase('passes', lambda: 42),
+            UseCase('fails', fails),
+            UseCase('passes too', lambda: tracing.echo('echoed') or 'done'),
+        )
+    '''))
+    return str(path)
+
+
+def test_the_decorators_table_passes_in_order():
+    report = scenarios.run(SCRIPT, workers=0)
+    assert report.ok and report.results
+    assert [result.index for result in report.results] == list(range(len(report.results)))
+    assert all('+++ RESULT' in result.output for result in report.results)
+
+
+def test_a_failing_scenario_reports_its_traceback(tmp_path):
+    report = scenarios.run(table(tmp_path), table='cases', workers=0)
+    assert not report.ok and [result.index for result in report.failed] == [1]
+    failed = report.failed[0].output
+    assert failed.startswith('before failing\n') and "LookupError: no such thing" in failed
+    assert report.results[2].output == 'echoed\n+++ RESULT: done\n'
+
+    formatted = report.format()
+    assert '    1 FAIL' in formatted and '      | LookupError: no such thing' in formatted
+    assert '      | echoed' not in formatted and '      | echoed' in report.format(outputs=True)
+    assert formatted.splitlines()[-1].startswith('2 passed, 1 failed in ')
+
+
+def test_latency_and_as_dict(tmp_path):
+    report = scenarios.run(table(tmp_path), table='cases', workers=0)
+    latency = report.latency()
+    assert latency['min'] <= latency['median'] <= latency['p95'] <= latency['max']
+    summary = report.as_dict()
+    assert (summary['passed'], summary['failed'], summary['workers']) == (2, 1, 0)
+    assert [result['description'] for result in summary['results']] == ['passes', 'fails', 'passes too']
+    assert scenarios.Report([], 0.0, 0).latency() == {}
+
+
+def test_workers_give_the_outcomes_of_an_in_process_run(tmp_path):
+    path = table(tmp_path)
+    pooled = scenarios.run(path, table='cases', workers=2, chunksize=1)
+    in_process = scenarios.run(path, table='cases', workers=0)
+    assert [(result.ok, result.output.splitlines()[-1]) for result in pooled.results] == \
+        [(result.ok, result.output.splitlines()[-1]) for result in in_process.results]
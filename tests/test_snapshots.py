@@ -0,0 +1,56 @@
+import snapshots
+from metaclasses import Meta
+
+
+def through_dir(obj):
+    return {k: getattr(obj, k) for k in dir(obj) if not k.startswith('__')}
+
+
+class Plain(object):
+    shared = 'plain'
+
+
+def test_snapshot_is_kept_until_a_class_of_the_mro_changes():
+    class Record(Plain, metaclass=Meta):
+        own = 1
+    first = snapshots.class_attrs(Record)
+    assert snapshots.class_attrs(Record) is first
+    Record.own = 2
+    assert snapshots.class_attrs(Record) == {'own': 2, 'shared': 'plain'}
+
+
+def test_bases_not_created_by_meta_are_checked_too():
+    class Base(object):
+        value = 'old'
+
+    class Record(Base, metaclass=Meta):
+        pass
+    assert snapshots.class_attrs(Record)['value'] == 'old'
+    Base.value = 'new'  # no invalidate(Base)
+    assert snapshots.class_attrs(Record)['value'] == 'new'
+    Base.added = True
+    del Base.value
+    assert snapshots.class_attrs(Record) == {'added': True}
+    assert snapshots.class_attrs(Base) == through_dir(Base)
+
+
+def test_instance_attributes_in_the_order_of_dir():
+    class Record(metaclass=Meta):
+        b = 'class'
+        __slots__ = ('d', '__dict__')
+
+        def method(self):
+            pass
+
+        @property
+        def prop(self):
+            return self.b * 2
+
+    record = Record()
+    record.z, record.a, record.b = 'z', 'a', 'instance'
+    attrs = snapshots.instance_attrs(record)
+    assert list(attrs) == ['a', 'b', 'method', 'prop', 'z']  # getattr(record, 'd') raises: left out
+    assert attrs['prop'] == 'instanceinstance' and attrs['method'] == record.method
+    record.d = 4
+    attrs = snapshots.instance_attrs(record)
+    assert attrs == through_dir(record) and list(attrs) == list(through_dir(record))
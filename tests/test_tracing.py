@@ -0,0 +1,97 @@
+import io
+import threading
+import time
+
+import pytest
+
+import tracing
+
+
+def test_environment_levels():
+    assert tracing._parse_environ('info,metaclasses=off') == {None: tracing.INFO, 'metaclasses': tracing.OFF}
+
+
+def test_unknown_environment_level_is_ignored_with_a_warning():
+    with pytest.warns(RuntimeWarning, match='loud'):
+        levels = tracing._parse_environ('loud,metaclasses=OFF')
+    assert levels == {'metaclasses': tracing.OFF}
+
+
+def test_configure_after_creation_reaches_existing_tracers():
+    trace = tracing.get_tracer('test_tracing')
+    sink = io.StringIO()
+    tracing.configure(sink=sink)
+    try:
+        tracing.configure('test_tracing', level=tracing.INFO)
+        trace('shown %d', 1)
+        trace('hidden', level=tracing.DEBUG)
+        tracing.configure('test_tracing', level=tracing.OFF)
+        trace('silenced')
+        tracing.flush()
+    finally:
+        tracing.configure(sink=tracing.stdout)
+    assert sink.getvalue() == 'shown 1\n'
+
+
+class _Failing(object):
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        if data.startswith('bad'):
+            raise OSError('disk full')
+        self.written.append(data)
+
+
+def test_threaded_sink_survives_a_failing_write(capsys):
+    target = _Failing()
+    sink = tracing.ThreadedSink(target)
+    for data in ('one\n', 'bad\n', 'two\n'):
+        sink.write(data)
+    assert sink.join(timeout=5)
+    assert target.written == ['one\n', 'two\n']
+    assert sink.errors == 1
+    assert 'disk full' in capsys.readouterr().err
+
+
+def test_threaded_sink_join_gives_up_after_its_timeout():
+    release = threading.Event()
+
+    class Stuck(object):
+        def write(self, data):
+            release.wait()
+
+    sink = tracing.ThreadedSink(Stuck())
+    sink.write('line\n')
+    try:
+        assert sink.join(timeout=0.05) is False
+    finally:
+        release.set()
+    assert sink.join(timeout=5)
+
+
+def test_concurrent_writers_lose_no_lines():
+    class Slow(object):
+        # a slow target lets the other writers append while a flush is under way
+        def __init__(self):
+            self.lines = []
+
+        def write(self, data):
+            time.sleep(0)
+            self.lines.extend(data.splitlines())
+
+    sink = Slow()
+    tracing.configure(sink=sink, buffer_size=8)
+    try:
+        def write(n):
+            for i in range(500):
+                tracing.echo('%d-%d' % (n, i))
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracing.flush()
+    finally:
+        tracing.configure(sink=tracing.stdout, buffer_size=64)
+    assert sorted(sink.lines) == sorted('%d-%d' % (n, i) for n in range(4) for i in range(500))
@@ -0,0 +1,58 @@
+import gc
+
+import pytest
+
+import tracking
+from metaclasses import Meta
+
+
+def make_record(track=True, **keywords):
+    class Record(metaclass=Meta, track=track, **keywords):
+        def __init__(self, value=None):
+            self.value = value
+    return Record
+
+
+def test_live_count_and_high_water_mark():
+    Record = make_record()
+    records = [Record(i) for i in range(5)]
+    stats = Record.live_stats()
+    assert (stats['live'], stats['high_water'], stats['created']) == (5, 5, 5)
+    assert set(Record.live_instances()) == set(records)
+    del records[:3]
+    gc.collect()
+    stats = Record.live_stats()
+    assert (stats['live'], stats['high_water'], stats['created']) == (2, 5, 5)
+    del records
+    gc.collect()
+    assert Record.live_stats()['live'] == 0 and Record.live_instances() == []
+
+
+@pytest.mark.parametrize('keywords', [{}, {'specialize': True}])
+def test_every_way_of_constructing_is_counted(keywords):
+    Record = make_record(**keywords)
+    records = [Record(1)] + list(Record.create_many([(2,), (3,)]))
+    assert Record.live_stats()['live'] == 3
+    del records
+    gc.collect()
+    assert Record.live_stats()['live'] == 0 and Record.live_stats()['created'] == 3
+
+
+def test_sampled_counts_are_estimates():
+    Record = make_record(track=2)
+    records = [Record() for _ in range(6)]
+    stats = Record.live_stats()
+    assert (stats['tracked'], stats['live'], stats['created']) == (3, 6, 6)
+    assert len(records) == 6
+
+
+def test_deep_size_follows_containers():
+    Record = make_record()
+    small, big = Record([]), Record([list(range(100))])
+    assert tracking.deep_size(big) > tracking.deep_size(small)
+    assert Record.live_stats()['deep_bytes'] >= tracking.deep_size(big)
+
+
+def test_untracked_class():
+    with pytest.raises(TypeError, match='track'):
+        make_record(track=None).live_stats()
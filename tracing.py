@@ -0,0 +1,223 @@
+"""
+Leveled, lazily formatted tracing shared by the scripts of this repository.
+
+Every stage of class and instance creation (Meta.__prepare__/__new__/__init__/__call__,
+xClass.__new__/__init__, each decorator layer) reports itself through a Tracer:
+
+    trace = tracing.get_tracer('metaclasses')
+    trace('  Meta.__new__(mcs=%s, name=%r)', mcs, name)                 # %-style
+    trace.format('{}xClass.__new__(cls={})', sp_short, cls, level=DEBUG)  # str.format-style
+
+Messages are formatted ONLY when the tracer's level lets them through,
+so with tracing off no string is built and no __str__ (Meta.__str__ runs dir() over a class) is called.
+Whatever is let through lands in one shared buffer, which is written to the sink
+when it holds buffer_size lines, on flush() and at interpreter exit.
+
+Tracers are switched per module, either in code, at any time (tracers already created follow,
+but what a module traces while it is imported is only silenced by configuring before the import):
+    tracing.configure('metaclasses', level=tracing.OFF)
+or from the environment, read once when tracing is imported:
+    METACLASSING_TRACE=off                                   # every module
+    METACLASSING_TRACE=info,decorators_optional-arguments=off
+An unknown level there is warned about and ignored: the tracer keeps its default.
+
+Under asyncio, a flush writing to the sink would block the event loop; a ThreadedSink takes it over:
+    tracing.configure(sink=tracing.ThreadedSink())
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+import warnings
+
+OFF, INFO, DEBUG = 0, 1, 2
+_level_names = {'off': OFF, 'info': INFO, 'debug': DEBUG}
+
+
+class _Stdout(object):
+    """
+    Default sink: whatever sys.stdout is at the time of writing (honours contextlib.redirect_stdout).
+    """
+    def write(self, data):
+        return sys.stdout.write(data)
+
+    def flush(self):
+        return sys.stdout.flush()
+
+stdout = _Stdout()
+
+
+class ThreadedSink(object):
+    """
+    A sink which only queues what it is given: one background thread writes it, in order, to the
+    target sink. write() and flush() never wait for I/O; join() waits until everything queued is written.
+    A write the target fails is reported on sys.stderr and dropped, the thread goes on with the next one.
+    """
+    def __init__(self, target=stdout):
+        self.target = target
+        self._queue = queue.Queue()
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name='tracing-sink', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            try:
+                self.target.write(data)
+                if hasattr(self.target, 'flush'):
+                    self.target.flush()
+            except Exception:
+                # nothing to raise it to: a dead thread would leave join() waiting forever
+                self.errors += 1
+                sys.stderr.write('tracing-sink: dropped %d characters, writing them failed:\n%s'
+                                 % (len(data), traceback.format_exc()))
+            finally:
+                self._queue.task_done()
+
+    def write(self, data):
+        self._queue.put(data)
+
+    def flush(self):
+        pass  # the writer thread flushes the target after every write
+
+    def join(self, timeout=None):
+        """
+        Waits until everything queued is written, at most timeout seconds.
+        Returns whether it was: False on timeout, or if the writer thread is gone.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks:
+                if not self._thread.is_alive():
+                    return False
+                wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+                done.wait(wait)  # woken when the queue empties, the timeout only rechecks the thread
+        return True
+
+_buffer = []
+_flush_lock = threading.Lock()  # writers only append, a flush takes exactly the lines it has seen
+_settings = {'sink': stdout, 'buffer_size': 64}
+_tracers = {}
+
+
+def _parse_environ(value):
+    """
+    'info,metaclasses=off' -> {None: INFO, 'metaclasses': OFF}
+    """
+    levels = {}
+    for item in filter(None, (i.strip() for i in value.split(','))):
+        name, _, level = item.rpartition('=')
+        try:
+            levels[name or None] = _level_names[level.strip().lower()]
+        except KeyError:
+            warnings.warn('METACLASSING_TRACE: ignoring %r, the level is one of %s'
+                          % (item, ', '.join(sorted(_level_names))), RuntimeWarning)
+    return levels
+
+_levels = _parse_environ(os.environ.get('METACLASSING_TRACE', ''))
+
+
+class Lazy(object):
+    """
+    Defers building a message fragment until it is actually rendered.
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func, self.args = func, args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+
+class Tracer(object):
+    """
+    Per-module switch. Cheap to call when disabled: a single comparison, nothing is formatted.
+    """
+    def __init__(self, name, level=None):
+        self.name = name
+        self.level = _levels.get(name, _levels.get(None, DEBUG)) if level is None else level
+
+    def enabled(self, level=INFO):
+        return self.level >= level
+
+    def __call__(self, msg, *args, level=INFO):
+        if self.level >= level:
+            _write(msg % args if args else msg)
+
+    def format(self, msg, *args, level=INFO, **kwargs):
+        if self.level >= level:
+            _write(msg.format(*args, **kwargs))
+
+
+def get_tracer(name):
+    tracer = _tracers.get(name)
+    if tracer is None:
+        tracer = _tracers[name] = Tracer(name)
+    return tracer
+
+
+def configure(name=None, level=None, sink=None, buffer_size=None):
+    """
+    Set the level of one module's tracer (or, without a name, of all of them and of future ones),
+    and/or replace the shared sink (any object with write(), tracing.stdout by default) and buffer size.
+    """
+    if level is not None:
+        if name is None:
+            _levels.clear()
+            _levels[None] = level
+            for tracer in _tracers.values():
+                tracer.level = level
+        else:
+            _levels[name] = level
+            get_tracer(name).level = level
+    if sink is not None or buffer_size is not None:
+        flush()
+        if sink is not None:
+            if isinstance(_settings['sink'], ThreadedSink):
+                _settings['sink'].join()  # what it still holds comes before anything written to the new one
+            _settings['sink'] = sink
+        if buffer_size is not None:
+            _settings['buffer_size'] = buffer_size
+
+
+def echo(*values, sep=' '):
+    """
+    A print() which keeps its place among buffered trace lines. It is never switched off.
+    """
+    _write(sep.join(map(str, values)))
+
+
+def _write(line):
+    _buffer.append(line)
+    if len(_buffer) >= _settings['buffer_size']:
+        flush()
+
+
+def flush():
+    with _flush_lock:
+        taken = len(_buffer)
+        if taken:
+            sink = _settings['sink']
+            sink.write('\n'.join(_buffer[:taken]) + '\n')
+            del _buffer[:taken]
+            if hasattr(sink, 'flush'):
+                sink.flush()
+
+def _exit():
+    flush()
+    sink = _settings['sink']
+    if isinstance(sink, ThreadedSink):
+        sink.join(timeout=5)  # a stuck target must not keep the interpreter from exiting
+
+atexit.register(_exit)